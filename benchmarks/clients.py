@@ -0,0 +1,48 @@
+"""Maps a given number of client windows and keeps them alive."""
+
+import os
+import sys
+
+import Xlib
+import Xlib.display
+
+NUM_CLASSES = 10
+GRID_COLUMNS = 40
+
+
+def main() -> None:
+    num_windows = int(sys.argv[1])
+    dpy = Xlib.display.Display()
+    root = dpy.screen().root
+    utf8_string = dpy.get_atom("UTF8_STRING")
+    cardinal = dpy.get_atom("CARDINAL")
+
+    for i in range(num_windows):
+        window = root.create_window(
+            (i % GRID_COLUMNS) * 40,
+            (i // GRID_COLUMNS) * 20,
+            200,
+            100,
+            0,
+            Xlib.X.CopyFromParent,
+            event_mask=Xlib.X.StructureNotifyMask,
+        )
+        name = f"bench window {i}"
+        window.set_wm_name(name)
+        window.change_property(
+            dpy.get_atom("_NET_WM_NAME"), utf8_string, 8, name.encode()
+        )
+        window.set_wm_class(f"bench{i % NUM_CLASSES}", "Bench")
+        window.change_property(
+            dpy.get_atom("_NET_WM_PID"), cardinal, 32, [os.getpid()]
+        )
+        window.map()
+
+    dpy.sync()
+    print("ready", flush=True)
+    while True:
+        dpy.next_event()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Minimal non-reparenting EWMH window manager for the benchmarks.
+
+It implements just enough of EWMH for every pyxdotool command to work:
+desktops, the active window and the client list.
+"""
+
+from typing import Any
+
+import Xlib
+import Xlib.display
+import Xlib.protocol.event
+
+SUPPORTED = [
+    "_NET_ACTIVE_WINDOW",
+    "_NET_CLIENT_LIST",
+    "_NET_CURRENT_DESKTOP",
+    "_NET_NUMBER_OF_DESKTOPS",
+    "_NET_SUPPORTING_WM_CHECK",
+    "_NET_WM_DESKTOP",
+    "_NET_WM_NAME",
+    "_NET_WM_PID",
+]
+NUM_DESKTOPS = 4
+NORMAL_STATE = 1
+
+CONFIGURE_FIELDS = [
+    (Xlib.X.CWX, "x"),
+    (Xlib.X.CWY, "y"),
+    (Xlib.X.CWWidth, "width"),
+    (Xlib.X.CWHeight, "height"),
+    (Xlib.X.CWBorderWidth, "border_width"),
+    (Xlib.X.CWStackMode, "stack_mode"),
+]
+
+
+class WindowManager:
+    def __init__(self) -> None:
+        self.dpy = Xlib.display.Display()
+        self.root = self.dpy.screen().root
+        self.clients: list[int] = []
+        self.current_desktop = 0
+
+        self.root.change_attributes(
+            event_mask=Xlib.X.SubstructureRedirectMask
+            | Xlib.X.SubstructureNotifyMask
+        )
+
+        check = self.root.create_window(0, 0, 1, 1, 0, Xlib.X.CopyFromParent)
+        for window in (self.root, check):
+            self._set_cardinal(
+                window, "_NET_SUPPORTING_WM_CHECK", [check.id], "WINDOW"
+            )
+        check.change_property(
+            self.atom("_NET_WM_NAME"),
+            self.atom("UTF8_STRING"),
+            8,
+            b"pyxdotool-bench-wm",
+        )
+        self._set_cardinal(
+            self.root,
+            "_NET_SUPPORTED",
+            [self.atom(name) for name in SUPPORTED],
+            "ATOM",
+        )
+        self._set_cardinal(
+            self.root, "_NET_NUMBER_OF_DESKTOPS", [NUM_DESKTOPS]
+        )
+        self._set_cardinal(self.root, "_NET_CURRENT_DESKTOP", [0])
+        self._set_cardinal(self.root, "_NET_ACTIVE_WINDOW", [0], "WINDOW")
+        self._update_client_list()
+        self.dpy.sync()
+
+    def atom(self, name: str) -> int:
+        return int(self.dpy.get_atom(name))
+
+    def _set_cardinal(
+        self,
+        window: Any,
+        name: str,
+        values: list[int],
+        type_name: str = "CARDINAL",
+    ) -> None:
+        window.change_property(
+            self.atom(name), self.atom(type_name), 32, values
+        )
+
+    def _update_client_list(self) -> None:
+        self._set_cardinal(
+            self.root, "_NET_CLIENT_LIST", self.clients, "WINDOW"
+        )
+
+    def run(self) -> None:
+        while True:
+            event = self.dpy.next_event()
+            if event.type == Xlib.X.MapRequest:
+                self._manage(event.window)
+            elif event.type == Xlib.X.ConfigureRequest:
+                event.window.configure(
+                    **{
+                        field: getattr(event, field)
+                        for bit, field in CONFIGURE_FIELDS
+                        if event.value_mask & bit
+                    }
+                )
+            elif event.type == Xlib.X.ClientMessage:
+                self._handle_client_message(event)
+            elif event.type in (Xlib.X.DestroyNotify, Xlib.X.UnmapNotify):
+                if event.window.id in self.clients:
+                    self.clients.remove(event.window.id)
+                    self._update_client_list()
+            self.dpy.flush()
+
+    def _manage(self, window: Any) -> None:
+        window.change_property(
+            self.atom("WM_STATE"),
+            self.atom("WM_STATE"),
+            32,
+            [NORMAL_STATE, Xlib.X.NONE],
+        )
+        if (
+            window.get_full_property(
+                self.atom("_NET_WM_DESKTOP"), Xlib.X.AnyPropertyType
+            )
+            is None
+        ):
+            self._set_cardinal(
+                window, "_NET_WM_DESKTOP", [self.current_desktop]
+            )
+        window.map()
+        self.clients.append(window.id)
+        self._update_client_list()
+
+    def _handle_client_message(self, event: Any) -> None:
+        _format, data = event.data
+        if event.client_type == self.atom("_NET_ACTIVE_WINDOW"):
+            event.window.set_input_focus(
+                Xlib.X.RevertToParent, Xlib.X.CurrentTime
+            )
+            event.window.configure(stack_mode=Xlib.X.Above)
+            self._set_cardinal(
+                self.root, "_NET_ACTIVE_WINDOW", [event.window.id], "WINDOW"
+            )
+        elif event.client_type == self.atom("_NET_CURRENT_DESKTOP"):
+            self.current_desktop = data[0]
+            self._set_cardinal(self.root, "_NET_CURRENT_DESKTOP", [data[0]])
+        elif event.client_type == self.atom("_NET_NUMBER_OF_DESKTOPS"):
+            self._set_cardinal(self.root, "_NET_NUMBER_OF_DESKTOPS", [data[0]])
+        elif event.client_type == self.atom("_NET_WM_DESKTOP"):
+            self._set_cardinal(event.window, "_NET_WM_DESKTOP", [data[0]])
+
+
+if __name__ == "__main__":
+    WindowManager().run()
@@ -0,0 +1,78 @@
+"""Throughput of threads sharing one locked connection versus a pool.
+
+Run from the repository root, with Xvfb installed:
+
+    python -m benchmarks.pool --threads 1,2,4,8
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from benchmarks.xvfb import xvfb_session
+from pyxdotool.pool import XdoPool
+from pyxdotool.xdo import Xdo, XdoSearch
+
+
+def query(xdo: Xdo, window_id: int) -> None:
+    """A typical request handler: a few round trips to the server."""
+    xdo.get_active_window()
+    xdo.get_window_name(window_id)
+    xdo.get_window_location(window_id)
+
+
+def throughput(
+    operation: Callable[[], None], threads: int, operations: int
+) -> float:
+    """Return the operations per second of threads running operation
+    concurrently.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        for future in [executor.submit(operation) for _ in range(operations)]:
+            future.result()
+        return operations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--threads",
+        default="1,2,4,8",
+        help="comma separated numbers of threads to test with",
+    )
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--windows", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'locked ops/s':>13} {'pooled ops/s':>13}")
+    with xvfb_session(args.windows) as display:
+        xdo = Xdo(display)
+        window_id = xdo.search_windows(XdoSearch(winclass="Bench"))[0]
+        lock = threading.Lock()
+
+        def locked() -> None:
+            with lock:
+                query(xdo, window_id)
+
+        for threads in map(int, args.threads.split(",")):
+            with XdoPool(display, max_size=threads) as pool:
+
+                def pooled() -> None:
+                    with pool.lease() as pooled_xdo:
+                        query(pooled_xdo, window_id)
+
+                # Open and warm up all the connections first.
+                throughput(pooled, threads, threads * 10)
+                print(
+                    f"{threads:>7} "
+                    f"{throughput(locked, threads, args.operations):>13.0f} "
+                    f"{throughput(pooled, threads, args.operations):>13.0f}"
+                )
+        xdo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Latency and X request benchmarks of every command and Xdo method.
+
+Run from the repository root, with Xvfb installed:
+
+    python -m benchmarks.run --windows 10,100,1000,2000
+"""
+
+import argparse
+import inspect
+import io
+import json
+import os
+import statistics
+import time
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+import Xlib.X
+
+from benchmarks.xvfb import xvfb_session
+from pyxdotool.chain import parse_args, run_chain
+from pyxdotool.commands import load_all_commands
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.window_stack import WindowStack
+from pyxdotool.xdo import Xdo, XdoSearch, XdoSearchDirection
+
+Operation = Callable[[Xdo, int, list[int]], Any]
+
+COMMAND_ARGS: dict[str, list[str]] = {
+    "click": ["--delay", "0", "1"],
+    "getactivewindow": [],
+    "get_desktop": [],
+    "get_desktop_for_window": ["{window}"],
+    "get_num_desktops": [],
+    "getdisplaygeometry": ["--all-screens"],
+    "getmouselocation": [],
+    "getwindowfocus": [],
+    "getwindowgeometry": ["{window}"],
+    "getwindowname": ["{window}"],
+    "getwindowpid": ["{window}"],
+    "key": ["--delay", "0", "ctrl+shift+a"],
+    "keydown": ["--delay", "0", "shift"],
+    "keyup": ["--delay", "0", "shift"],
+    "mousedown": ["1"],
+    "mousemove": ["--sync", "100", "100"],
+    "mousemove_relative": [
+        "--sync",
+        "--duration",
+        "100",
+        "--rate",
+        "1000",
+        "--",
+        "10",
+        "10",
+    ],
+    "mouseup": ["1"],
+    "search": ["--class", "Bench"],
+    "set_desktop": ["0"],
+    "set_desktop_for_window": ["{window}", "0"],
+    "set_num_desktops": ["4"],
+    "set_screen_for_window": ["{window}", "0"],
+    "sleep": ["0"],
+    "type": ["--delay", "0", "Hello, wörld!"],
+    "windowactivate": ["{window}"],
+    "windowmove": ["{window}", "10", "10"],
+}
+
+METHODS: dict[str, Operation] = {
+    "activate_window": lambda xdo, window_id, _: xdo.activate_window(
+        window_id
+    ),
+    "click": lambda xdo, _, __: xdo.click(1, repeat=10, delay=0),
+    "enter_text": lambda xdo, _, __: xdo.enter_text("x" * 1000, delay=0),
+    "find_screen": lambda xdo, _, __: xdo.find_screen(10, 10, 100, 100),
+    "find_window_client": lambda xdo, window_id, _: xdo.find_window_client(
+        xdo.root.id, XdoSearchDirection.CHILDREN
+    ),
+    "flush": lambda xdo, _, __: xdo.flush(),
+    "get_active_window": lambda xdo, _, __: xdo.get_active_window(),
+    "get_current_desktop": lambda xdo, _, __: xdo.get_current_desktop(),
+    "get_desktop_for_window": lambda xdo, window_id, _: (
+        xdo.get_desktop_for_window(window_id)
+    ),
+    "get_focused_window": lambda xdo, _, __: xdo.get_focused_window(),
+    "get_focused_window_sane": lambda xdo, _, __: (
+        xdo.get_focused_window_sane()
+    ),
+    "get_geometries": lambda xdo, _, window_ids: xdo.get_geometries(
+        window_ids
+    ),
+    "get_mouse_location": lambda xdo, _, __: xdo.get_mouse_location(),
+    "get_number_of_desktops": lambda xdo, _, __: (
+        xdo.get_number_of_desktops()
+    ),
+    "get_screen_location": lambda xdo, _, __: xdo.get_screen_location(0),
+    "get_screen_size": lambda xdo, _, __: xdo.get_screen_size(0),
+    "get_window_location": lambda xdo, window_id, _: (
+        xdo.get_window_location(window_id)
+    ),
+    "get_window_name": lambda xdo, window_id, _: xdo.get_window_name(
+        window_id
+    ),
+    "get_window_pid": lambda xdo, window_id, _: xdo.get_window_pid(window_id),
+    "get_window_size": lambda xdo, window_id, _: xdo.get_window_size(
+        window_id
+    ),
+    "mouse_down": lambda xdo, _, __: xdo.mouse_down(1),
+    "mouse_up": lambda xdo, _, __: xdo.mouse_up(1),
+    "move_mouse": lambda xdo, _, __: xdo.move_mouse(
+        200, 200, duration=0.1, path="bezier", rate=1000, sync=True
+    ),
+    "move_mouse_relative": lambda xdo, _, __: xdo.move_mouse_relative(
+        -10, -10
+    ),
+    "move_window": lambda xdo, window_id, _: xdo.move_window(
+        window_id, 10, 10
+    ),
+    "move_windows": lambda xdo, _, window_ids: xdo.move_windows(
+        (window_id, 10, 10) for window_id in window_ids
+    ),
+    "process_events": lambda xdo, _, __: xdo.process_events(),
+    "query_screens": lambda xdo, _, __: xdo.query_screens(),
+    "select_events": lambda xdo, _, window_ids: xdo.select_events(
+        window_ids, Xlib.X.FocusChangeMask
+    ),
+    "search_windows": lambda xdo, _, __: xdo.search_windows(
+        XdoSearch(winclass="Bench")
+    ),
+    "send_keysequence": lambda xdo, _, __: xdo.send_keysequence(
+        ["ctrl+shift+a"], delay=0
+    ),
+    "set_current_desktop": lambda xdo, _, __: xdo.set_current_desktop(0),
+    "set_desktop_for_window": lambda xdo, window_id, _: (
+        xdo.set_desktop_for_window(window_id, 0)
+    ),
+    "set_desktop_for_windows": lambda xdo, _, window_ids: (
+        xdo.set_desktop_for_windows(window_ids, 0, sync=True, timeout=1)
+    ),
+    "set_screen_for_windows": lambda xdo, _, window_ids: (
+        xdo.set_screen_for_windows(window_ids, 1, relative=True)
+    ),
+    "set_number_of_desktops": lambda xdo, _, __: (
+        xdo.set_number_of_desktops(4)
+    ),
+    "wait_for_window_active": lambda xdo, window_id, _: (
+        xdo.wait_for_window_active(window_id, active=True, timeout=1)
+    ),
+    "wait_for_window_move": lambda xdo, window_id, _: (
+        xdo.wait_for_window_move(window_id, -1, -1, timeout=1)
+    ),
+}
+
+# Commands that never return or wait for the user.
+NOT_BENCHMARKED_COMMANDS = {"behave", "selectwindow"}
+
+# Public methods that aren't operations on their own.
+NOT_BENCHMARKED = {
+    "add_event_listener",
+    "close",
+    "remove_event_listener",
+    "run_event_loop",
+    "select_window",
+}
+
+
+@dataclass
+class Result:
+    windows: int
+    operation: str
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    requests: float
+
+
+def measure(
+    xdo: Xdo, operation: Callable[[], Any], iterations: int
+) -> tuple[list[float], float]:
+    """Return the latencies of the operation in milliseconds and the
+    average number of X requests it sent.
+    """
+    operation()  # warm up the caches, as a long-lived user would
+    display = xdo.xdpy.display
+    latencies = []
+    requests = 0
+    for _ in range(iterations):
+        serial = display.request_serial
+        start = time.perf_counter()
+        operation()
+        xdo.flush()
+        latencies.append((time.perf_counter() - start) * 1000)
+        requests += (display.request_serial - serial) % 65536
+    return latencies, requests / iterations
+
+
+def make_result(
+    num_windows: int, name: str, latencies: list[float], requests: float
+) -> Result:
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return Result(
+        windows=num_windows,
+        operation=name,
+        p50_ms=percentiles[49],
+        p90_ms=percentiles[89],
+        p99_ms=percentiles[98],
+        requests=requests,
+    )
+
+
+def benchmark_commands(
+    xdo: Xdo, window_id: int, num_windows: int, iterations: int
+) -> list[Result]:
+    results = []
+    connection = LazyXdo(lambda: xdo)
+    for command_cls in load_all_commands():
+        name = command_cls.names[0]
+        if name in NOT_BENCHMARKED_COMMANDS:
+            continue
+        if name not in COMMAND_ARGS:
+            print(f"warning: no arguments defined for command {name}")
+            continue
+        argv = [name] + [
+            arg.format(window=window_id) for arg in COMMAND_ARGS[name]
+        ]
+        args_list = list(parse_args(argv))
+
+        def run() -> None:
+            with redirect_stdout(io.StringIO()):
+                run_chain(connection, args_list, WindowStack())
+
+        latencies, requests = measure(xdo, run, iterations)
+        results.append(
+            make_result(num_windows, f"command:{name}", latencies, requests)
+        )
+    return results
+
+
+def benchmark_methods(
+    xdo: Xdo,
+    window_id: int,
+    window_ids: list[int],
+    num_windows: int,
+    iterations: int,
+) -> list[Result]:
+    results = []
+    for name, _ in inspect.getmembers(Xdo, inspect.isfunction):
+        if name.startswith("_") or name in NOT_BENCHMARKED:
+            continue
+        if name not in METHODS:
+            print(f"warning: no benchmark defined for Xdo.{name}")
+            continue
+        operation = METHODS[name]
+        latencies, requests = measure(
+            xdo, lambda: operation(xdo, window_id, window_ids), iterations
+        )
+        results.append(
+            make_result(num_windows, f"xdo:{name}", latencies, requests)
+        )
+    return results
+
+
+def benchmark_window_index(
+    display: str, window_id: int, num_windows: int, iterations: int
+) -> list[Result]:
+    """Searches answered from the window index, as in the daemon."""
+    xdo = Xdo(display, index_windows=True)
+    try:
+        pid = xdo.get_window_pid(window_id)
+        return [
+            make_result(
+                num_windows,
+                f"xdo:search_windows[indexed,{name}]",
+                *measure(xdo, lambda: xdo.search_windows(search), iterations),
+            )
+            for name, search in (
+                ("class", XdoSearch(winclass="Bench")),
+                ("name", XdoSearch(name="Bench window 1")),
+                ("pid", XdoSearch(pid=pid)),
+            )
+        ]
+    finally:
+        xdo.close()
+
+
+def print_results(results: list[Result]) -> None:
+    print(
+        f"{'windows':>7}  {'operation':<40} {'p50 ms':>9} {'p90 ms':>9} "
+        f"{'p99 ms':>9} {'requests':>9}"
+    )
+    for result in results:
+        print(
+            f"{result.windows:>7}  {result.operation:<40} "
+            f"{result.p50_ms:>9.3f} {result.p90_ms:>9.3f} "
+            f"{result.p99_ms:>9.3f} {result.requests:>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--windows",
+        default="10,100,1000,2000",
+        help="comma separated numbers of client windows to test with",
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--json", action="store_true", help="output JSON instead of a table"
+    )
+    args = parser.parse_args()
+
+    results: list[Result] = []
+    for num_windows in map(int, args.windows.split(",")):
+        with xvfb_session(num_windows) as display:
+            os.environ["DISPLAY"] = display
+            xdo = Xdo(display)
+            window_ids = xdo.search_windows(XdoSearch(winclass="Bench"))
+            window_id = window_ids[0]
+            results += benchmark_commands(
+                xdo, window_id, num_windows, args.iterations
+            )
+            results += benchmark_methods(
+                xdo, window_id, window_ids, num_windows, args.iterations
+            )
+            results += benchmark_window_index(
+                display, window_id, num_windows, args.iterations
+            )
+
+    if args.json:
+        print(json.dumps([asdict(result) for result in results], indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
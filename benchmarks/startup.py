@@ -0,0 +1,86 @@
+"""Cold start latency of the command line tool, one process per run.
+
+Run from the repository root, with Xvfb installed:
+
+    python -m benchmarks.startup --iterations 20
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Iterator
+
+from benchmarks.xvfb import xvfb_session
+
+CHAINS: list[list[str]] = [
+    ["sleep", "0"],
+    ["getactivewindow"],
+    ["search", "--class", "Bench"],
+    ["--client", "getactivewindow"],
+]
+
+
+def run_once(argv: list[str], env: dict[str, str]) -> tuple[float, bool]:
+    """Return the wall time of the run in milliseconds and whether it
+    imported Xlib.
+    """
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "pyxdotool", *argv],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, b" Xlib" in process.stderr
+
+
+@contextlib.contextmanager
+def daemon(env: dict[str, str], socket_path: str) -> Iterator[None]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pyxdotool", "daemon"], env=env
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(socket_path):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Timed out waiting for the daemon")
+            time.sleep(0.05)
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'chain':<40} {'p50 ms':>9} {'p90 ms':>9} {'imports Xlib':>13}")
+    with xvfb_session(10) as display, tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DISPLAY=display, XDG_RUNTIME_DIR=tmp)
+        # the default socket path of both the daemon and the client
+        socket_path = os.path.join(tmp, f"pyxdotool{display}.sock")
+        with daemon(env, socket_path):
+            for argv in CHAINS:
+                run_once(argv, env)  # warm up the file system caches
+                runs = [run_once(argv, env) for _ in range(args.iterations)]
+                latencies = [elapsed for elapsed, _ in runs]
+                percentiles = statistics.quantiles(
+                    latencies, n=10, method="inclusive"
+                )
+                print(
+                    f"{' '.join(argv):<40} {percentiles[4]:>9.1f} "
+                    f"{percentiles[8]:>9.1f} {str(runs[0][1]):>13}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import contextlib
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Iterator
+
+import Xlib.display
+import Xlib.error
+
+STARTUP_TIMEOUT = 10.0
+
+
+def _free_display() -> str:
+    num = 50
+    while os.path.exists(f"/tmp/.X11-unix/X{num}") or os.path.exists(
+        f"/tmp/.X{num}-lock"
+    ):
+        num += 1
+    return f":{num}"
+
+
+def _wait_for(condition: Callable[[], bool], what: str) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out waiting for {what}")
+        time.sleep(0.05)
+
+
+def _wm_is_ready(display: str) -> bool:
+    try:
+        dpy = Xlib.display.Display(display)
+    except Xlib.error.DisplayError:
+        return False
+    try:
+        return (
+            dpy.screen().root.get_full_property(
+                dpy.get_atom("_NET_SUPPORTED"), Xlib.X.AnyPropertyType
+            )
+            is not None
+        )
+    finally:
+        dpy.close()
+
+
+@contextlib.contextmanager
+def xvfb_session(num_windows: int) -> Iterator[str]:
+    """Start Xvfb with two Xinerama screens, the benchmark window manager
+    and num_windows client windows, and yield the display name.
+    """
+    display = _free_display()
+    env = dict(os.environ, DISPLAY=display)
+    processes: list[subprocess.Popen[bytes]] = []
+    try:
+        processes.append(
+            subprocess.Popen(
+                [
+                    "Xvfb",
+                    display,
+                    "-screen",
+                    "0",
+                    "1920x1080x24",
+                    "-screen",
+                    "1",
+                    "1920x1080x24",
+                    "+xinerama",
+                    "+extension",
+                    "RANDR",
+                    "-nolisten",
+                    "tcp",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        )
+        _wait_for(
+            lambda: os.path.exists(f"/tmp/.X11-unix/X{display[1:]}"), "Xvfb"
+        )
+
+        processes.append(
+            subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.ewmh_wm"], env=env
+            )
+        )
+        _wait_for(lambda: _wm_is_ready(display), "the window manager")
+
+        clients = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.clients", str(num_windows)],
+            env=env,
+            stdout=subprocess.PIPE,
+        )
+        processes.append(clients)
+        assert clients.stdout is not None
+        if clients.stdout.readline().strip() != b"ready":
+            raise RuntimeError("Client windows failed to start")
+
+        yield display
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
@@ -1,56 +1,180 @@
 import argparse
+import json
 import sys
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING
 
-from pyxdotool.commands.base import BaseCommand, CommandContext
-from pyxdotool.xdo import Xdo
+from pyxdotool.chain import parse_args, run_chain, run_script
+from pyxdotool.client import default_socket_path, forward
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.output import FORMATS, OutputSink
+from pyxdotool.stats import XdoStats
+from pyxdotool.window_stack import WindowStack
 
+# Xlib takes a while to import; it's only imported once a command needs X,
+# and never for --client.
+if TYPE_CHECKING:
+    from pyxdotool.xdo import Xdo
 
-def parse_args(
-    argv: Optional[list[str]] = None,
-) -> Iterable[argparse.Namespace]:
-    parser = argparse.ArgumentParser()
 
-    subparsers = parser.add_subparsers()
+def parse_global_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pyxdotool",
+        epilog=(
+            "Use 'pyxdotool daemon' to keep a single X connection open and "
+            "'pyxdotool --client ...' to run command chains through it."
+        ),
+    )
+    parser.add_argument(
+        "--display",
+        action="append",
+        default=[],
+        metavar="DISPLAY",
+        help=(
+            "X display to connect to instead of $DISPLAY; repeat or "
+            "separate with commas to run the chain on several displays in "
+            "parallel"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="number of displays to run the chain on at once",
+    )
+    parser.add_argument(
+        "--socket",
+        help=(
+            "path of the Unix socket the daemon listens on (default: "
+            "pyxdotool$DISPLAY.sock in $XDG_RUNTIME_DIR, or in a private "
+            "directory under /tmp)"
+        ),
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="forward the command chain to a running daemon",
+    )
+    parser.add_argument(
+        "--script",
+        type=argparse.FileType("r"),
+        metavar="FILE",
+        help=(
+            "read command chains from FILE ('-' for stdin), one per line, "
+            "and run them all over the same connection"
+        ),
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help=(
+            "print the number of X requests, round trips and time blocked on "
+            "replies per command and Xdo method to stderr, as JSON"
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help=(
+            "output format of the query commands and of the final window "
+            "stack: text, or one JSON object per line (default: %(default)s)"
+        ),
+    )
+    parser.add_argument("chain", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    args.display = [
+        display_name
+        for value in args.display
+        for display_name in value.split(",")
+        if display_name
+    ]
+    if args.chain[:1] == ["daemon"] and len(args.chain) > 1:
+        parser.error(
+            "daemon takes no arguments, the options go before it: "
+            "pyxdotool [--display DISPLAY] [--socket SOCKET] daemon"
+        )
+    if args.script and args.chain:
+        parser.error("--script can't be combined with a command chain")
+    if len(args.display) > 1 and (
+        args.script
+        or args.client
+        or args.stats
+        or args.chain[:1] == ["daemon"]
+    ):
+        parser.error(
+            "several displays can only be combined with a command chain"
+        )
+    if args.socket is None:
+        args.socket = default_socket_path(
+            args.display[0] if args.display else None
+        )
+    return args
+
 
-    for command_cls in BaseCommand.__subclasses__():
-        subparser = subparsers.add_parser(
-            command_cls.names[0],
-            aliases=command_cls.names[1:],
-            description=(
-                None
-                if command_cls.description is NotImplemented
-                else command_cls.description
-            ),
+def main() -> None:
+    global_args = parse_global_args(sys.argv[1:])
+
+    if global_args.client:
+        sys.exit(
+            forward(global_args.socket, global_args.chain, global_args.format)
         )
-        subparser.set_defaults(command_cls=command_cls)
-        command_cls.decorate_arg_parser(subparser)
 
-    rest = argv
-    while rest:
-        restprev = rest[:]
-        args, rest = parser.parse_known_args(rest)
-        yield args
-        if rest == restprev:
-            parser.error(f"unrecognized arguments: {rest[0]}")
-            break
+    display_name = global_args.display[0] if global_args.display else None
 
+    if global_args.chain[:1] == ["daemon"]:
+        from pyxdotool.daemon import PROPERTY_CACHE_SIZE, serve
+        from pyxdotool.xdo import Xdo
 
-def main() -> None:
-    args_list = list(parse_args(sys.argv[1:]))
+        xdo = Xdo(
+            display_name,
+            property_cache_size=PROPERTY_CACHE_SIZE,
+            mirror_window_tree=True,
+            index_windows=True,
+        )
+        serve(xdo, global_args.socket)
+        return
+
+    if len(global_args.display) > 1:
+        from pyxdotool.fanout import print_results, run_on_displays
+
+        results = run_on_displays(
+            global_args.display,
+            list(parse_args(global_args.chain)),
+            global_args.jobs,
+            global_args.format,
+        )
+        sys.exit(print_results(results, global_args.format))
+
+    stats = XdoStats() if global_args.stats else None
+    window_stack = WindowStack()
+
+    def connect() -> "Xdo":
+        from pyxdotool.xdo import Xdo
 
-    window_stack: list[int] = []
-    xdo = Xdo()
+        xdo = Xdo(display_name)
+        if stats:
+            stats.attach(xdo)
+        return xdo
 
-    for args in args_list:
-        ctx = CommandContext(xdo, args, window_stack)
-        command = args.command_cls()
-        command.run(ctx)
+    connection = LazyXdo(connect)
+    output = OutputSink(sys.stdout, global_args.format)
+    status = 0
+    if global_args.script:
+        with global_args.script:
+            status = run_script(
+                connection, global_args.script, window_stack, stats, output
+            )
+    else:
+        args_list = list(parse_args(global_args.chain))
+        run_chain(connection, args_list, window_stack, stats, output)
 
-    for window_id in window_stack:
-        print(window_id)
+    output.write_windows(window_stack)
+    output.flush()
 
-    xdo.get_active_window()  # ???????????
+    if stats:
+        json.dump(stats.as_dict(), sys.stderr, indent=2)
+        print(file=sys.stderr)
+    sys.exit(status)
 
 
 if __name__ == "__main__":
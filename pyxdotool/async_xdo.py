@@ -0,0 +1,235 @@
+import asyncio
+import contextlib
+from types import TracebackType
+from typing import Any, Callable, Iterator, Optional, Type, TypeVar, cast
+
+import Xlib
+
+from pyxdotool.xdo import DEFAULT_TIMEOUT, Xdo, XdoSteps, is_answered
+
+EventPredicate = Callable[[Any], bool]
+
+T = TypeVar("T")
+
+
+class AsyncXdo:
+    """Coroutine counterpart of Xdo.
+
+    The X connection is registered as a reader with the running event loop,
+    so replies and events are read as soon as they arrive and any number of
+    operations can wait on the same connection at once. It has to be created
+    from within a coroutine.
+
+    The operations run the steps shared with Xdo, awaiting the replies they
+    need with _reply. Anything else that reads from the connection, which
+    includes flushing it, goes through _call, as it may read the replies
+    other coroutines are waiting for.
+    """
+
+    def __init__(self, display_name: Optional[str] = None) -> None:
+        self.xdo = Xdo(display_name)
+        self._loop = asyncio.get_running_loop()
+        self._reply_waiters: list[asyncio.Future[None]] = []
+        self._event_waiters: list[
+            tuple[EventPredicate, asyncio.Future[Any]]
+        ] = []
+
+        # Needs a round trip, better blocked on here than in an operation.
+        self.xdo._select_screen_changes()
+        self.xdo.add_event_listener(self._on_event)
+        self._loop.add_reader(self.xdo.xdpy.fileno(), self._drain)
+
+    def close(self) -> None:
+        self._loop.remove_reader(self.xdo.xdpy.fileno())
+        self.xdo.remove_event_listener(self._on_event)
+        self.xdo.close()
+
+    async def __aenter__(self) -> "AsyncXdo":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _drain(self) -> None:
+        """Read whatever the server sent and wake up the coroutines waiting
+        for replies.
+        """
+        # Replies are stored in their request objects, events go through
+        # Xdo's listeners.
+        self.xdo.process_events()
+        for waiter in self._reply_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._reply_waiters.clear()
+
+    def _call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run an Xdo call that doesn't wait for replies, then wake up the
+        coroutines whose replies it may have read off the socket, as the
+        event loop won't see them anymore.
+        """
+        try:
+            return func(*args)
+        finally:
+            self._drain()
+
+    def _on_event(self, event: Any) -> None:
+        for predicate, future in self._event_waiters[:]:
+            if not future.done() and predicate(event):
+                future.set_result(event)
+
+    @contextlib.contextmanager
+    def _watch(
+        self, predicate: EventPredicate
+    ) -> Iterator[asyncio.Future[Any]]:
+        """Resolve the yielded future with the first matching event. Events
+        are matched from the moment the block is entered, so nothing is lost
+        between checking a condition and waiting for it to change.
+        """
+        future = self._loop.create_future()
+        waiter = (predicate, future)
+        self._event_waiters.append(waiter)
+        try:
+            yield future
+        finally:
+            self._event_waiters.remove(waiter)
+            future.cancel()
+
+    async def _reply(self, request: Any) -> None:
+        """Wait for the reply to a request queued with Xdo._send_request."""
+        self._call(self.xdo.flush)
+        while not is_answered(request):
+            waiter = self._loop.create_future()
+            self._reply_waiters.append(waiter)
+            await waiter
+
+    async def _run(self, steps: XdoSteps[T]) -> T:
+        """Run the steps of an Xdo operation, awaiting the replies it
+        collects instead of blocking on them.
+        """
+        while True:
+            try:
+                requests = self._call(next, steps)
+            except StopIteration as ex:
+                return cast(T, ex.value)
+            for request in requests:
+                await self._reply(request)
+
+    async def get_active_window(self) -> int:
+        return await self._run(self.xdo._get_active_window_steps())
+
+    async def get_current_desktop(self) -> int:
+        return await self._run(self.xdo._get_current_desktop_steps())
+
+    async def set_current_desktop(self, desktop: int) -> None:
+        await self._run(self.xdo._set_current_desktop_steps(desktop))
+        self._call(self.xdo.flush)
+
+    async def get_number_of_desktops(self) -> int:
+        return await self._run(self.xdo._get_number_of_desktops_steps())
+
+    async def get_desktop_for_window(self, window_id: int) -> int:
+        return await self._run(
+            self.xdo._get_desktop_for_window_steps(window_id)
+        )
+
+    async def set_desktop_for_window(
+        self, window_id: int, desktop: int
+    ) -> None:
+        await self._run(
+            self.xdo._set_desktop_for_windows_steps([window_id], desktop)
+        )
+
+    async def get_window_name(self, window_id: int) -> Optional[str]:
+        return await self._run(self.xdo._get_window_name_steps(window_id))
+
+    async def get_window_pid(self, window_id: int) -> int:
+        return await self._run(
+            self.xdo._get_required_int_property_steps("_NET_WM_PID", window_id)
+        )
+
+    async def get_window_location(
+        self, window_id: int
+    ) -> tuple[int, int, Optional[int]]:
+        (geometry,) = await self._run(
+            self.xdo._get_geometries_steps([window_id])
+        )
+        return geometry.x, geometry.y, geometry.screen
+
+    async def activate_window(self, window_id: int) -> None:
+        """See Xdo.activate_window."""
+        await self._run(self.xdo._activate_window_steps(window_id))
+
+    async def move_window(
+        self, window_id: int, target_x: int, target_y: int
+    ) -> None:
+        self._call(self.xdo.move_window, window_id, target_x, target_y)
+
+    async def wait_for_window_active(
+        self,
+        window_id: int,
+        active: bool,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """See Xdo.wait_for_window_active."""
+        atom = await self._run(self.xdo._atom_steps("_NET_ACTIVE_WINDOW"))
+        root_id = self.xdo.root.id
+
+        def is_change(event: Any) -> bool:
+            return bool(
+                event.type == Xlib.X.PropertyNotify
+                and event.window.id == root_id
+                and event.atom == atom
+            )
+
+        async def wait() -> None:
+            while True:
+                with self._watch(is_change) as changed:
+                    active_window_id = await self.get_active_window()
+                    if (active_window_id == window_id) == active:
+                        return
+                    await changed
+
+        return await self._wait_with_timeout(wait(), timeout)
+
+    async def wait_for_window_move(
+        self,
+        window_id: int,
+        orig_x: int,
+        orig_y: int,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """See Xdo.wait_for_window_move."""
+        self._call(
+            self.xdo._select_input, window_id, Xlib.X.StructureNotifyMask
+        )
+
+        def is_configure(event: Any) -> bool:
+            return bool(
+                event.type == Xlib.X.ConfigureNotify
+                and event.window.id == window_id
+            )
+
+        async def wait() -> None:
+            while True:
+                with self._watch(is_configure) as configured:
+                    win_x, win_y, _ = await self.get_window_location(window_id)
+                    if (win_x, win_y) != (orig_x, orig_y):
+                        return
+                    await configured
+
+        return await self._wait_with_timeout(wait(), timeout)
+
+    @staticmethod
+    async def _wait_with_timeout(
+        awaitable: Any, timeout: Optional[float]
+    ) -> bool:
+        try:
+            await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
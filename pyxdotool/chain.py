@@ -0,0 +1,126 @@
+import argparse
+import contextlib
+import shlex
+import sys
+from typing import TYPE_CHECKING, ContextManager, Iterable, Optional
+
+from pyxdotool.commands import COMMANDS, load_command
+from pyxdotool.commands.base import CommandContext, LazyXdo
+from pyxdotool.output import OutputSink
+from pyxdotool.window_stack import WindowStack
+
+if TYPE_CHECKING:
+    from pyxdotool.stats import XdoStats
+
+
+def parse_args(
+    argv: Optional[list[str]] = None,
+) -> Iterable[argparse.Namespace]:
+    parser = argparse.ArgumentParser()
+
+    subparsers = parser.add_subparsers()
+    added: set[str] = set()
+
+    # Only the subparsers of the commands actually used are built.
+    def add_command(name: str) -> None:
+        command_cls = load_command(name)
+        if command_cls.names[0] in added:
+            return
+        added.add(command_cls.names[0])
+        subparser = subparsers.add_parser(
+            command_cls.names[0],
+            aliases=command_cls.names[1:],
+            description=(
+                None
+                if command_cls.description is NotImplemented
+                else command_cls.description
+            ),
+        )
+        subparser.set_defaults(command_cls=command_cls)
+        command_cls.decorate_arg_parser(subparser)
+
+    rest = argv
+    while rest:
+        end = len(rest)
+        if rest[0] in COMMANDS:
+            add_command(rest[0])
+            if load_command(rest[0]).ends_at_command_name:
+                end = next(
+                    (
+                        i
+                        for i, arg in enumerate(rest[1:], 1)
+                        if arg in COMMANDS
+                    ),
+                    end,
+                )
+        else:
+            # Let argparse list all the commands in the help or in the
+            # invalid choice error.
+            for name in COMMANDS:
+                add_command(name)
+        restprev = rest[:]
+        args, unknown = parser.parse_known_args(rest[:end])
+        rest = unknown + rest[end:]
+        yield args
+        if rest == restprev:
+            parser.error(f"unrecognized arguments: {rest[0]}")
+            break
+
+
+def run_chain(
+    connection: LazyXdo,
+    args_list: Iterable[argparse.Namespace],
+    window_stack: WindowStack,
+    stats: Optional["XdoStats"] = None,
+    output: Optional[OutputSink] = None,
+) -> None:
+    if output is None:
+        output = OutputSink(sys.stdout)
+    try:
+        for args in args_list:
+            ctx = CommandContext(connection, args, window_stack, output)
+            command = args.command_cls()
+            scope: ContextManager[object] = (
+                contextlib.nullcontext()
+                if stats is None
+                else stats.scope(f"command.{command.names[0]}")
+            )
+            with scope:
+                command.run(ctx)
+    finally:
+        output.flush()
+
+    # Requests that don't expect a reply, such as the client messages, sit
+    # in the output buffer until something is flushed.
+    connection.flush()
+
+
+def run_script(
+    connection: LazyXdo,
+    lines: Iterable[str],
+    window_stack: WindowStack,
+    stats: Optional["XdoStats"] = None,
+    output: Optional[OutputSink] = None,
+) -> int:
+    """Run each line as a separate command chain over the same connection
+    and window stack, flushing the output after every chain.
+
+    Lines that can't be parsed are reported and skipped. Return 1 if there
+    were any, 0 otherwise.
+    """
+    status = 0
+    for lineno, line in enumerate(lines, 1):
+        try:
+            args_list = list(parse_args(shlex.split(line, comments=True)))
+        except (ValueError, SystemExit) as ex:
+            # argparse has already printed why, shlex hasn't
+            reason = f": {ex}" if isinstance(ex, ValueError) else ""
+            print(
+                f"Error: Skipped line {lineno} of the script{reason}",
+                file=sys.stderr,
+            )
+            status = 1
+            continue
+        if args_list:
+            run_chain(connection, args_list, window_stack, stats, output)
+    return status
@@ -0,0 +1,66 @@
+"""Thin client for the pyxdotool daemon.
+
+This module deliberately depends on the standard library only, so that
+forwarding a command chain doesn't pay for importing Xlib.
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Any, Optional
+
+
+def default_socket_path(display: Optional[str] = None) -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or fallback_runtime_dir()
+    if display is None:
+        display = os.environ.get("DISPLAY", "")
+    display = display.replace("/", "_")
+    return os.path.join(runtime_dir, f"pyxdotool{display}.sock")
+
+
+def fallback_runtime_dir() -> str:
+    """Directory for the socket without $XDG_RUNTIME_DIR, which the daemon
+    creates private to the user like the latter.
+    """
+    return os.path.join(tempfile.gettempdir(), f"pyxdotool-{os.getuid()}")
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    return json.dumps(message).encode() + b"\n"
+
+
+def decode_message(line: bytes) -> dict[str, Any]:
+    return dict(json.loads(line))
+
+
+def forward(
+    socket_path: str, argv: list[str], output_format: str = "text"
+) -> int:
+    """Run a command chain in the daemon, echo its output and return its
+    exit status.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError as ex:
+            print(
+                f"Error: Can't connect to the daemon at {socket_path}: {ex}",
+                file=sys.stderr,
+            )
+            return 1
+        client.sendall(encode_message({"argv": argv, "format": output_format}))
+        with client.makefile("rb") as stream:
+            try:
+                line = stream.readline()
+            except ConnectionResetError:
+                line = b""
+    if not line:
+        print("Error: The daemon closed the connection", file=sys.stderr)
+        return 1
+    response = decode_message(line)
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return int(response["status"])
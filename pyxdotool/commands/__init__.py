@@ -1,16 +1,71 @@
+import importlib
+from typing import Any, cast
+
 from .base import BaseCommand, CommandContext
-from .get_active_window import GetActiveWindowCommand
-from .get_desktop import GetDesktopCommand
-from .get_desktop_for_window import GetDesktopForWindowCommand
-from .get_num_desktops import GetNumberOfDesktopsCommand
-from .get_window_focus import GetWindowFocusCommand
-from .get_window_geometry import GetWindowGeometryCommand
-from .get_window_name import GetWindowNameCommand
-from .get_window_pid import GetWindowPidCommand
-from .set_desktop import SetDesktopCommand
-from .set_desktop_for_window import SetDesktopForWindowCommand
-from .set_num_desktops import SetNumberOfDesktopsCommand
-from .set_screen_for_window import SetScreenForWindowCommand
-from .sleep import SleepCommand
-from .window_activate import WindowActivateCommand
-from .window_move import WindowMoveCommand
+
+# Every command name and alias, mapped to the module and class implementing
+# it, so that only the commands used in a chain have to be imported.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "behave": ("behave", "BehaveCommand"),
+    "click": ("click", "ClickCommand"),
+    "getactivewindow": ("get_active_window", "GetActiveWindowCommand"),
+    "get_desktop": ("get_desktop", "GetDesktopCommand"),
+    "get_desktop_for_window": (
+        "get_desktop_for_window",
+        "GetDesktopForWindowCommand",
+    ),
+    "get_num_desktops": ("get_num_desktops", "GetNumberOfDesktopsCommand"),
+    "getdisplaygeometry": (
+        "get_display_geometry",
+        "GetDisplayGeometryCommand",
+    ),
+    "getmouselocation": ("get_mouse_location", "GetMouseLocationCommand"),
+    "getwindowfocus": ("get_window_focus", "GetWindowFocusCommand"),
+    "getwindowgeometry": ("get_window_geometry", "GetWindowGeometryCommand"),
+    "getwindowname": ("get_window_name", "GetWindowNameCommand"),
+    "getwindowpid": ("get_window_pid", "GetWindowPidCommand"),
+    "key": ("key", "KeyCommand"),
+    "keydown": ("key_down", "KeyDownCommand"),
+    "keyup": ("key_up", "KeyUpCommand"),
+    "mousedown": ("mouse_down", "MouseDownCommand"),
+    "mousemove": ("mouse_move", "MouseMoveCommand"),
+    "mousemove_relative": (
+        "mouse_move_relative",
+        "MouseMoveRelativeCommand",
+    ),
+    "mouseup": ("mouse_up", "MouseUpCommand"),
+    "search": ("search", "SearchWindowCommand"),
+    "selectwindow": ("select_window", "SelectWindowCommand"),
+    "set_desktop": ("set_desktop", "SetDesktopCommand"),
+    "set_desktop_for_window": (
+        "set_desktop_for_window",
+        "SetDesktopForWindowCommand",
+    ),
+    "set_num_desktops": ("set_num_desktops", "SetNumberOfDesktopsCommand"),
+    "set_screen_for_window": (
+        "set_screen_for_window",
+        "SetScreenForWindowCommand",
+    ),
+    "sleep": ("sleep", "SleepCommand"),
+    "type": ("type_text", "TypeCommand"),
+    "windowactivate": ("window_activate", "WindowActivateCommand"),
+    "windowmove": ("window_move", "WindowMoveCommand"),
+}
+
+
+def load_command(name: str) -> type[BaseCommand]:
+    module_name, class_name = COMMANDS[name]
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    return cast(type[BaseCommand], getattr(module, class_name))
+
+
+def load_all_commands() -> list[type[BaseCommand]]:
+    return list(dict.fromkeys(map(load_command, COMMANDS)))
+
+
+def __getattr__(name: str) -> Any:
+    # Keep the command classes importable from this package.
+    for command_name, (_, class_name) in COMMANDS.items():
+        if class_name == name:
+            return load_command(command_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,59 @@
 import argparse
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
 
-from pyxdotool.xdo import Xdo
+from pyxdotool.output import OutputSink
+
+if TYPE_CHECKING:
+    from pyxdotool.window_stack import WindowStack
+    from pyxdotool.xdo import Xdo
+
+
+class LazyXdo:
+    """Connects to the X server when a command first needs it, so that
+    commands such as sleep don't pay for importing Xlib and connecting.
+    """
+
+    def __init__(self, connect: Callable[[], "Xdo"]) -> None:
+        self._connect = connect
+        self._xdo: Optional["Xdo"] = None
+
+    def get(self) -> "Xdo":
+        if self._xdo is None:
+            self._xdo = self._connect()
+        return self._xdo
+
+    def flush(self) -> None:
+        if self._xdo is not None:
+            self._xdo.flush()
+
+    def close(self) -> None:
+        if self._xdo is not None:
+            self._xdo.close()
+            self._xdo = None
 
 
 @dataclass
 class CommandContext:
-    xdo: Xdo
+    connection: LazyXdo
     args: argparse.Namespace
-    window_stack: list[int]
+    window_stack: "WindowStack"
+    # Commands print here rather than to sys.stdout, so that chains can run
+    # in parallel threads.
+    output: OutputSink = field(default_factory=lambda: OutputSink(sys.stdout))
+
+    @property
+    def xdo(self) -> "Xdo":
+        return self.connection.get()
 
 
 class BaseCommand:
     names: list[str] = NotImplemented
     description: str = NotImplemented
+    # Whether a variable number of arguments stops at the next command name
+    # rather than taking the rest of the chain.
+    ends_at_command_name = False
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
@@ -0,0 +1,93 @@
+import argparse
+import sys
+import traceback
+from typing import Any, Hashable, Optional, cast
+
+import Xlib.X
+
+from pyxdotool.chain import parse_args, run_chain
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
+
+# Event mask to select on the watched windows and event type, per action.
+ACTIONS: dict[str, tuple[int, int]] = {
+    "mouse-enter": (Xlib.X.EnterWindowMask, Xlib.X.EnterNotify),
+    "mouse-leave": (Xlib.X.LeaveWindowMask, Xlib.X.LeaveNotify),
+    # Only one client may select button presses on a window, releases are
+    # free for all.
+    "mouse-click": (Xlib.X.ButtonReleaseMask, Xlib.X.ButtonRelease),
+    "focus": (Xlib.X.FocusChangeMask, Xlib.X.FocusIn),
+    "blur": (Xlib.X.FocusChangeMask, Xlib.X.FocusOut),
+    "create": (Xlib.X.SubstructureNotifyMask, Xlib.X.CreateNotify),
+    "destroy": (Xlib.X.StructureNotifyMask, Xlib.X.DestroyNotify),
+    # Moved, resized or restacked.
+    "configure": (Xlib.X.StructureNotifyMask, Xlib.X.ConfigureNotify),
+}
+
+
+class BehaveCommand(BaseCommand):
+    names = ["behave"]
+    description = (
+        "Bind an action to events on a window. This lets you run additional "
+        "commands each time a given event occurs.\n"
+        "\n"
+        "The command chain is run with only the window that triggered the "
+        "event on the window stack; for create, that is the new child "
+        "window. Events of the same kind on the same window arriving while "
+        "the chain runs trigger it only once more, so that e.g. configure "
+        "runs the chain for where a dragged window is now rather than for "
+        "every step of the drag."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "window",
+            type=window_selector,
+            help=(
+                "window id to watch, %%N for the Nth window on the stack or "
+                "%%@ for all of them"
+            ),
+        )
+        parser.add_argument("action", choices=ACTIONS, help="event to watch")
+        parser.add_argument(
+            "chain",
+            nargs=argparse.REMAINDER,
+            help="command chain to run when the event occurs",
+        )
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        window_ids = set(ctx.window_stack.select(ctx.args.window))
+
+        event_mask, event_type = ACTIONS[ctx.args.action]
+        args_list = list(parse_args(ctx.args.chain))
+
+        def key(event: Any) -> Optional[Hashable]:
+            if event.type != event_type:
+                return None
+            if event_type == Xlib.X.CreateNotify:
+                watched = event.parent.id
+            else:
+                watched = event.window.id
+            if watched not in window_ids:
+                return None
+            return cast(int, event.window.id)
+
+        def handle(event: Any) -> None:
+            ctx.window_stack.replace([event.window.id])
+            try:
+                run_chain(
+                    ctx.connection,
+                    args_list,
+                    ctx.window_stack,
+                    output=ctx.output,
+                )
+            except Exception:
+                # Keep watching; a window may well be gone by the time the
+                # chain runs.
+                traceback.print_exc(file=sys.stderr)
+            ctx.output.flush()
+
+        ctx.xdo.select_events(window_ids, event_mask)
+        ctx.xdo.run_event_loop(handle, key)
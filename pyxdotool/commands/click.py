@@ -0,0 +1,34 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.xdo import DEFAULT_CLICK_DELAY
+
+
+class ClickCommand(BaseCommand):
+    names = ["click"]
+    description = (
+        "Send a click, that is, a mousedown followed by mouseup for the "
+        "given button. Generally, left = 1, middle = 2, right = 3, wheel "
+        "up = 4, wheel down = 5."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="repeat the click this many times (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=DEFAULT_CLICK_DELAY * 1000,
+            metavar="MILLISECONDS",
+            help="delay between clicks (default: %(default)s)",
+        )
+        parser.add_argument("button", type=int, help="button to click")
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        ctx.xdo.click(ctx.args.button, ctx.args.repeat, ctx.args.delay / 1000)
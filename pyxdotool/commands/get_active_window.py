@@ -11,4 +11,4 @@ class GetActiveWindowCommand(BaseCommand):
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        ctx.window_stack.append(ctx.xdo.get_active_window())
+        ctx.window_stack.push(ctx.xdo.get_active_window())
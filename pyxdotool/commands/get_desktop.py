@@ -7,4 +7,5 @@ class GetDesktopCommand(BaseCommand):
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        print(ctx.xdo.get_current_desktop())
+        desktop = ctx.xdo.get_current_desktop()
+        ctx.output.record({"desktop": desktop}, str(desktop))
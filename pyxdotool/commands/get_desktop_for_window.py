@@ -1,6 +1,7 @@
 import argparse
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
 
 
 class GetDesktopForWindowCommand(BaseCommand):
@@ -15,16 +16,15 @@ class GetDesktopForWindowCommand(BaseCommand):
     def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
         parser.add_argument(
             "window_id",
-            type=int,
+            type=window_selector,
             help="window id to get desktop for",
             nargs="?",
         )
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        try:
-            window_id = ctx.args.window_id or ctx.window_stack.pop()
-        except IndexError as ex:
-            raise IndexError("Must specify window") from ex
-
-        print(ctx.xdo.get_desktop_for_window(window_id))
+        for window_id in ctx.window_stack.select(ctx.args.window_id):
+            desktop = ctx.xdo.get_desktop_for_window(window_id)
+            ctx.output.record(
+                {"window": window_id, "desktop": desktop}, str(desktop)
+            )
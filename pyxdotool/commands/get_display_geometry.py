@@ -0,0 +1,81 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+
+
+class GetDisplayGeometryCommand(BaseCommand):
+    names = ["getdisplaygeometry"]
+    description = "Get the current screen dimensions, as 'WIDTH HEIGHT'."
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--screen",
+            type=int,
+            default=0,
+            help="screen to get the dimensions of (default: %(default)s)",
+        )
+        group.add_argument(
+            "--all-screens",
+            action="store_true",
+            help=(
+                "output the number, dimensions and position of every screen, "
+                "one per line"
+            ),
+        )
+        parser.add_argument(
+            "-s",
+            "--shell",
+            dest="shell_output",
+            help="Output values suitable for 'eval' in a shell.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "-p",
+            "--prefix",
+            help="use prefix for shell variables names",
+            default="",
+        )
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        # All the screens come from a single Xinerama query.
+        screens = ctx.xdo.query_screens()
+        if ctx.args.all_screens:
+            selected = screens
+        else:
+            try:
+                selected = [screens[ctx.args.screen]]
+            except IndexError as ex:
+                raise IndexError(f"Invalid screen {ctx.args.screen!r}") from ex
+
+        prefix = ctx.args.prefix
+        for screen in selected:
+            fields = {
+                "screen": screen.num,
+                "width": screen.width,
+                "height": screen.height,
+                "x": screen.x,
+                "y": screen.y,
+            }
+            if not ctx.args.all_screens:
+                if ctx.args.shell_output:
+                    text = (
+                        f"{prefix}WIDTH={screen.width}\n"
+                        f"{prefix}HEIGHT={screen.height}"
+                    )
+                else:
+                    text = f"{screen.width} {screen.height}"
+            elif ctx.args.shell_output:
+                text = "\n".join(
+                    f"{prefix}SCREEN{screen.num}_{name.upper()}={value}"
+                    for name, value in fields.items()
+                    if name != "screen"
+                )
+            else:
+                text = (
+                    f"{screen.num} {screen.width} {screen.height} "
+                    f"{screen.x} {screen.y}"
+                )
+            ctx.output.record(fields, text)
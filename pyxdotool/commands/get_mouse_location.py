@@ -0,0 +1,54 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.xdo import XdoSearchDirection
+
+
+class GetMouseLocationCommand(BaseCommand):
+    names = ["getmouselocation"]
+    description = (
+        "Outputs the x, y, screen, and window id of the mouse cursor. "
+        "Screen numbers will be nonzero if you have multiple monitors and "
+        "are not using Xinerama. The window is also put on the window stack."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "-s",
+            "--shell",
+            dest="shell_output",
+            help="Output values suitable for 'eval' in a shell.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "-p",
+            "--prefix",
+            help="use prefix for shell variables names",
+            default="",
+        )
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        x, y, screen, window_id = ctx.xdo.get_mouse_location()
+        if window_id:
+            window_id = (
+                ctx.xdo.find_window_client(
+                    window_id, XdoSearchDirection.CHILDREN
+                )
+                or window_id
+            )
+
+        fields = {"x": x, "y": y, "screen": screen, "window": window_id}
+        if ctx.args.shell_output:
+            text = "\n".join(
+                f"{ctx.args.prefix}{name.upper()}={value}"
+                for name, value in fields.items()
+            )
+        else:
+            text = " ".join(
+                f"{name}:{value}" for name, value in fields.items()
+            )
+        ctx.output.record(fields, text)
+
+        ctx.window_stack.push(window_id)
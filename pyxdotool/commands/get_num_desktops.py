@@ -7,4 +7,5 @@ class GetNumberOfDesktopsCommand(BaseCommand):
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        print(ctx.xdo.get_number_of_desktops())
+        num_desktops = ctx.xdo.get_number_of_desktops()
+        ctx.output.record({"desktops": num_desktops}, str(num_desktops))
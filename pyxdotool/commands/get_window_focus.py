@@ -32,7 +32,7 @@ class GetWindowFocusCommand(BaseCommand):
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        ctx.window_stack.append(
+        ctx.window_stack.push(
             ctx.xdo.get_focused_window_sane()
             if ctx.args.get_toplevel_focus
             else ctx.xdo.get_focused_window()
@@ -1,6 +1,7 @@
 import argparse
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
 
 
 class GetWindowGeometryCommand(BaseCommand):
@@ -13,7 +14,7 @@ class GetWindowGeometryCommand(BaseCommand):
     def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
         parser.add_argument(
             "window_id",
-            type=int,
+            type=window_selector,
             help="window id to set desktop for",
             nargs="?",
         )
@@ -33,25 +34,27 @@ class GetWindowGeometryCommand(BaseCommand):
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        if ctx.args.window_id:
-            window_ids = [ctx.args.window_id]
-        elif ctx.window_stack:
-            window_ids = ctx.window_stack[:]
-            ctx.window_stack[:] = []
-        else:
-            raise IndexError("Must specify window")
+        window_ids = ctx.window_stack.select(ctx.args.window_id, take_all=True)
 
-        for window_id in window_ids:
-            win_w, win_h = ctx.xdo.get_window_size(window_id)
-            win_x, win_y, screen_id = ctx.xdo.get_window_location(window_id)
+        for geometry in ctx.xdo.get_geometries(window_ids):
+            fields = {
+                "window": geometry.window_id,
+                "x": geometry.x,
+                "y": geometry.y,
+                "width": geometry.width,
+                "height": geometry.height,
+                "screen": geometry.screen,
+            }
             if ctx.args.shell_output:
-                print(f"{ctx.args.prefix}WINDOW={window_id}")
-                print(f"{ctx.args.prefix}X={win_x}")
-                print(f"{ctx.args.prefix}Y={win_y}")
-                print(f"{ctx.args.prefix}WIDTH={win_w}")
-                print(f"{ctx.args.prefix}HEIGHT={win_h}")
-                print(f"{ctx.args.prefix}SCREEN={screen_id}")
+                text = "\n".join(
+                    f"{ctx.args.prefix}{name.upper()}={value}"
+                    for name, value in fields.items()
+                )
             else:
-                print(f"Window {window_id}")
-                print(f"  Position: {win_x},{win_y} (screen: {screen_id})")
-                print(f"  Geometry: {win_w}x{win_h}")
+                text = (
+                    f"Window {geometry.window_id}\n"
+                    f"  Position: {geometry.x},{geometry.y} "
+                    f"(screen: {geometry.screen})\n"
+                    f"  Geometry: {geometry.width}x{geometry.height}"
+                )
+            ctx.output.record(fields, text)
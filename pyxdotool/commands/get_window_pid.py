@@ -1,6 +1,7 @@
 import argparse
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
 
 
 class GetWindowPidCommand(BaseCommand):
@@ -19,16 +20,13 @@ class GetWindowPidCommand(BaseCommand):
     def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
         parser.add_argument(
             "window_id",
-            type=int,
+            type=window_selector,
             help="window id to get the PID of",
             nargs="?",
         )
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        try:
-            window_id = ctx.args.window_id or ctx.window_stack.pop()
-        except IndexError as ex:
-            raise IndexError("Must specify window") from ex
-
-        print(ctx.xdo.get_window_pid(window_id))
+        for window_id in ctx.window_stack.select(ctx.args.window_id):
+            pid = ctx.xdo.get_window_pid(window_id)
+            ctx.output.record({"window": window_id, "pid": pid}, str(pid))
@@ -0,0 +1,63 @@
+import argparse
+import time
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.xdo import DEFAULT_KEY_DELAY
+
+
+def add_keysequence_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=DEFAULT_KEY_DELAY * 1000,
+        metavar="MILLISECONDS",
+        help="delay between keystrokes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "keysequence",
+        nargs="+",
+        help=(
+            "key name or combination, such as 'alt+r', 'Control_L+J', "
+            "'ctrl+alt+n' or 'BackSpace'"
+        ),
+    )
+
+
+class KeyCommand(BaseCommand):
+    names = ["key"]
+    ends_at_command_name = True
+    description = (
+        "Type a given keystroke. Examples being 'alt+r', 'Control_L+J', "
+        "'ctrl+alt+n', 'BackSpace'.\n"
+        "\n"
+        "Generally, any valid X Keysym string will work. Multiple keys are "
+        "separated by '+'. Aliases exist for 'alt', 'ctrl', 'shift', "
+        "'super', and 'meta' which all map to Foo_L, such as Alt_L and "
+        "Control_L, etc."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        add_keysequence_arguments(parser)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="number of times to repeat the key sequence",
+        )
+        parser.add_argument(
+            "--repeat-delay",
+            type=float,
+            default=0,
+            metavar="MILLISECONDS",
+            help="delay between repetitions",
+        )
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        for i in range(ctx.args.repeat):
+            if i and ctx.args.repeat_delay:
+                time.sleep(ctx.args.repeat_delay / 1000)
+            ctx.xdo.send_keysequence(
+                ctx.args.keysequence, ctx.args.delay / 1000
+            )
@@ -0,0 +1,23 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.commands.key import add_keysequence_arguments
+
+
+class KeyDownCommand(BaseCommand):
+    names = ["keydown"]
+    ends_at_command_name = True
+    description = (
+        "Same as above, except only keydown (press) events are sent. See "
+        '"key".'
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        add_keysequence_arguments(parser)
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        ctx.xdo.send_keysequence(
+            ctx.args.keysequence, ctx.args.delay / 1000, release=False
+        )
@@ -0,0 +1,16 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+
+
+class MouseDownCommand(BaseCommand):
+    names = ["mousedown"]
+    description = "Same as click, except only a mouse down is sent."
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("button", type=int, help="button to press")
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        ctx.xdo.mouse_down(ctx.args.button)
@@ -0,0 +1,107 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.mouse import PATHS, polar_to_cartesian
+from pyxdotool.window_stack import window_selector
+from pyxdotool.xdo import DEFAULT_MOTION_RATE
+
+
+def add_motion_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--polar",
+        action="store_true",
+        help=(
+            "use polar coordinates: x is the angle in degrees (0 is north, "
+            "increasing clockwise) and y the distance"
+        ),
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help=(
+            "after sending the mouse move request, check that the mouse "
+            "was actually moved"
+        ),
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=0,
+        metavar="MILLISECONDS",
+        help="move along a path taking this long instead of jumping",
+    )
+    parser.add_argument(
+        "--path",
+        choices=PATHS,
+        default="linear",
+        help="shape of the path, with --duration (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_MOTION_RATE,
+        metavar="HZ",
+        help="motion events per second, with --duration (default: %(default)s)",
+    )
+
+
+class MouseMoveCommand(BaseCommand):
+    names = ["mousemove"]
+    description = (
+        "Move the mouse to the specific X and Y coordinates on the screen."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        add_motion_arguments(parser)
+        parser.add_argument(
+            "--screen",
+            type=int,
+            help=(
+                "move the mouse to the specified screen to move to. This is "
+                "only useful if you have multiple screens and ARE NOT using "
+                "Xinerama. The default is the current screen."
+            ),
+        )
+        parser.add_argument(
+            "--window",
+            type=window_selector,
+            help="specify a window to move relative to",
+        )
+        parser.add_argument("x", type=float)
+        parser.add_argument("y", type=float)
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        origin_x, origin_y = 0, 0
+        window_id = None
+        if ctx.args.window is not None:
+            window_id = ctx.window_stack.select(ctx.args.window)[0]
+            origin_x, origin_y, _ = ctx.xdo.get_window_location(window_id)
+
+        if ctx.args.polar:
+            if window_id is not None:
+                geometry = ctx.xdo.get_geometries([window_id])[0]
+                center = (
+                    origin_x + geometry.width // 2,
+                    origin_y + geometry.height // 2,
+                )
+            else:
+                screen_num = ctx.args.screen or 0
+                width, height = ctx.xdo.get_screen_size(screen_num)
+                screen_x, screen_y = ctx.xdo.get_screen_location(screen_num)
+                center = (screen_x + width // 2, screen_y + height // 2)
+            x, y = polar_to_cartesian(ctx.args.x, ctx.args.y, center)
+        else:
+            x = origin_x + int(ctx.args.x)
+            y = origin_y + int(ctx.args.y)
+
+        ctx.xdo.move_mouse(
+            x,
+            y,
+            screen=ctx.args.screen,
+            duration=ctx.args.duration / 1000,
+            path=ctx.args.path,
+            rate=ctx.args.rate,
+            sync=ctx.args.sync,
+        )
@@ -0,0 +1,36 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.commands.mouse_move import add_motion_arguments
+from pyxdotool.mouse import polar_to_cartesian
+
+
+class MouseMoveRelativeCommand(BaseCommand):
+    names = ["mousemove_relative"]
+    description = (
+        "Move the mouse x,y pixels relative to the current position of the "
+        "mouse cursor. Negative offsets need a '--' before them, such as "
+        "'mousemove_relative -- -20 15'."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        add_motion_arguments(parser)
+        parser.add_argument("x", type=float)
+        parser.add_argument("y", type=float)
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        if ctx.args.polar:
+            dx, dy = polar_to_cartesian(ctx.args.x, ctx.args.y, (0, 0))
+        else:
+            dx, dy = int(ctx.args.x), int(ctx.args.y)
+
+        ctx.xdo.move_mouse_relative(
+            dx,
+            dy,
+            duration=ctx.args.duration / 1000,
+            path=ctx.args.path,
+            rate=ctx.args.rate,
+            sync=ctx.args.sync,
+        )
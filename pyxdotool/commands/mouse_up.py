@@ -0,0 +1,16 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+
+
+class MouseUpCommand(BaseCommand):
+    names = ["mouseup"]
+    description = "Same as click, except only a mouse up is sent."
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("button", type=int, help="button to release")
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        ctx.xdo.mouse_up(ctx.args.button)
@@ -1,7 +1,11 @@
 import argparse
+import time
 from enum import Enum
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.xdo import XdoSearch
+
+SYNC_INTERVAL = 0.5
 
 
 class WindowSearchMode(Enum):
@@ -12,32 +16,137 @@ class WindowSearchMode(Enum):
 class SearchWindowCommand(BaseCommand):
     names = ["search"]
     description = """
+Search for windows with titles, names, or classes with a regular expression
+pattern. The output is line-delimited list of X window identifiers. The
+result is saved to the window stack for future chained commands.
+
 If none of --name, --classname, or --class are specified, the defaults are: --name --classname --class
 """.strip()
 
     @classmethod
     def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
         parser.add_argument("regexp")
-        parser.add_argument("--class", action="store_true")
-        parser.add_argument("--classname", action="store_true")
-        parser.add_argument("--maxdepth", type=int, metavar="N")
-        parser.add_argument("--onlyvisible", action="store_true")
-        parser.add_argument("--pid", type=int)
-        parser.add_argument("--screen", type=int, metavar="N")
-        parser.add_argument("--desktop", type=int, metavar="N")
-        parser.add_argument("--limit", type=int, metavar="N")
-        parser.add_argument("--name", action="store_true")
-        parser.add_argument("--shell", action="store_true")
-        parser.add_argument("--prefix", metavar="STR")
-        parser.add_argument("--title", action="store_true")
         parser.add_argument(
-            "--all", action="store_const", const=WindowSearchMode.ANY
+            "--class",
+            dest="winclass",
+            action="store_true",
+            help="match against the window class",
         )
         parser.add_argument(
-            "--any", action="store_const", const=WindowSearchMode.ALL
+            "--classname",
+            action="store_true",
+            help="match against the window classname",
+        )
+        parser.add_argument(
+            "--maxdepth",
+            type=int,
+            metavar="N",
+            help=(
+                "set recursion/child search depth. The default is to search "
+                "the whole tree, 1 means only toplevel windows"
+            ),
+        )
+        parser.add_argument(
+            "--onlyvisible",
+            action="store_true",
+            help="show only visible windows in the results",
+        )
+        parser.add_argument(
+            "--pid", type=int, help="match windows that belong to a process"
+        )
+        parser.add_argument(
+            "--screen",
+            type=int,
+            metavar="N",
+            help="select windows only on a specific X screen",
+        )
+        parser.add_argument(
+            "--desktop",
+            type=int,
+            metavar="N",
+            help="only match windows on a certain desktop",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            metavar="N",
+            help="stop searching after finding N matching windows",
+        )
+        parser.add_argument(
+            "--name",
+            action="store_true",
+            help="match against the window name",
+        )
+        parser.add_argument(
+            "--shell",
+            action="store_true",
+            help="output the results as a shell array",
+        )
+        parser.add_argument(
+            "--prefix",
+            metavar="STR",
+            default="",
+            help="use prefix for shell variables names",
+        )
+        parser.add_argument(
+            "--title",
+            action="store_true",
+            help="deprecated, same as --name",
+        )
+        parser.add_argument(
+            "--all",
+            dest="search_mode",
+            action="store_const",
+            const=WindowSearchMode.ALL,
+            default=WindowSearchMode.ANY,
+            help="require that all conditions be met",
+        )
+        parser.add_argument(
+            "--any",
+            dest="search_mode",
+            action="store_const",
+            const=WindowSearchMode.ANY,
+            help="match windows that match any condition (default)",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="block until there are results",
         )
-        parser.add_argument("--sync", action="store_true")
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        pass
+        use_name = ctx.args.name or ctx.args.title
+        use_class = ctx.args.winclass
+        use_classname = ctx.args.classname
+        if not (use_name or use_class or use_classname):
+            use_name = use_class = use_classname = True
+
+        search = XdoSearch(
+            name=ctx.args.regexp if use_name else None,
+            winclass=ctx.args.regexp if use_class else None,
+            winclassname=ctx.args.regexp if use_classname else None,
+            pid=ctx.args.pid,
+            desktop=ctx.args.desktop,
+            screen=ctx.args.screen,
+            max_depth=ctx.args.maxdepth,
+            limit=ctx.args.limit,
+            only_visible=ctx.args.onlyvisible,
+            require_all=ctx.args.search_mode == WindowSearchMode.ALL,
+        )
+
+        while True:
+            window_ids = ctx.xdo.search_windows(search)
+            if window_ids or not ctx.args.sync:
+                break
+            time.sleep(SYNC_INTERVAL)
+
+        if ctx.args.shell:
+            ctx.output.record(
+                {"windows": window_ids},
+                f"{ctx.args.prefix}WINDOWS=("
+                + " ".join(map(str, window_ids))
+                + ")",
+            )
+
+        ctx.window_stack.replace(window_ids)
@@ -0,0 +1,24 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+
+
+class SelectWindowCommand(BaseCommand):
+    names = ["selectwindow"]
+    description = (
+        "Get the window id of a window by clicking on it. The result is "
+        'saved to the window stack. See "WINDOW STACK" for more details.'
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            metavar="SECONDS",
+            help="give up waiting for a click after this many seconds",
+        )
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        ctx.window_stack.push(ctx.xdo.select_window(ctx.args.timeout))
@@ -1,6 +1,8 @@
 import argparse
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
+from pyxdotool.xdo import DEFAULT_TIMEOUT, XdoError
 
 
 class SetDesktopForWindowCommand(BaseCommand):
@@ -15,21 +17,38 @@ class SetDesktopForWindowCommand(BaseCommand):
     def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
         parser.add_argument(
             "window_id",
-            type=int,
+            type=window_selector,
             help="window id to set desktop for",
             nargs="?",
         )
         parser.add_argument("desktop", type=int, help="desktop to set")
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help=(
+                "After sending the requests, wait until all the windows are "
+                "actually moved."
+            ),
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=DEFAULT_TIMEOUT,
+            metavar="SECONDS",
+            help="give up waiting for --sync after this many seconds",
+        )
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        if ctx.args.window_id:
-            window_ids = [ctx.args.window_id]
-        elif ctx.window_stack:
-            window_ids = ctx.window_stack[:]
-            ctx.window_stack[:] = []
-        else:
-            raise IndexError("Must specify window")
+        window_ids = ctx.window_stack.select(ctx.args.window_id, take_all=True)
 
-        for window_id in window_ids:
-            ctx.xdo.set_desktop_for_window(window_id, ctx.args.desktop)
+        if not ctx.xdo.set_desktop_for_windows(
+            window_ids,
+            ctx.args.desktop,
+            sync=ctx.args.sync,
+            timeout=ctx.args.timeout,
+        ):
+            raise XdoError(
+                "Timed out waiting for the windows to move to desktop "
+                f"{ctx.args.desktop}"
+            )
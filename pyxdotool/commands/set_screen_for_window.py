@@ -1,6 +1,8 @@
 import argparse
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
+from pyxdotool.xdo import DEFAULT_TIMEOUT, XdoError
 
 
 class SetScreenForWindowCommand(BaseCommand):
@@ -15,7 +17,7 @@ class SetScreenForWindowCommand(BaseCommand):
     def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
         parser.add_argument(
             "window_id",
-            type=int,
+            type=window_selector,
             help="window id to set screen for",
             nargs="?",
         )
@@ -28,49 +30,31 @@ class SetScreenForWindowCommand(BaseCommand):
                 "move relative to the current screen."
             ),
         )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help=(
+                "After sending the requests, wait until all the windows are "
+                "actually moved."
+            ),
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=DEFAULT_TIMEOUT,
+            metavar="SECONDS",
+            help="give up waiting for --sync after this many seconds",
+        )
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        if ctx.args.window_id:
-            window_ids = [ctx.args.window_id]
-        elif ctx.window_stack:
-            window_ids = ctx.window_stack[:]
-            ctx.window_stack[:] = []
-        else:
-            raise IndexError("Must specify window")
-
-        screens = ctx.xdo.query_screens()
-
-        for window_id in window_ids:
-            win_w, win_h = ctx.xdo.get_window_size(window_id)
-            win_x, win_y, screen_id = ctx.xdo.get_window_location(window_id)
-
-            source_screen = screens[screen_id]
-            if ctx.args.relative:
-                target_screen = screens[
-                    (screen_id + ctx.args.screen) % len(screens)
-                ]
-            else:
-                try:
-                    target_screen = screens[ctx.args.screen]
-                except IndexError:
-                    raise IndexError(f"Invalid screen {screen_id}") from ex
-
-            if source_screen == target_screen:
-                continue
-
-            target_x = int(
-                target_screen.x
-                + target_screen.width
-                * (win_x + win_w / 2 - source_screen.x)
-                / source_screen.width
-                - win_w / 2
-            )
-            target_y = int(
-                target_screen.y
-                + target_screen.height
-                * (win_y + win_h / 2 - source_screen.y)
-                / source_screen.height
-                - win_h / 2
-            )
-            ctx.xdo.move_window(window_id, target_x, target_y)
+        window_ids = ctx.window_stack.select(ctx.args.window_id, take_all=True)
+
+        if not ctx.xdo.set_screen_for_windows(
+            window_ids,
+            ctx.args.screen,
+            relative=ctx.args.relative,
+            sync=ctx.args.sync,
+            timeout=ctx.args.timeout,
+        ):
+            raise XdoError("Timed out waiting for the windows to move")
@@ -0,0 +1,29 @@
+import argparse
+
+from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.xdo import DEFAULT_KEY_DELAY
+
+
+class TypeCommand(BaseCommand):
+    names = ["type"]
+    description = (
+        "Types as if you had typed it. Supports newlines and tabs (ASCII "
+        "newline and tab). Each character is typed with a separate "
+        "keystroke; characters missing from the keyboard are temporarily "
+        "bound to unused keycodes."
+    )
+
+    @classmethod
+    def decorate_arg_parser(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=DEFAULT_KEY_DELAY * 1000,
+            metavar="MILLISECONDS",
+            help="delay between keystrokes (default: %(default)s)",
+        )
+        parser.add_argument("text", nargs="+", help="text to type")
+
+    @classmethod
+    def run(cls, ctx: CommandContext) -> None:
+        ctx.xdo.enter_text("".join(ctx.args.text), ctx.args.delay / 1000)
@@ -1,6 +1,8 @@
 import argparse
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
+from pyxdotool.xdo import DEFAULT_TIMEOUT, XdoError
 
 
 class WindowActivateCommand(BaseCommand):
@@ -28,16 +30,26 @@ class WindowActivateCommand(BaseCommand):
             ),
         )
         parser.add_argument(
-            "window_id", type=int, help="window id to activate", nargs="?"
+            "--timeout",
+            type=float,
+            default=DEFAULT_TIMEOUT,
+            metavar="SECONDS",
+            help="give up waiting for --sync after this many seconds",
+        )
+        parser.add_argument(
+            "window_id",
+            type=window_selector,
+            help="window id to activate",
+            nargs="?",
         )
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        try:
-            window_id = ctx.args.window_id or ctx.window_stack.pop()
-        except IndexError as ex:
-            raise IndexError("Must specify window") from ex
-
-        ctx.xdo.activate_window(window_id)
-        if ctx.args.sync:
-            ctx.xdo.wait_for_window_active(window_id, active=True)
+        for window_id in ctx.window_stack.select(ctx.args.window_id):
+            if not ctx.xdo.activate_window(
+                window_id, sync=ctx.args.sync, timeout=ctx.args.timeout
+            ):
+                raise XdoError(
+                    f"Timed out waiting for window {window_id} to be "
+                    "activated"
+                )
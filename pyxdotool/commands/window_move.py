@@ -2,6 +2,8 @@ import argparse
 import re
 
 from pyxdotool.commands.base import BaseCommand, CommandContext
+from pyxdotool.window_stack import window_selector
+from pyxdotool.xdo import DEFAULT_TIMEOUT, XdoError
 
 
 class WindowMoveCommand(BaseCommand):
@@ -23,11 +25,19 @@ CHAINING" for more details.
             "--sync",
             action="store_true",
             help=(
-                "After sending the window activation, wait until the window "
-                "is actually activated. This is useful for scripts that "
-                "depend on actions being completed before moving on."
+                "After sending the window move request, wait until the "
+                "window is actually moved. If no movement is necessary, we "
+                "will not wait. This is useful for scripts that depend on "
+                "actions being completed before moving on."
             ),
         )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=DEFAULT_TIMEOUT,
+            metavar="SECONDS",
+            help="give up waiting for --sync after this many seconds",
+        )
         parser.add_argument(
             "--relative",
             action="store_true",
@@ -40,20 +50,25 @@ CHAINING" for more details.
             help="screen id for percentage calculations",
         )
         parser.add_argument(
-            "window_id", type=int, help="window id to activate", nargs="?"
+            "window_id",
+            type=window_selector,
+            help="window id to move",
+            nargs="?",
         )
         parser.add_argument("x")
         parser.add_argument("y")
 
     @classmethod
     def run(cls, ctx: CommandContext) -> None:
-        try:
-            window_id = ctx.args.window_id or ctx.window_stack.pop()
-        except IndexError as ex:
-            raise IndexError("Must specify window") from ex
+        for window_id in ctx.window_stack.select(ctx.args.window_id):
+            cls.move(ctx, window_id)
 
-        orig_x, orig_y, screen_id = ctx.xdo.get_window_location(window_id)
-        orig_w, orig_h = ctx.xdo.get_window_size(window_id)
+    @classmethod
+    def move(cls, ctx: CommandContext, window_id: int) -> None:
+        geometry = ctx.xdo.get_geometries([window_id])[0]
+        orig_x, orig_y = geometry.x, geometry.y
+        orig_w, orig_h = geometry.width, geometry.height
+        screen_id = geometry.screen
 
         if ctx.args.screen_id:
             screen_id = ctx.args.screen_id
@@ -86,17 +101,11 @@ CHAINING" for more details.
         ctx.xdo.move_window(window_id, target_x, target_y)
 
         if ctx.args.sync and (target_x != orig_x or target_y != orig_y):
-            # Permit imprecision to account for window borders and titlebar
-            new_x = float("Inf")
-            new_y = float("Inf")
-            while (
-                orig_x == new_x
-                and orig_y == new_y
-                and abs(target_x - new_x) > 10
-                and abs(target_y - new_y) > 50
+            if not ctx.xdo.wait_for_window_move(
+                window_id, orig_x, orig_y, timeout=ctx.args.timeout
             ):
-                new_x, new_y, screen_id = ctx.xdo.get_window_location(
-                    window_id
+                raise XdoError(
+                    f"Timed out waiting for window {window_id} to move"
                 )
 
     @staticmethod
@@ -0,0 +1,160 @@
+import io
+import os
+import select
+import socket
+import stat
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from typing import Any
+
+from pyxdotool.chain import parse_args, run_chain
+from pyxdotool.client import (
+    decode_message,
+    encode_message,
+    fallback_runtime_dir,
+)
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.output import FORMATS, OutputSink
+from pyxdotool.window_stack import WindowStack
+from pyxdotool.xdo import Xdo, XdoError
+
+# The daemon lives long enough for cached window properties to pay off.
+PROPERTY_CACHE_SIZE = 4096
+
+# Seconds a client may take to send a request or read a response, so that
+# a stuck client doesn't block the daemon.
+CONNECTION_TIMEOUT = 5.0
+
+
+def serve(xdo: Xdo, socket_path: str) -> None:
+    """Run command chains sent over a Unix socket, one at a time, sharing
+    the X connection and its caches between all of them.
+
+    Clients are served in turn: a chain that blocks, such as behave or a
+    --sync wait for a window that never shows up, holds up all the other
+    clients until it finishes.
+    """
+    socket_dir = os.path.dirname(socket_path)
+    if socket_dir == fallback_runtime_dir():
+        _make_private_dir(socket_dir)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        _bind(server, socket_path)
+        server.listen()
+        server_fd = server.fileno()
+        x_fd = xdo.xdpy.fileno()
+        try:
+            while True:
+                readable, _, _ = select.select([server_fd, x_fd], [], [])
+                if x_fd in readable:
+                    # Keep up with the events, so that the caches stay valid
+                    # and the server doesn't have to buffer them for us.
+                    xdo.process_events()
+                if server_fd in readable:
+                    conn, _ = server.accept()
+                    with conn:
+                        try:
+                            _handle_connection(xdo, conn)
+                        except OSError as ex:
+                            # Timed out or gone, the next client may be fine
+                            print(
+                                f"Client connection lost: {ex}",
+                                file=sys.stderr,
+                            )
+        finally:
+            os.unlink(socket_path)
+
+
+def _make_private_dir(path: str) -> None:
+    """Create a directory only the user can access, or make sure the
+    existing one is, as its name is predictable.
+    """
+    with suppress(FileExistsError):
+        os.mkdir(path, 0o700)
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        raise XdoError(f"{path} must be a directory private to the user")
+
+
+def _bind(server: socket.socket, socket_path: str) -> None:
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)  # stale socket of a dead daemon
+            else:
+                raise XdoError(f"A daemon is already running: {socket_path}")
+
+    umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+
+
+def _handle_connection(xdo: Xdo, conn: socket.socket) -> None:
+    conn.settimeout(CONNECTION_TIMEOUT)
+    with conn.makefile("rwb") as stream:
+        for line in stream:
+            try:
+                argv, output_format = _parse_request(line)
+            except ValueError as ex:
+                response = {
+                    "status": 1,
+                    "stdout": "",
+                    "stderr": f"Error: Invalid request: {ex}\n",
+                }
+            else:
+                response = _execute(xdo, argv, output_format)
+            stream.write(encode_message(response))
+            stream.flush()
+
+
+def _parse_request(line: bytes) -> tuple[list[str], str]:
+    try:
+        request = decode_message(line)
+    except (TypeError, ValueError) as ex:
+        raise ValueError(f"not a JSON object: {ex}") from ex
+    argv = request.get("argv")
+    if not isinstance(argv, list) or not all(
+        isinstance(arg, str) for arg in argv
+    ):
+        raise ValueError("argv must be a list of strings")
+    output_format = request.get("format", "text")
+    if output_format not in FORMATS:
+        raise ValueError(f"unknown format {output_format!r}")
+    return argv, output_format
+
+
+def _execute(xdo: Xdo, argv: list[str], output_format: str) -> dict[str, Any]:
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            output = OutputSink(stdout, output_format)
+            window_stack = WindowStack()
+            run_chain(
+                LazyXdo(lambda: xdo),
+                list(parse_args(argv)),
+                window_stack,
+                output=output,
+            )
+            output.write_windows(window_stack)
+            output.flush()
+        except SystemExit as ex:
+            # argparse exits on invalid arguments
+            status = ex.code if isinstance(ex.code, int) else 1
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            status = 1
+    return {
+        "status": status,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
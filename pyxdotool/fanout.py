@@ -0,0 +1,89 @@
+import argparse
+import io
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from pyxdotool.chain import run_chain
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.output import OutputSink
+from pyxdotool.window_stack import WindowStack
+from pyxdotool.xdo import Xdo
+
+
+@dataclass
+class DisplayResult:
+    display: str
+    output: str
+    error: Optional[str] = None
+
+
+def run_on_displays(
+    display_names: Iterable[str],
+    args_list: list[argparse.Namespace],
+    max_workers: Optional[int] = None,
+    output_format: str = "text",
+) -> list[DisplayResult]:
+    """Run the same command chain against many displays concurrently, each
+    over its own connection, and return the results in the order of the
+    displays.
+
+    Most of the time is spent waiting for the servers, which doesn't hold
+    the GIL, so threads are enough.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                lambda display_name: _run_on_display(
+                    display_name, args_list, output_format
+                ),
+                display_names,
+            )
+        )
+
+
+def _run_on_display(
+    display_name: str,
+    args_list: list[argparse.Namespace],
+    output_format: str,
+) -> DisplayResult:
+    buffer = io.StringIO()
+    # JSON records say which display they come from themselves.
+    output = OutputSink(buffer, output_format, {"display": display_name})
+    connection = LazyXdo(lambda: Xdo(display_name))
+    window_stack = WindowStack()
+    try:
+        run_chain(connection, args_list, window_stack, output=output)
+        output.write_windows(window_stack)
+        output.flush()
+    except Exception as ex:
+        output.flush()
+        error = "".join(traceback.format_exception_only(ex)).strip()
+        return DisplayResult(display_name, buffer.getvalue(), error)
+    finally:
+        connection.close()
+    return DisplayResult(display_name, buffer.getvalue())
+
+
+def print_results(
+    results: list[DisplayResult], output_format: str = "text"
+) -> int:
+    """Print the output of every display, each text line prefixed with the
+    display name, and return the exit status.
+    """
+    output = OutputSink(sys.stdout, output_format)
+    status = 0
+    for result in results:
+        if output.jsonl:
+            output.write(result.output)
+        else:
+            for line in result.output.splitlines():
+                output.write(f"{result.display}\t{line}\n")
+        if result.error is not None:
+            status = 1
+            for line in result.error.splitlines():
+                print(f"{result.display}\t{line}", file=sys.stderr)
+    output.flush()
+    return status
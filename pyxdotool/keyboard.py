@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from typing import Optional
+
+import Xlib.X
+import Xlib.XK
+
+# Key names accepted on top of the keysym names, as in xdotool.
+KEY_ALIASES = {
+    "alt": "Alt_L",
+    "ctrl": "Control_L",
+    "control": "Control_L",
+    "meta": "Meta_L",
+    "super": "Super_L",
+    "shift": "Shift_L",
+}
+
+# Characters whose keysym isn't the one derived from their code point.
+CHAR_KEYSYMS = {
+    "\n": Xlib.XK.XK_Return,
+    "\r": Xlib.XK.XK_Return,
+    "\t": Xlib.XK.XK_Tab,
+    "\b": Xlib.XK.XK_BackSpace,
+    "\x1b": Xlib.XK.XK_Escape,
+}
+
+
+def char_to_keysym(char: str) -> int:
+    if char in CHAR_KEYSYMS:
+        return CHAR_KEYSYMS[char]
+    code_point = ord(char)
+    # Latin-1 keysyms have the value of the character, the others are the
+    # Unicode code point with a flag.
+    if 0x20 <= code_point <= 0x7E or 0xA0 <= code_point <= 0xFF:
+        return code_point
+    return 0x01000000 | code_point
+
+
+def name_to_keysym(name: str) -> Optional[int]:
+    keysym = Xlib.XK.string_to_keysym(KEY_ALIASES.get(name.lower(), name))
+    if keysym:
+        return int(keysym)
+    if len(name) == 1:
+        return char_to_keysym(name)
+    return None
+
+
+class XdoKeymap:
+    """Index of the keyboard mapping, to find the key and modifiers that
+    produce a keysym without asking the server.
+
+    Keysyms that aren't on the keyboard are bound, one at a time, to scratch
+    keycodes that have nothing bound to them. The least recently bound one
+    is reused first, so that applications have time to look up a binding
+    before it changes again.
+    """
+
+    def __init__(
+        self,
+        min_keycode: int,
+        keysyms: list[list[int]],
+        modifier_keycodes: list[list[int]],
+    ) -> None:
+        self._keys: dict[int, tuple[int, int]] = {}
+        self.scratch: OrderedDict[int, Optional[int]] = OrderedDict()
+        for keycode, keycode_keysyms in enumerate(keysyms, min_keycode):
+            if not any(keycode_keysyms):
+                self.scratch[keycode] = None
+                continue
+            # Index 0 is the unshifted keysym, index 1 the shifted one. The
+            # others need group switching, which isn't worth it: a scratch
+            # keycode does the job.
+            for index, keysym in enumerate(keycode_keysyms[:2]):
+                if keysym and keysym not in self._keys:
+                    self._keys[keysym] = (
+                        keycode,
+                        Xlib.X.ShiftMask if index else 0,
+                    )
+
+        shift_keycodes = [
+            keycode
+            for keycode in modifier_keycodes[Xlib.X.ShiftMapIndex]
+            if keycode
+        ]
+        self.shift_keycode = shift_keycodes[0] if shift_keycodes else None
+
+    def lookup(self, keysym: int) -> Optional[tuple[int, int]]:
+        """Return the keycode and the modifier mask producing the keysym,
+        or None if it isn't on the keyboard.
+        """
+        ret = self._keys.get(keysym)
+        if ret is None:
+            for keycode, bound_keysym in self.scratch.items():
+                if bound_keysym == keysym:
+                    self.scratch.move_to_end(keycode)
+                    return keycode, 0
+        return ret
+
+    def next_scratch_keycode(self) -> Optional[int]:
+        """Return the least recently bound scratch keycode."""
+        return next(iter(self.scratch), None)
+
+    def bind_scratch_keycode(self, keycode: int, keysym: int) -> None:
+        self.scratch[keycode] = keysym
+        self.scratch.move_to_end(keycode)
+
+    def unbind_scratch_keycode(self, keycode: int) -> None:
+        self.scratch[keycode] = None
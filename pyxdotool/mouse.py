@@ -0,0 +1,60 @@
+import math
+from typing import Callable
+
+Point = tuple[int, int]
+
+
+def linear_path(start: Point, end: Point, steps: int) -> list[Point]:
+    """Return steps points evenly spaced on the segment, end included."""
+    (x0, y0), (x1, y1) = start, end
+    return [
+        (round(x0 + (x1 - x0) * i / steps), round(y0 + (y1 - y0) * i / steps))
+        for i in range(1, steps + 1)
+    ]
+
+
+def bezier_path(
+    start: Point, end: Point, steps: int, bend: float = 0.25
+) -> list[Point]:
+    """Return steps points on a cubic Bézier curve from start to end, an
+    arc whose control points are pulled aside by bend times the distance,
+    which looks more like a hand moving the mouse than a straight line.
+    """
+    (x0, y0), (x3, y3) = start, end
+    dx, dy = x3 - x0, y3 - y0
+    # (-dy, dx) is perpendicular to the segment and as long as it.
+    x1, y1 = x0 + dx / 3 - dy * bend, y0 + dy / 3 + dx * bend
+    x2, y2 = x0 + 2 * dx / 3 - dy * bend, y0 + 2 * dy / 3 + dx * bend
+    points = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        a, b, c, d = (
+            (1 - t) ** 3,
+            3 * (1 - t) ** 2 * t,
+            3 * (1 - t) * t**2,
+            t**3,
+        )
+        points.append(
+            (
+                round(a * x0 + b * x1 + c * x2 + d * x3),
+                round(a * y0 + b * y1 + c * y2 + d * y3),
+            )
+        )
+    return points
+
+
+PATHS: dict[str, Callable[[Point, Point, int], list[Point]]] = {
+    "linear": linear_path,
+    "bezier": bezier_path,
+}
+
+
+def polar_to_cartesian(angle: float, distance: float, origin: Point) -> Point:
+    """Convert polar coordinates, with the angle in degrees clockwise from
+    north as in xdotool, to screen coordinates.
+    """
+    radians = math.radians(angle)
+    return (
+        round(origin[0] + distance * math.sin(radians)),
+        round(origin[1] - distance * math.cos(radians)),
+    )
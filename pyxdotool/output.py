@@ -0,0 +1,67 @@
+import json
+from typing import Any, Iterable, Optional, TextIO
+
+FORMATS = ("text", "jsonl")
+
+# Buffered output is written out once it grows past this many characters.
+BUFFER_SIZE = 1 << 16
+
+
+class OutputSink:
+    """Buffered output of the commands of a chain.
+
+    Query commands write records, which are rendered as their text or as
+    one JSON object per line depending on the format. Anything else written
+    with print() is passed through as is. The output reaches the stream in
+    large writes, when the buffer fills up or the chain ends.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        output_format: str = "text",
+        fields: Optional[dict[str, Any]] = None,
+    ) -> None:
+        if output_format not in FORMATS:
+            raise ValueError(f"Invalid output format {output_format!r}")
+        self.stream = stream
+        self.format = output_format
+        # Added to every JSON record, such as the display it comes from.
+        self.fields = fields or {}
+        self._buffer: list[str] = []
+        self._size = 0
+
+    @property
+    def jsonl(self) -> bool:
+        return self.format == "jsonl"
+
+    def write(self, text: str) -> int:
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= BUFFER_SIZE:
+            self._write_buffer()
+        return len(text)
+
+    def record(self, fields: dict[str, Any], text: str) -> None:
+        """Write a result, as text or as a JSON object of its fields."""
+        if self.jsonl:
+            self.write(
+                json.dumps({**self.fields, **fields}, separators=(",", ":"))
+                + "\n"
+            )
+        else:
+            self.write(text + "\n")
+
+    def write_windows(self, window_ids: Iterable[int]) -> None:
+        for window_id in window_ids:
+            self.record({"window": window_id}, str(window_id))
+
+    def _write_buffer(self) -> None:
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._size = 0
+
+    def flush(self) -> None:
+        self._write_buffer()
+        self.stream.flush()
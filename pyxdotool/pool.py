@@ -0,0 +1,209 @@
+import contextlib
+import threading
+import time
+import weakref
+from typing import Any, Iterator, Optional
+
+import Xlib.error
+
+from pyxdotool.xdo import (
+    ACTIVATE_WINDOW_ATOMS,
+    INDEXED_PROPERTIES,
+    MIRRORED_PROPERTIES,
+    Xdo,
+    XdoError,
+)
+
+DEFAULT_POOL_SIZE = 8
+
+# Atoms interned by every new connection before it is handed out.
+WARM_ATOMS = (
+    *ACTIVATE_WINDOW_ATOMS,
+    *MIRRORED_PROPERTIES,
+    *INDEXED_PROPERTIES,
+    "_NET_NUMBER_OF_DESKTOPS",
+)
+
+
+class _ThreadConnection:
+    """The connection of a thread, kept in its thread locals so that it is
+    returned to the pool once the thread is gone.
+    """
+
+    def __init__(self, pool: "XdoPool", xdo: Xdo) -> None:
+        self.xdo = xdo
+        self.release = weakref.finalize(self, pool._release, xdo)
+
+
+class XdoPool:
+    """Xdo connections to one display for use from many threads.
+
+    An Xdo, like the Xlib display under it, must only be used by one thread
+    at a time. The pool hands out connections either for the duration of a
+    with block, with lease, or to the calling thread until it exits, with
+    thread_connection, and opens at most max_size of them.
+
+    New connections are warmed up before being handed out: the common atoms
+    are interned and the window manager capabilities read. Atoms are the
+    same for every connection to a server, so only the first connection
+    interns them and the others copy them. A connection that the server
+    closed is dropped instead of being handed out again.
+    """
+
+    def __init__(
+        self,
+        display_name: Optional[str] = None,
+        max_size: int = DEFAULT_POOL_SIZE,
+        **xdo_kwargs: Any,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.display_name = display_name
+        self.max_size = max_size
+        self._xdo_kwargs = xdo_kwargs
+        self._condition = threading.Condition()
+        self._idle: list[Xdo] = []
+        self._size = 0
+        self._closed = False
+        self._atoms: dict[str, int] = {}
+        self._local = threading.local()
+
+    def __enter__(self) -> "XdoPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, leased or idle."""
+        return self._size
+
+    @contextlib.contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Xdo]:
+        """Lend a connection for the duration of the with block, waiting
+        up to timeout seconds if all of them are in use.
+        """
+        xdo = self._acquire(timeout)
+        try:
+            yield xdo
+        except Xlib.error.ConnectionClosedError:
+            self._discard(xdo)
+            raise
+        except BaseException:
+            # Errors of the caller's own don't make the connection unusable,
+            # _release drops it if it is broken.
+            self._release(xdo)
+            raise
+        else:
+            self._release(xdo)
+
+    def thread_connection(self, timeout: Optional[float] = None) -> Xdo:
+        """Return the connection of the calling thread, leasing one on the
+        first call. It stays with the thread until release_thread_connection
+        or until the thread exits.
+        """
+        connection: Optional[_ThreadConnection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is not None and self._is_broken(connection.xdo):
+            self._local.connection = None
+            connection.release.detach()
+            self._discard(connection.xdo)
+            connection = None
+        if connection is None:
+            connection = _ThreadConnection(self, self._acquire(timeout))
+            self._local.connection = connection
+        return connection.xdo
+
+    def release_thread_connection(self) -> None:
+        connection: Optional[_ThreadConnection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is not None:
+            self._local.connection = None
+            connection.release()
+
+    def close(self) -> None:
+        """Close the idle connections now and the leased ones when they are
+        returned.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for xdo in idle:
+            xdo.close()
+
+    def _acquire(self, timeout: Optional[float]) -> Xdo:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise XdoError("The connection pool is closed")
+                while self._idle:
+                    xdo = self._idle.pop()
+                    if not self._is_broken(xdo):
+                        return xdo
+                    self._size -= 1
+                    with contextlib.suppress(Exception):
+                        xdo.close()
+                if self._size < self.max_size:
+                    # Count the connection now so that other threads don't
+                    # open one too while this one is being opened.
+                    self._size += 1
+                    break
+                remaining = (
+                    None if deadline is None else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    raise XdoError(
+                        f"All {self.max_size} connections to "
+                        f"{self.display_name} are in use"
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            return self._connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _connect(self) -> Xdo:
+        xdo = Xdo(self.display_name, **self._xdo_kwargs)
+        with self._condition:
+            xdo._atoms.update(self._atoms)
+        if not xdo._atoms.keys() >= set(WARM_ATOMS):
+            xdo._intern_atoms(WARM_ATOMS)
+            with self._condition:
+                self._atoms.update(xdo._atoms)
+        # Read by each connection, which is from then on notified when the
+        # window manager changes them.
+        xdo._ewmh_is_supported("_NET_ACTIVE_WINDOW")
+        return xdo
+
+    def _release(self, xdo: Xdo) -> None:
+        if self._is_broken(xdo):
+            self._discard(xdo)
+            return
+        with self._condition:
+            if not self._closed:
+                self._idle.append(xdo)
+                self._condition.notify()
+                return
+            self._size -= 1
+        xdo.close()
+
+    def _discard(self, xdo: Xdo) -> None:
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        with contextlib.suppress(Exception):
+            xdo.close()
+
+    @staticmethod
+    def _is_broken(xdo: Xdo) -> bool:
+        return xdo.xdpy.display.socket_error is not None
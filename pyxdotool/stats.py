@@ -0,0 +1,113 @@
+import contextlib
+import inspect
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+if TYPE_CHECKING:
+    from pyxdotool.xdo import Xdo
+
+
+@dataclass
+class XdoScopeStats:
+    calls: int = 0
+    requests: int = 0
+    round_trips: int = 0
+    blocked_seconds: float = 0.0
+    requests_by_type: Counter[str] = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "requests": self.requests,
+            "round_trips": self.round_trips,
+            "blocked_ms": round(self.blocked_seconds * 1000, 3),
+            "requests_by_type": dict(self.requests_by_type),
+        }
+
+
+class XdoStats:
+    """Counts the requests sent over an Xdo connection, the round trips and
+    the time spent blocked on replies, both in total and per scope: every
+    public Xdo method, and whatever else is wrapped in scope(), such as
+    commands.
+
+    Scopes are inclusive: a request sent by get_desktop_for_window called
+    from activate_window is counted towards both methods.
+    """
+
+    def __init__(self) -> None:
+        self.total = XdoScopeStats()
+        self.scopes: dict[str, XdoScopeStats] = {}
+        self._active: list[XdoScopeStats] = []
+        # A blocking wait is a new round trip only if something was sent
+        # since the previous one; collecting the replies of pipelined
+        # requests is not.
+        self._sent_since_wait = False
+
+    def attach(self, xdo: "Xdo") -> None:
+        display = xdo.xdpy.display
+        send_request = display.send_request
+        send_and_recv = display.send_and_recv
+
+        def counted_send_request(
+            request: Any, wait_for_response: bool
+        ) -> None:
+            self._sent_since_wait = True
+            for scope in self._current_scopes():
+                scope.requests += 1
+                scope.requests_by_type[type(request).__name__] += 1
+            send_request(request, wait_for_response)
+
+        def timed_send_and_recv(*args: Any, **kwargs: Any) -> None:
+            if kwargs.get("request") is None:
+                send_and_recv(*args, **kwargs)
+                return
+            new_round_trip = self._sent_since_wait
+            self._sent_since_wait = False
+            start = time.perf_counter()
+            try:
+                send_and_recv(*args, **kwargs)
+            finally:
+                blocked = time.perf_counter() - start
+                for scope in self._current_scopes():
+                    scope.blocked_seconds += blocked
+                    scope.round_trips += new_round_trip
+
+        setattr(display, "send_request", counted_send_request)
+        setattr(display, "send_and_recv", timed_send_and_recv)
+
+        for name, method in inspect.getmembers(xdo, inspect.ismethod):
+            if not name.startswith("_"):
+                setattr(xdo, name, self._wrap(f"xdo.{name}", method))
+
+    def _current_scopes(self) -> list[XdoScopeStats]:
+        return [self.total] + self._active
+
+    def _wrap(
+        self, scope_name: str, method: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.scope(scope_name):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def scope(self, name: str) -> Iterator[XdoScopeStats]:
+        stats = self.scopes.setdefault(name, XdoScopeStats())
+        stats.calls += 1
+        self._active.append(stats)
+        try:
+            yield stats
+        finally:
+            self._active.pop()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total.as_dict(),
+            "scopes": {
+                name: stats.as_dict() for name, stats in self.scopes.items()
+            },
+        }
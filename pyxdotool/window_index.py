@@ -0,0 +1,144 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# Characters that make a pattern more than a literal substring.
+REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# Characters that re.IGNORECASE matches with an ASCII letter, mapped to it
+# one for one before casefold(), which turns some of them into two.
+ASCII_CASE_FOLDS = str.maketrans(
+    {"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"}
+)
+
+
+@dataclass
+class XdoIndexEntry:
+    name: str
+    classname: str
+    wm_class: str
+    pid: Optional[int]
+    desktop: Optional[int]
+
+
+def _fold(text: str) -> str:
+    return text.translate(ASCII_CASE_FOLDS).casefold()
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class _StringIndex:
+    """Windows by the value of a string attribute.
+
+    Patterns are matched against the distinct values rather than against
+    every window. For the window titles, which are mostly distinct, literal
+    patterns are first narrowed down with an index of the case-folded
+    trigrams of the values. Only ASCII patterns are narrowed down, as
+    re.IGNORECASE and casefold() don't agree on what matches the others.
+    """
+
+    def __init__(self, trigrams: bool = False) -> None:
+        self.windows: dict[str, set[int]] = {}
+        self._trigrams: Optional[dict[str, set[str]]] = (
+            {} if trigrams else None
+        )
+
+    def add(self, value: str, window_id: int) -> None:
+        windows = self.windows.get(value)
+        if windows is None:
+            windows = self.windows[value] = set()
+            if self._trigrams is not None:
+                for trigram in _trigrams(_fold(value)):
+                    self._trigrams.setdefault(trigram, set()).add(value)
+        windows.add(window_id)
+
+    def discard(self, value: str, window_id: int) -> None:
+        windows = self.windows.get(value)
+        if windows is None:
+            return
+        windows.discard(window_id)
+        if windows:
+            return
+        del self.windows[value]
+        if self._trigrams is not None:
+            for trigram in _trigrams(_fold(value)):
+                values = self._trigrams[trigram]
+                values.discard(value)
+                if not values:
+                    del self._trigrams[trigram]
+
+    def match(self, pattern: re.Pattern[str]) -> set[int]:
+        """Return the windows whose value pattern.search matches."""
+        values: Iterable[str] = self.windows
+        literal = _fold(pattern.pattern)
+        if (
+            self._trigrams is not None
+            and pattern.pattern.isascii()
+            and len(literal) >= 3
+            and not REGEX_SPECIAL_CHARS.intersection(literal)
+        ):
+            candidates: Optional[set[str]] = None
+            for trigram in _trigrams(literal):
+                found = self._trigrams.get(trigram, set())
+                candidates = (
+                    found.copy() if candidates is None else candidates & found
+                )
+                if not candidates:
+                    return set()
+            values = candidates or ()
+
+        windows: set[int] = set()
+        for value in values:
+            if pattern.search(value):
+                windows |= self.windows[value]
+        return windows
+
+
+class XdoWindowIndex:
+    """Windows by title, class, classname, pid and desktop, to answer
+    searches without walking the window tree.
+
+    Entries are refreshed by the owner of the index: windows whose indexed
+    properties changed are marked dirty, to be read again before the next
+    lookup.
+    """
+
+    def __init__(self) -> None:
+        self.entries: dict[int, XdoIndexEntry] = {}
+        self.dirty: set[int] = set()
+        self.names = _StringIndex(trigrams=True)
+        self.classnames = _StringIndex()
+        self.classes = _StringIndex()
+        self.pids: dict[int, set[int]] = {}
+        self.desktops: dict[int, set[int]] = {}
+
+    def update(self, window_id: int, entry: XdoIndexEntry) -> None:
+        self.remove(window_id)
+        self.entries[window_id] = entry
+        self.names.add(entry.name, window_id)
+        self.classnames.add(entry.classname, window_id)
+        self.classes.add(entry.wm_class, window_id)
+        if entry.pid is not None:
+            self.pids.setdefault(entry.pid, set()).add(window_id)
+        if entry.desktop is not None:
+            self.desktops.setdefault(entry.desktop, set()).add(window_id)
+
+    def remove(self, window_id: int) -> None:
+        self.dirty.discard(window_id)
+        entry = self.entries.pop(window_id, None)
+        if entry is None:
+            return
+        self.names.discard(entry.name, window_id)
+        self.classnames.discard(entry.classname, window_id)
+        self.classes.discard(entry.wm_class, window_id)
+        for key, windows in (
+            (entry.pid, self.pids),
+            (entry.desktop, self.desktops),
+        ):
+            if key is None:
+                continue
+            windows[key].discard(window_id)
+            if not windows[key]:
+                del windows[key]
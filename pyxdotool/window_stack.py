@@ -0,0 +1,95 @@
+import argparse
+import re
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+# A window id, or "%N" for the Nth window on the stack (negative counts
+# from the end) or "%@" for all of them.
+WindowSelector = Union[int, str]
+
+SELECTOR_RE = re.compile(r"%(@|-?[1-9][0-9]*)")
+
+
+def window_selector(value: str) -> WindowSelector:
+    """argparse type for window arguments."""
+    if SELECTOR_RE.fullmatch(value):
+        return value
+    try:
+        # Decimal ids may have leading zeros, which base 0 rejects
+        if value[:2].lower() == "0x":
+            window_id = int(value, 16)
+        else:
+            window_id = int(value)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(
+            f"invalid window: {value!r} (expected an id, %N or %@)"
+        ) from ex
+    # X ids are 32-bit, which is also what the stack's array holds.
+    if not 0 <= window_id < 2**32:
+        raise argparse.ArgumentTypeError(f"invalid window: {value!r}")
+    return window_id
+
+
+class WindowStack:
+    """The windows found by the previous commands of a chain.
+
+    Ids are kept in an unsigned int array rather than a list, so that large
+    search results don't cost a Python int per window while they are passed
+    along the chain.
+    """
+
+    def __init__(self, window_ids: Iterable[int] = ()) -> None:
+        self._ids = array("I", window_ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __getitem__(self, index: int) -> int:
+        return self._ids[index]
+
+    def push(self, window_id: int) -> None:
+        self._ids.append(window_id)
+
+    def replace(self, window_ids: Iterable[int]) -> None:
+        self._ids = array("I", window_ids)
+
+    def clear(self) -> None:
+        del self._ids[:]
+
+    def select(
+        self, selector: Optional[WindowSelector], take_all: bool = False
+    ) -> "array[int]":
+        """Return the windows a command applies to.
+
+        Without a selector, the command consumes the last window on the
+        stack, or the whole stack with take_all.
+        """
+        if selector is None:
+            if take_all:
+                selected = self._ids
+                self._ids = array("I")
+            elif self._ids:
+                selected = array("I", [self._ids.pop()])
+            else:
+                selected = array("I")
+        elif isinstance(selector, int):
+            selected = array("I", [selector])
+        elif selector == "%@":
+            selected = self._ids[:]
+        else:
+            index = int(selector[1:])
+            try:
+                window_id = self._ids[index - 1 if index > 0 else index]
+            except IndexError as ex:
+                raise IndexError(
+                    f"No window {selector} on the window stack "
+                    f"({len(self._ids)} windows)"
+                ) from ex
+            selected = array("I", [window_id])
+
+        if not selected:
+            raise IndexError("Must specify window")
+        return selected
@@ -0,0 +1,199 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+import Xlib.X
+
+
+def resource_id(value: Any) -> int:
+    """Return the id of a window field of a reply or an event, which
+    python-xlib leaves as the int 0 when it is None.
+    """
+    return int(getattr(value, "id", value or 0))
+
+
+@dataclass
+class XdoWindowNode:
+    window_id: int
+    parent: Optional[int]  # None for the roots
+    x: int = 0
+    y: int = 0
+    width: int = 0
+    height: int = 0
+    border_width: int = 0
+    mapped: bool = False
+    children: list[int] = field(default_factory=list)  # bottom to top
+    properties: dict[int, Any] = field(default_factory=dict)
+    # Whether the node was filled in with the replies of a crawl, after
+    # selecting its events; windows announced by CreateNotify aren't yet.
+    crawled: bool = False
+
+
+class XdoWindowTree:
+    """Mirror of the window hierarchy: parent/child links in stacking
+    order, geometry, map state and some properties of every window.
+
+    Once the windows have been crawled with their SubstructureNotify and
+    PropertyChange events selected, the events are enough to keep it
+    current.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: dict[int, XdoWindowNode] = {}
+        # Windows added since the last crawl, so that finding them doesn't
+        # take a look at every node.
+        self.uncrawled: set[int] = set()
+
+    def __contains__(self, window_id: int) -> bool:
+        return window_id in self.nodes
+
+    def get(self, window_id: int) -> Optional[XdoWindowNode]:
+        return self.nodes.get(window_id)
+
+    def add(self, window_id: int, parent: Optional[int]) -> XdoWindowNode:
+        node = self.nodes.get(window_id)
+        if node is None:
+            node = XdoWindowNode(window_id, parent)
+            self.nodes[window_id] = node
+            self.uncrawled.add(window_id)
+        return node
+
+    def mark_crawled(self, node: XdoWindowNode) -> None:
+        node.crawled = True
+        self.uncrawled.discard(node.window_id)
+
+    def remove(self, window_id: int) -> None:
+        node = self.nodes.pop(window_id, None)
+        if node is None:
+            return
+        self.uncrawled.discard(window_id)
+        self._unlink(node)
+        for child_id in node.children:
+            self.remove(child_id)
+
+    def is_viewable(self, window_id: int) -> bool:
+        node = self.nodes.get(window_id)
+        while node is not None:
+            if not node.mapped:
+                return False
+            if node.parent is None:
+                return True
+            node = self.nodes.get(node.parent)
+        return False
+
+    def root_position(self, window_id: int) -> tuple[int, int]:
+        """Return the position of the window relative to its root, the
+        same way as Xdo.get_window_location does.
+        """
+        node = self.nodes[window_id]
+        parent = self.nodes.get(node.parent) if node.parent else None
+        if parent is None or parent.parent is None:
+            return node.x, node.y
+        x, y = node.x + node.border_width, node.y + node.border_width
+        for ancestor in self._ancestors(parent):
+            if ancestor.parent is None:
+                break
+            x += ancestor.x + ancestor.border_width
+            y += ancestor.y + ancestor.border_width
+        return x, y
+
+    def path(self, window_id: int) -> list[int]:
+        """Return the window and its ancestors, from the root down, or an
+        empty list if the window isn't connected to a root.
+        """
+        node = self.nodes.get(window_id)
+        if node is None:
+            return []
+        path = [ancestor.window_id for ancestor in self._ancestors(node)]
+        if self.nodes[path[-1]].parent is not None:
+            return []
+        path.reverse()
+        return path
+
+    def _ancestors(self, node: XdoWindowNode) -> Iterator[XdoWindowNode]:
+        current: Optional[XdoWindowNode] = node
+        while current is not None:
+            yield current
+            current = (
+                self.nodes.get(current.parent) if current.parent else None
+            )
+
+    def _unlink(self, node: XdoWindowNode) -> None:
+        parent = self.nodes.get(node.parent) if node.parent else None
+        if parent is not None and node.window_id in parent.children:
+            parent.children.remove(node.window_id)
+
+    def _restack(self, node: XdoWindowNode, above: int) -> None:
+        """Move the window right above its sibling, or to the bottom."""
+        parent = self.nodes.get(node.parent) if node.parent else None
+        if parent is None:
+            return
+        self._unlink(node)
+        try:
+            index = parent.children.index(above) + 1
+        except ValueError:
+            index = 0
+        parent.children.insert(index, node.window_id)
+
+    def handle_event(self, event: Any) -> None:
+        # Some events are reported both to the window and to its parent, or
+        # to the old and the new parent, so handling them is idempotent.
+        if not hasattr(event, "window"):
+            return
+        node = self.nodes.get(event.window.id)
+
+        if event.type == Xlib.X.CreateNotify:
+            parent = self.nodes.get(event.parent.id)
+            if parent is None or node is not None:
+                return
+            node = self.add(event.window.id, parent.window_id)
+            node.x, node.y = event.x, event.y
+            node.width, node.height = event.width, event.height
+            node.border_width = event.border_width
+            parent.children.append(node.window_id)
+            return
+
+        if node is None:
+            return
+
+        if event.type == Xlib.X.DestroyNotify:
+            self.remove(node.window_id)
+
+        elif event.type == Xlib.X.ReparentNotify:
+            if event.parent.id not in self.nodes:
+                self.remove(node.window_id)
+                return
+            if node.parent != event.parent.id:
+                self._unlink(node)
+                node.parent = event.parent.id
+                self.nodes[node.parent].children.append(node.window_id)
+            node.x, node.y = event.x, event.y
+
+        elif event.type == Xlib.X.ConfigureNotify:
+            # Synthetic ones come from the window manager, in root
+            # coordinates (ICCCM 4.1.5); the real one is reported too.
+            if event.send_event:
+                return
+            node.x, node.y = event.x, event.y
+            node.width, node.height = event.width, event.height
+            node.border_width = event.border_width
+            # None (0) when the window is at the bottom of the stack.
+            self._restack(node, resource_id(event.above_sibling))
+
+        elif event.type == Xlib.X.GravityNotify:
+            node.x, node.y = event.x, event.y
+
+        elif event.type == Xlib.X.CirculateNotify:
+            parent = self.nodes.get(node.parent) if node.parent else None
+            if parent is None:
+                return
+            self._unlink(node)
+            if event.place == Xlib.X.PlaceOnTop:
+                parent.children.append(node.window_id)
+            else:
+                parent.children.insert(0, node.window_id)
+
+        elif event.type in (Xlib.X.MapNotify, Xlib.X.UnmapNotify):
+            node.mapped = event.type == Xlib.X.MapNotify
+
+        elif event.type == Xlib.X.PropertyNotify:
+            node.properties.pop(event.atom, None)
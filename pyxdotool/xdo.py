@@ -1,23 +1,152 @@
+import bisect
+import contextlib
+import re
+import select
 import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Iterable, Optional, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import Xlib
 import Xlib.display
+import Xlib.error
+import Xlib.ext.randr
+import Xlib.ext.xinerama
+import Xlib.protocol.request
+import Xlib.Xcursorfont
+import Xlib.xobject.fontable
 
-MAX_TRIES = 500
+from pyxdotool.keyboard import XdoKeymap, char_to_keysym, name_to_keysym
+from pyxdotool.mouse import PATHS
+from pyxdotool.window_index import XdoIndexEntry, XdoWindowIndex
+from pyxdotool.window_tree import XdoWindowNode, XdoWindowTree, resource_id
+
+DEFAULT_TIMEOUT = 15.0
+
+# Delay between keystrokes, in seconds.
+DEFAULT_KEY_DELAY = 0.012
+
+# Number of keystrokes or pointer motions sent to the server at once.
+INPUT_CHUNK_SIZE = 256
+
+# Pointer motion events per second when moving along a path.
+DEFAULT_MOTION_RATE = 120
+
+# Delay between repeated clicks, in seconds.
+DEFAULT_CLICK_DELAY = 0.1
+
+# Number of 32-bit units to ask for in a single GetProperty request, large
+# enough to never need a second request for the remainder.
+MAX_PROPERTY_LENGTH = 0x10000
+
+# String properties of type UTF8_STRING rather than Latin-1 STRING.
+UTF8_PROPERTIES = frozenset({"_NET_WM_NAME"})
+
+# Properties kept in the window tree mirror, read during the initial crawl.
+MIRRORED_PROPERTIES = (
+    "WM_STATE",
+    "WM_CLASS",
+    "WM_NAME",
+    "_NET_WM_NAME",
+    "_NET_WM_PID",
+    "_NET_WM_DESKTOP",
+)
+
+# Atoms used by activate_window, interned together.
+ACTIVATE_WINDOW_ATOMS = (
+    "_NET_SUPPORTED",
+    "_NET_ACTIVE_WINDOW",
+    "_NET_WM_DESKTOP",
+    "_NET_CURRENT_DESKTOP",
+)
+
+# Properties the window index is built from, all of them mirrored.
+INDEXED_PROPERTIES = (
+    "WM_CLASS",
+    "WM_NAME",
+    "_NET_WM_NAME",
+    "_NET_WM_PID",
+    "_NET_WM_DESKTOP",
+)
+
+
+T = TypeVar("T")
+
+# The steps of an operation that needs replies from the server: the
+# generator yields the requests whose replies it is about to collect, and
+# returns the result. See Xdo._run.
+XdoSteps = Generator[list[Any], None, T]
 
 
 class XdoError(RuntimeError):
     pass
 
 
+def is_answered(request: Any) -> bool:
+    """Return whether the server replied to a request queued with
+    Xdo._send_request, or responded with an error.
+    """
+    # python-xlib sets one of these once the response was read
+    return request._data is not None or request._error is not None
+
+
 class XdoSearchDirection(Enum):
     PARENTS = 1
     CHILDREN = 2
 
 
+class XdoEventWatch:
+    """Remembers the first event matching a predicate."""
+
+    def __init__(self, predicate: Callable[[Any], bool]) -> None:
+        self.predicate = predicate
+        self.event: Any = None
+
+    def __call__(self, event: Any) -> None:
+        if self.event is None and self.predicate(event):
+            self.event = event
+
+
+@dataclass
+class _PendingProperty:
+    window_id: int
+    atom: int
+    request: Any = None  # None if the value came from the cache
+    value: Any = None
+
+
+@dataclass
+class _PendingTree:
+    request: Any = None  # None if the node came from the mirror
+    node: Optional[XdoWindowNode] = None
+
+
+@dataclass
+class XdoSearch:
+    name: Optional[str] = None
+    winclass: Optional[str] = None
+    winclassname: Optional[str] = None
+    pid: Optional[int] = None
+    desktop: Optional[int] = None
+    screen: Optional[int] = None
+    max_depth: Optional[int] = None
+    limit: Optional[int] = None
+    only_visible: bool = False
+    require_all: bool = False
+
+
 @dataclass
 class XdoScreenInfo:
     num: int
@@ -27,100 +156,889 @@ class XdoScreenInfo:
     height: int
 
 
+@dataclass
+class XdoWindowGeometry:
+    window_id: int
+    x: int
+    y: int
+    width: int
+    height: int
+    screen: Optional[int]
+
+
+class XdoScreenLayout:
+    """Screens indexed by position.
+
+    The plane is cut into vertical slabs at every left and right screen edge,
+    and each slab into cells at the top and bottom edges of the screens
+    crossing it, so that finding the screen containing a point takes two
+    binary searches regardless of the number of screens.
+    """
+
+    def __init__(self, screens: list[XdoScreenInfo]) -> None:
+        self.screens = screens
+        self._x_edges = sorted(
+            {screen.x for screen in screens}
+            | {screen.x + screen.width for screen in screens}
+        )
+        self._slabs: list[tuple[list[int], list[Optional[int]]]] = []
+        for left in self._x_edges[:-1]:
+            slab_screens = [
+                screen
+                for screen in screens
+                if screen.x <= left < screen.x + screen.width
+            ]
+            y_edges = sorted(
+                {screen.y for screen in slab_screens}
+                | {screen.y + screen.height for screen in slab_screens}
+            )
+            owners = [
+                next(
+                    (
+                        screen.num
+                        for screen in slab_screens
+                        if screen.y <= top < screen.y + screen.height
+                    ),
+                    None,
+                )
+                for top in y_edges[:-1]
+            ]
+            self._slabs.append((y_edges, owners))
+
+    def find_screen(
+        self, win_x: int, win_y: int, win_w: int, win_h: int
+    ) -> Optional[int]:
+        """Return the screen containing the top left corner of the given
+        area, or if there's none, the one containing its bottom right corner.
+        """
+        screen_id = self.screen_at(win_x, win_y)
+        if screen_id is None:
+            screen_id = self.screen_at(win_x + win_w, win_y + win_h)
+        return screen_id
+
+    def screen_at(self, x: int, y: int) -> Optional[int]:
+        slab_idx = bisect.bisect_right(self._x_edges, x) - 1
+        if not 0 <= slab_idx < len(self._slabs):
+            return None
+        y_edges, owners = self._slabs[slab_idx]
+        cell_idx = bisect.bisect_right(y_edges, y) - 1
+        if not 0 <= cell_idx < len(owners):
+            return None
+        return owners[cell_idx]
+
+
 class Xdo:
-    def __init__(self, display_name: Optional[str] = None) -> None:
-        self.xdpy = Xlib.display.Display()
-        if not self.xdpy:
-            raise XdoError(f"Error: Can't open display: {display_name}")
+    """A connection to an X server and the xdotool operations on it.
+
+    The methods named *_steps are the internal API shared with AsyncXdo:
+    generators doing the part of an operation that waits for replies, which
+    _run drives by blocking on each of them and AsyncXdo by awaiting them.
+    """
+
+    def __init__(
+        self,
+        display_name: Optional[str] = None,
+        property_cache_size: int = 0,
+        mirror_window_tree: bool = False,
+        index_windows: bool = False,
+    ) -> None:
+        try:
+            self.xdpy = Xlib.display.Display(display_name)
+        except Xlib.error.DisplayError as ex:
+            raise XdoError(
+                f"Error: Can't open display: {display_name}"
+            ) from ex
         self.root = self.xdpy.screen().root
 
-    def _ewmh_is_supported(self, feature: str) -> bool:
-        request = self.xdpy.intern_atom("_NET_SUPPORTED")
-        feature_atom = self.xdpy.intern_atom(feature)
-        return (
-            feature_atom
-            in self.root.get_full_property(
-                request, Xlib.X.AnyPropertyType
-            ).value
+        self._atoms: dict[str, int] = {}
+        self._supported_atoms: Optional[set[int]] = None
+        self._screen_layout: Optional[XdoScreenLayout] = None
+        self._screen_change_event: Optional[int] = None
+        self._keymap: Optional[XdoKeymap] = None
+        # Keycodes rebound by us, whose MappingNotify can be ignored since
+        # the keymap is updated right away.
+        self._own_mapping_changes: list[int] = []
+        self._event_masks: dict[int, int] = {}
+        self._event_listeners: list[Callable[[Any], None]] = []
+
+        # Window properties read so far, least recently used first. Each
+        # window stays subscribed to PropertyNotify and DestroyNotify so that
+        # the entries can be dropped as soon as they become stale.
+        self._property_cache_size = property_cache_size
+        self._property_cache: OrderedDict[tuple[int, int], Any] = OrderedDict()
+
+        # Mirror of the whole window tree, crawled on first use and then
+        # kept current from the events, to answer tree, geometry and some
+        # property queries without talking to the server.
+        self._mirror_window_tree = mirror_window_tree or index_windows
+        self._window_tree: Optional[XdoWindowTree] = None
+        self._mirrored_atoms: set[int] = set()
+
+        # Windows by title, class, pid and desktop, built from the mirror and
+        # kept current from its PropertyNotify events, so that searches don't
+        # have to look at every window.
+        self._index_windows = index_windows
+        self._window_index: Optional[XdoWindowIndex] = None
+        self._indexed_atoms: set[int] = set()
+
+        # Lets us notice when the window manager changes _NET_SUPPORTED.
+        self._select_input(self.root.id, Xlib.X.PropertyChangeMask)
+
+    def close(self) -> None:
+        self.xdpy.close()
+
+    def _window(self, window_id: Optional[int] = None) -> Any:
+        if window_id:
+            return self.xdpy.create_resource_object("window", window_id)
+        return self.root
+
+    def _get_atom(self, atom_name: str) -> int:
+        try:
+            return self._atoms[atom_name]
+        except KeyError:
+            atom = self.xdpy.intern_atom(atom_name)
+            self._atoms[atom_name] = atom
+            return atom
+
+    def _intern_atoms(self, atom_names: Iterable[str]) -> None:
+        """Intern all the atoms that are not cached yet in one round trip."""
+        self._run(self._intern_atoms_steps(atom_names))
+
+    def _intern_atoms_steps(self, atom_names: Iterable[str]) -> XdoSteps[None]:
+        requests = {
+            atom_name: self._send_request(
+                Xlib.protocol.request.InternAtom,
+                name=atom_name,
+                only_if_exists=False,
+            )
+            for atom_name in set(atom_names) - self._atoms.keys()
+        }
+        if requests:
+            yield list(requests.values())
+        for atom_name, request in requests.items():
+            request.reply()
+            self._atoms[atom_name] = request.atom
+
+    def _atom_steps(self, atom_name: str) -> XdoSteps[int]:
+        yield from self._intern_atoms_steps([atom_name])
+        return self._atoms[atom_name]
+
+    @staticmethod
+    def _run(steps: XdoSteps[T]) -> T:
+        """Run the steps of an operation, blocking on the replies."""
+        try:
+            while True:
+                next(steps)
+        except StopIteration as ex:
+            return cast(T, ex.value)
+
+    def _send_request(self, request_cls: Any, **kwargs: Any) -> Any:
+        """Queue a request without waiting for its reply, so that replies to
+        many requests can be collected in a single round trip.
+        """
+        return request_cls(display=self.xdpy.display, defer=True, **kwargs)
+
+    @staticmethod
+    def _collect_reply(request: Any) -> Any:
+        """Wait for the reply to a request queued with _send_request. Return
+        None if the server responded with an error, e.g. because the window
+        was destroyed in the meantime.
+        """
+        try:
+            request.reply()
+        except Xlib.error.XError:
+            return None
+        return request
+
+    def _send_property_request(
+        self, window_id: int, atom_name: str
+    ) -> _PendingProperty:
+        pending = _PendingProperty(window_id, self._get_atom(atom_name))
+        node = self._window_tree and self._window_tree.get(window_id)
+        if node and pending.atom in node.properties:
+            pending.value = node.properties[pending.atom]
+            return pending
+        if self._property_cache_size:
+            key = (window_id, pending.atom)
+            if key in self._property_cache:
+                self._property_cache.move_to_end(key)
+                pending.value = self._property_cache[key]
+                return pending
+            self._select_input(
+                window_id,
+                Xlib.X.PropertyChangeMask | Xlib.X.StructureNotifyMask,
+            )
+
+        pending.request = self._send_request(
+            Xlib.protocol.request.GetProperty,
+            delete=False,
+            window=window_id,
+            property=pending.atom,
+            type=Xlib.X.AnyPropertyType,
+            long_offset=0,
+            long_length=MAX_PROPERTY_LENGTH,
         )
+        return pending
 
-    def _assert_ewmh_support(self, feature: str, what_for: str) -> None:
-        if not self._ewmh_is_supported(feature):
-            raise XdoError(
-                f"Your windowmanager claims not to support {feature}, "
-                f"so the attempt to {what_for} was aborted."
+    def _collect_property(self, pending: _PendingProperty) -> Any:
+        """Return the value of a property requested with
+        _send_property_request, or None if the window doesn't have it.
+        """
+        if pending.request is None:
+            return pending.value
+
+        reply = self._collect_reply(pending.request)
+        if reply is None:
+            return None
+        value = None
+        if reply.property_type:
+            _format, value = reply.value
+            value = value or None
+
+        node = self._window_tree and self._window_tree.get(pending.window_id)
+        # Only crawled windows have their PropertyNotify selected, which
+        # drops the value once it is stale.
+        if node and node.crawled and pending.atom in self._mirrored_atoms:
+            node.properties[pending.atom] = value
+        if self._property_cache_size:
+            self._property_cache[pending.window_id, pending.atom] = value
+            if len(self._property_cache) > self._property_cache_size:
+                self._property_cache.popitem(last=False)
+        return value
+
+    def _send_tree_request(self, window_id: int) -> _PendingTree:
+        if self._window_tree is not None:
+            return _PendingTree(node=self._window_tree.get(window_id))
+        return _PendingTree(
+            request=self._send_request(
+                Xlib.protocol.request.QueryTree, window=window_id
+            )
+        )
+
+    def _collect_tree(
+        self, pending: _PendingTree
+    ) -> Optional[tuple[int, list[int]]]:
+        """Return the parent (0 for the roots) and the children, bottom to
+        top, of a window requested with _send_tree_request, or None if the
+        window is gone.
+        """
+        if pending.request is None:
+            if pending.node is None:
+                return None
+            return pending.node.parent or 0, pending.node.children[:]
+        reply = self._collect_reply(pending.request)
+        if reply is None:
+            return None
+        return resource_id(reply.parent), [
+            child.id for child in reply.children
+        ]
+
+    def _get_window_tree(self) -> Optional[XdoWindowTree]:
+        """Return the window tree mirror, if enabled, after bringing it up
+        to date.
+        """
+        self.process_events()
+        if not self._mirror_window_tree:
+            return None
+        if self._window_tree is None:
+            self._intern_atoms(MIRRORED_PROPERTIES)
+            self._mirrored_atoms = {
+                self._atoms[atom_name] for atom_name in MIRRORED_PROPERTIES
+            }
+            self._window_tree = XdoWindowTree()
+            for screen in range(self.xdpy.screen_count()):
+                self._window_tree.add(self.xdpy.screen(screen).root.id, None)
+        if self._window_tree.uncrawled:
+            self._crawl_window_tree(list(self._window_tree.uncrawled))
+        return self._window_tree
+
+    def _crawl_window_tree(self, level: list[int]) -> None:
+        """Fill in the given windows and all their descendants, a level of
+        the tree per round trip.
+
+        The events are selected before the windows are queried, so that
+        whatever changes after the replies is reported by an event.
+        """
+        tree = self._window_tree
+        assert tree is not None
+        while level:
+            requests = []
+            for window_id in level:
+                self._select_input(
+                    window_id,
+                    Xlib.X.SubstructureNotifyMask | Xlib.X.PropertyChangeMask,
+                )
+                requests.append(
+                    (
+                        window_id,
+                        self._send_request(
+                            Xlib.protocol.request.QueryTree, window=window_id
+                        ),
+                        self._send_request(
+                            Xlib.protocol.request.GetGeometry,
+                            drawable=window_id,
+                        ),
+                        self._send_request(
+                            Xlib.protocol.request.GetWindowAttributes,
+                            window=window_id,
+                        ),
+                        [
+                            self._send_property_request(window_id, atom_name)
+                            for atom_name in MIRRORED_PROPERTIES
+                        ],
+                    )
+                )
+
+            level = []
+            for window_id, *window_requests, properties in requests:
+                node = tree.get(window_id)
+                replies = list(map(self._collect_reply, window_requests))
+                if node is None or None in replies:
+                    tree.remove(window_id)
+                    continue
+                children, geometry, attributes = replies
+                node.x, node.y = geometry.x, geometry.y
+                node.width, node.height = geometry.width, geometry.height
+                node.border_width = geometry.border_width
+                node.mapped = attributes.map_state != Xlib.X.IsUnmapped
+                node.children = [child.id for child in children.children]
+                for child_id in node.children:
+                    if child_id not in tree:
+                        tree.add(child_id, window_id)
+                        level.append(child_id)
+                # Its events are selected, so the properties can be kept
+                # in the mirror.
+                tree.mark_crawled(node)
+                for pending in properties:
+                    self._collect_property(pending)
+
+    def _get_window_index(self) -> Optional[XdoWindowIndex]:
+        """Return the window index, if enabled, after reading the properties
+        of the windows created or changed since the last time, all in one
+        round trip.
+        """
+        tree = self._get_window_tree()
+        if not self._index_windows or tree is None:
+            return None
+        if self._window_index is None:
+            self._window_index = XdoWindowIndex()
+            self._indexed_atoms = {
+                self._atoms[atom_name] for atom_name in INDEXED_PROPERTIES
+            }
+            self._window_index.dirty.update(
+                window_id
+                for window_id, node in tree.nodes.items()
+                if node.parent is not None
             )
 
+        index = self._window_index
+        requests = []
+        for window_id in list(index.dirty):
+            if window_id not in tree:
+                index.remove(window_id)
+                continue
+            requests.append(
+                (
+                    window_id,
+                    {
+                        atom_name: self._send_property_request(
+                            window_id, atom_name
+                        )
+                        for atom_name in INDEXED_PROPERTIES
+                    },
+                )
+            )
+        for window_id, pending in requests:
+            properties = {
+                atom_name: self._collect_property(request)
+                for atom_name, request in pending.items()
+            }
+            name, classname, wm_class = self._window_strings(properties)
+            index.update(
+                window_id,
+                XdoIndexEntry(
+                    name=name or "",
+                    classname=classname or "",
+                    wm_class=wm_class or "",
+                    pid=(
+                        properties["_NET_WM_PID"][0]
+                        if properties["_NET_WM_PID"] is not None
+                        else None
+                    ),
+                    desktop=(
+                        properties["_NET_WM_DESKTOP"][0]
+                        if properties["_NET_WM_DESKTOP"] is not None
+                        else None
+                    ),
+                ),
+            )
+        index.dirty.clear()
+        return index
+
+    def _update_window_index(self, event: Any) -> None:
+        index = self._window_index
+        assert index is not None
+        if event.type == Xlib.X.PropertyNotify:
+            if event.atom in self._indexed_atoms:
+                index.dirty.add(event.window.id)
+        elif event.type == Xlib.X.CreateNotify:
+            index.dirty.add(event.window.id)
+        elif event.type == Xlib.X.DestroyNotify:
+            index.remove(event.window.id)
+
+    def _select_input(self, window_id: int, mask: int) -> None:
+        """Add mask to the events we listen to on the given window, keeping
+        the events selected earlier.
+        """
+        old_mask = self._event_masks.get(window_id, 0)
+        if old_mask | mask == old_mask:
+            return
+        self._event_masks[window_id] = old_mask | mask
+        self._window(window_id).change_attributes(
+            event_mask=old_mask | mask,
+            # the window may be gone already, which is fine
+            onerror=Xlib.error.CatchError(),
+        )
+
+    def flush(self) -> None:
+        """Send all queued requests to the server."""
+        self.xdpy.flush()
+
+    def process_events(self) -> None:
+        """Handle all events received so far, without blocking."""
+        while self.xdpy.pending_events():
+            self._handle_event(self.xdpy.next_event())
+
+    def _handle_event(self, event: Any) -> None:
+        if event.type == Xlib.X.PropertyNotify:
+            if event.window.id == self.root.id and event.atom == (
+                self._atoms.get("_NET_SUPPORTED")
+            ):
+                self._supported_atoms = None
+            self._property_cache.pop((event.window.id, event.atom), None)
+        elif event.type == Xlib.X.DestroyNotify:
+            self._forget_window(event.window.id)
+        elif event.type == self._screen_change_event:
+            self._screen_layout = None
+        elif event.type == Xlib.X.MappingNotify:
+            if (
+                event.request == Xlib.X.MappingKeyboard
+                and event.count == 1
+                and event.first_keycode in self._own_mapping_changes
+            ):
+                self._own_mapping_changes.remove(event.first_keycode)
+            else:
+                self._keymap = None
+        if self._window_tree is not None:
+            self._window_tree.handle_event(event)
+        if self._window_index is not None:
+            self._update_window_index(event)
+
+        for listener in self._event_listeners[:]:
+            listener(event)
+
+    def _forget_window(self, window_id: int) -> None:
+        self._event_masks.pop(window_id, None)
+        for key in [
+            key for key in self._property_cache if key[0] == window_id
+        ]:
+            del self._property_cache[key]
+
+    def add_event_listener(self, listener: Callable[[Any], None]) -> None:
+        """Call listener with every event read from the connection."""
+        self._event_listeners.append(listener)
+
+    def remove_event_listener(self, listener: Callable[[Any], None]) -> None:
+        self._event_listeners.remove(listener)
+
+    def select_events(
+        self, window_ids: Iterable[int], event_mask: int
+    ) -> None:
+        """Start listening to the given events on all the windows."""
+        for window_id in window_ids:
+            self._select_input(window_id, event_mask)
+        self.flush()
+
+    def run_event_loop(
+        self,
+        handler: Callable[[Any], None],
+        key: Callable[[Any], Optional[Hashable]],
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """Call handler with the events for which key returns something
+        other than None, until stop returns true.
+
+        Events are coalesced by their key: when several events with the same
+        key arrived since the last dispatch, e.g. during a burst of
+        ConfigureNotify while a window is dragged, the handler is only
+        called with the last one. The handler may use this connection; the
+        events it reads are queued for the next dispatch.
+        """
+        queue: deque[Any] = deque()
+        self.add_event_listener(queue.append)
+        try:
+            while not (stop and stop()):
+                self.process_events()
+                if not queue:
+                    select.select([self.xdpy.fileno()], [], [])
+                    continue
+
+                batch: dict[Hashable, Any] = {}
+                while queue:
+                    event = queue.popleft()
+                    event_key = key(event)
+                    if event_key is not None:
+                        batch[event_key] = event
+                for event in batch.values():
+                    handler(event)
+        finally:
+            self.remove_event_listener(queue.append)
+
+    def _ewmh_is_supported(self, feature: str) -> bool:
+        return self._run(self._ewmh_is_supported_steps(feature))
+
+    def _ewmh_is_supported_steps(self, feature: str) -> XdoSteps[bool]:
+        self.process_events()
+        supported = self._supported_atoms
+        if supported is None:
+            value = yield from self._get_property_steps(
+                "_NET_SUPPORTED", allow_empty=True
+            )
+            supported = self._supported_atoms = set(value or [])
+        atom = yield from self._atom_steps(feature)
+        return atom in supported
+
+    def _assert_ewmh_support(self, feature: str, what_for: str) -> None:
+        self._run(self._assert_ewmh_support_steps(feature, what_for))
+
+    def _assert_ewmh_support_steps(
+        self, feature: str, what_for: str
+    ) -> XdoSteps[None]:
+        if not (yield from self._ewmh_is_supported_steps(feature)):
+            raise self._ewmh_error(feature, what_for)
+
+    @staticmethod
+    def _ewmh_error(feature: str, what_for: str) -> XdoError:
+        return XdoError(
+            f"Your windowmanager claims not to support {feature}, "
+            f"so the attempt to {what_for} was aborted."
+        )
+
     def get_active_window(self) -> int:
-        self._assert_ewmh_support(
+        return self._run(self._get_active_window_steps())
+
+    def _get_active_window_steps(self) -> XdoSteps[int]:
+        yield from self._assert_ewmh_support_steps(
             "_NET_ACTIVE_WINDOW", "query the active window"
         )
-        return self._get_required_int_property("_NET_ACTIVE_WINDOW")
+        return (
+            yield from self._get_required_int_property_steps(
+                "_NET_ACTIVE_WINDOW"
+            )
+        )
 
     def get_desktop_for_window(self, window_id: int) -> int:
-        self._assert_ewmh_support(
+        return self._run(self._get_desktop_for_window_steps(window_id))
+
+    def _get_desktop_for_window_steps(self, window_id: int) -> XdoSteps[int]:
+        yield from self._assert_ewmh_support_steps(
             "_NET_WM_DESKTOP", "query a window's desktop location"
         )
-
-        return self._get_required_int_property("_NET_WM_DESKTOP", window_id)
+        return (
+            yield from self._get_required_int_property_steps(
+                "_NET_WM_DESKTOP", window_id
+            )
+        )
 
     def set_desktop_for_window(self, window_id: int, desktop: int) -> None:
-        self._assert_ewmh_support(
-            "_NET_WM_DESKTOP", "change a window's desktop location"
+        self.set_desktop_for_windows([window_id], desktop)
+
+    def set_desktop_for_windows(
+        self,
+        window_ids: Iterable[int],
+        desktop: int,
+        sync: bool = False,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """Ask the window manager to move all the windows to the desktop in
+        a single burst of client messages. If sync is true, wait until it has
+        moved all of them; return false if this didn't happen within the
+        timeout.
+        """
+        window_ids = list(window_ids)
+        if sync:
+            for window_id in window_ids:
+                self._select_input(window_id, Xlib.X.PropertyChangeMask)
+        deadline = self._deadline(timeout)
+        self._run(self._set_desktop_for_windows_steps(window_ids, desktop))
+        if not sync:
+            return True
+
+        atom = self._get_atom("_NET_WM_DESKTOP")
+
+        def is_change(event: Any) -> bool:
+            return bool(
+                event.type == Xlib.X.PropertyNotify and event.atom == atom
+            )
+
+        def is_moved(pending_ids: list[int]) -> list[bool]:
+            return [
+                value is not None and value[0] == desktop
+                for value in self._get_properties(
+                    pending_ids, "_NET_WM_DESKTOP"
+                )
+            ]
+
+        return self._wait_for_windows(
+            window_ids, is_moved, is_change, deadline
         )
 
-        self._set_property(
-            "_NET_WM_DESKTOP",
-            [2, desktop],  # 2 == Message from a window pager
-            window_id,
+    def _set_desktop_for_windows_steps(
+        self, window_ids: list[int], desktop: int
+    ) -> XdoSteps[None]:
+        yield from self._assert_ewmh_support_steps(
+            "_NET_WM_DESKTOP", "change a window's desktop location"
         )
+        for window_id in window_ids:
+            self._set_property(
+                "_NET_WM_DESKTOP",
+                [desktop, 2],  # 2 == Message from a window pager
+                window_id,
+            )
+        self.flush()
 
     def get_current_desktop(self) -> int:
-        self._assert_ewmh_support(
+        return self._run(self._get_current_desktop_steps())
+
+    def _get_current_desktop_steps(self) -> XdoSteps[int]:
+        yield from self._assert_ewmh_support_steps(
             "_NET_CURRENT_DESKTOP", "query for the current desktop"
         )
-        return self._get_required_int_property("_NET_CURRENT_DESKTOP")
+        return (
+            yield from self._get_required_int_property_steps(
+                "_NET_CURRENT_DESKTOP"
+            )
+        )
 
     def set_current_desktop(self, desktop: int) -> None:
-        self._assert_ewmh_support("_NET_CURRENT_DESKTOP", "change desktops")
+        self._run(self._set_current_desktop_steps(desktop))
+
+    def _set_current_desktop_steps(self, desktop: int) -> XdoSteps[None]:
+        yield from self._assert_ewmh_support_steps(
+            "_NET_CURRENT_DESKTOP", "change desktops"
+        )
         self._set_property(
             "_NET_CURRENT_DESKTOP", [desktop, Xlib.X.CurrentTime]
         )
 
-    def wait_for_window_active(self, window_id: int, active: bool) -> None:
+    @contextlib.contextmanager
+    def _watch(
+        self, predicate: Callable[[Any], bool]
+    ) -> Iterator[XdoEventWatch]:
+        """Catch events matching predicate from the moment the block is
+        entered, so nothing is lost between checking a condition and waiting
+        for it to change.
+        """
+        watch = XdoEventWatch(predicate)
+        self.add_event_listener(watch)
+        try:
+            yield watch
+        finally:
+            self.remove_event_listener(watch)
+
+    def _wait_for_event(
+        self, watch: XdoEventWatch, deadline: Optional[float]
+    ) -> bool:
+        """Block until the watched event arrives. Return false if the
+        deadline (in terms of time.monotonic) passed first.
+        """
+        while True:
+            self.process_events()
+            if watch.event is not None:
+                return True
+            if deadline is None:
+                timeout = None
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    return False
+            select.select([self.xdpy.fileno()], [], [], timeout)
+
+    def _wait_for_windows(
+        self,
+        window_ids: Iterable[int],
+        is_done: Callable[[list[int]], list[bool]],
+        predicate: Callable[[Any], bool],
+        deadline: Optional[float],
+    ) -> bool:
+        """Wait until is_done, which checks many windows at once, holds for
+        all the windows, checking the remaining ones again whenever an event
+        matching predicate arrives. Return false if the deadline passed
+        first.
+        """
+        remaining = list(dict.fromkeys(window_ids))
+        while True:
+            with self._watch(predicate) as watch:
+                remaining = [
+                    window_id
+                    for window_id, done in zip(remaining, is_done(remaining))
+                    if not done
+                ]
+                if not remaining:
+                    return True
+                if not self._wait_for_event(watch, deadline):
+                    return False
+
+    @staticmethod
+    def _deadline(timeout: Optional[float]) -> Optional[float]:
+        return None if timeout is None else time.monotonic() + timeout
+
+    def wait_for_window_active(
+        self,
+        window_id: int,
+        active: bool,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
         """If active is true, wait until activewin is our window
         otherwise, wait until activewin is not our window.
+        Return false if this didn't happen within the timeout.
         """
-        for _ in range(MAX_TRIES):
-            active_window_id = self.get_active_window()
-            if active:
-                if active_window_id == window_id:
-                    return
-            elif active_window_id != window_id:
-                return
-            time.sleep(0.03)
-
-    def activate_window(self, window_id: int) -> None:
-        self._assert_ewmh_support("_NET_ACTIVE_WINDOW", "activate the window")
-
-        # If this window is on another desktop, let's go to that desktop first
-        if self._ewmh_is_supported(
-            "_NET_WM_DESKTOP"
-        ) and self._ewmh_is_supported("_NET_CURRENT_DESKTOP"):
-            desktop = self.get_desktop_for_window(window_id)
-            self.set_current_desktop(desktop)
+        atom = self._get_atom("_NET_ACTIVE_WINDOW")
+        deadline = self._deadline(timeout)
+
+        def is_change(event: Any) -> bool:
+            return bool(
+                event.type == Xlib.X.PropertyNotify
+                and event.window.id == self.root.id
+                and event.atom == atom
+            )
+
+        while True:
+            with self._watch(is_change) as watch:
+                active_window_id = self.get_active_window()
+                if (active_window_id == window_id) == active:
+                    return True
+                if not self._wait_for_event(watch, deadline):
+                    return False
+
+    def wait_for_window_move(
+        self,
+        window_id: int,
+        orig_x: int,
+        orig_y: int,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """Wait until the window is no longer at the given location.
+        Return false if this didn't happen within the timeout.
+        """
+        self._select_input(window_id, Xlib.X.StructureNotifyMask)
+        deadline = self._deadline(timeout)
+
+        def is_configure(event: Any) -> bool:
+            return bool(
+                event.type == Xlib.X.ConfigureNotify
+                and event.window.id == window_id
+            )
+
+        while True:
+            with self._watch(is_configure) as watch:
+                win_x, win_y, _ = self.get_window_location(window_id)
+                if (win_x, win_y) != (orig_x, orig_y):
+                    return True
+                if not self._wait_for_event(watch, deadline):
+                    return False
+
+    def activate_window(
+        self,
+        window_id: int,
+        sync: bool = False,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """Switch to the desktop of the window if needed, and ask the window
+        manager to activate it.
+
+        What is needed to decide on the desktop switch is read in at most one
+        round trip, and both client messages are sent with a single flush.
+        With sync, wait until the window is active. Return false if this
+        didn't happen within the timeout.
+        """
+        self._intern_atoms(ACTIVATE_WINDOW_ATOMS)
+        atom = self._atoms["_NET_ACTIVE_WINDOW"]
+
+        def is_change(event: Any) -> bool:
+            return bool(
+                event.type == Xlib.X.PropertyNotify
+                and event.window.id == self.root.id
+                and event.atom == atom
+            )
 
+        with self._watch(is_change) as watch:
+            self._run(self._activate_window_steps(window_id))
+            if not sync:
+                return True
+
+            deadline = self._deadline(timeout)
+            while self.get_active_window() != window_id:
+                watch.event = None
+                if not self._wait_for_event(watch, deadline):
+                    return False
+        return True
+
+    def _activate_window_steps(self, window_id: int) -> XdoSteps[None]:
+        yield from self._intern_atoms_steps(ACTIVATE_WINDOW_ATOMS)
+        self.process_events()
+        supported = self._supported_atoms
+        pending = [
+            self._send_property_request(window_id, "_NET_WM_DESKTOP"),
+            self._send_property_request(self.root.id, "_NET_CURRENT_DESKTOP"),
+        ]
+        if supported is None:
+            pending.append(
+                self._send_property_request(self.root.id, "_NET_SUPPORTED")
+            )
+        requests = [p.request for p in pending if p.request is not None]
+        if requests:
+            yield requests
+        window_desktop, current_desktop, *supported_value = map(
+            self._collect_property, pending
+        )
+        if supported is None:
+            supported = self._supported_atoms = set(supported_value[0] or [])
+        if self._atoms["_NET_ACTIVE_WINDOW"] not in supported:
+            raise self._ewmh_error("_NET_ACTIVE_WINDOW", "activate the window")
+
+        # If this window is on another desktop, let's go to that desktop
+        # first. 0xFFFFFFFF means it is on all of them.
+        if (
+            self._atoms["_NET_WM_DESKTOP"] in supported
+            and self._atoms["_NET_CURRENT_DESKTOP"] in supported
+            and window_desktop is not None
+            and window_desktop[0] != 0xFFFFFFFF
+            and window_desktop != current_desktop
+        ):
+            self._set_property(
+                "_NET_CURRENT_DESKTOP",
+                [window_desktop[0], Xlib.X.CurrentTime],
+            )
         self._set_property(
             "_NET_ACTIVE_WINDOW",
             [2, Xlib.X.CurrentTime],  # 2 == Message from a window pager
             window_id,
         )
+        self.flush()
 
     def get_number_of_desktops(self) -> int:
-        self._assert_ewmh_support(
+        return self._run(self._get_number_of_desktops_steps())
+
+    def _get_number_of_desktops_steps(self) -> XdoSteps[int]:
+        yield from self._assert_ewmh_support_steps(
             "_NET_NUMBER_OF_DESKTOPS", "query the number of desktops"
         )
-        return self._get_required_int_property("_NET_NUMBER_OF_DESKTOPS")
+        return (
+            yield from self._get_required_int_property_steps(
+                "_NET_NUMBER_OF_DESKTOPS"
+            )
+        )
 
     def set_number_of_desktops(self, num_desktops: int) -> None:
         self._assert_ewmh_support(
@@ -137,25 +1055,50 @@ class Xdo:
         window_id: Optional[int] = None,
         allow_empty: bool = False,
     ) -> Any:
-        request = self.xdpy.intern_atom(atom_name)
-        if window_id:
-            win = self.xdpy.create_resource_object("window", window_id)
-        else:
-            win = self.root
-        data = win.get_full_property(request, Xlib.X.AnyPropertyType)
-        if not data:
+        return self._run(
+            self._get_property_steps(atom_name, window_id, allow_empty)
+        )
+
+    def _get_property_steps(
+        self,
+        atom_name: str,
+        window_id: Optional[int] = None,
+        allow_empty: bool = False,
+    ) -> XdoSteps[Any]:
+        yield from self._intern_atoms_steps([atom_name])
+        self.process_events()
+        pending = self._send_property_request(
+            window_id or self.root.id, atom_name
+        )
+        if pending.request is not None:
+            yield [pending.request]
+        value = self._collect_property(pending)
+        if value is None and not allow_empty:
             raise XdoError(f"XGetWindowProperty[{atom_name}]")
-        if not data.value:
-            if not allow_empty:
-                raise XdoError(f"XGetWindowProperty[{atom_name}]")
-            return None
+        return value
 
-        return data.value
+    def _get_properties(
+        self, window_ids: Iterable[int], atom_name: str
+    ) -> list[Any]:
+        """Read a property of many windows in a single round trip."""
+        self.process_events()
+        requests = [
+            self._send_property_request(window_id, atom_name)
+            for window_id in window_ids
+        ]
+        return list(map(self._collect_property, requests))
 
     def _get_required_int_property(
         self, atom_name: str, window_id: Optional[int] = None
     ) -> int:
-        ret = self._get_property(atom_name, window_id, allow_empty=False)
+        return self._run(
+            self._get_required_int_property_steps(atom_name, window_id)
+        )
+
+    def _get_required_int_property_steps(
+        self, atom_name: str, window_id: Optional[int] = None
+    ) -> XdoSteps[int]:
+        ret = yield from self._get_property_steps(atom_name, window_id)
         assert ret is not None
         return cast(int, ret[0])
 
@@ -167,16 +1110,12 @@ class Xdo:
             return None
         return cast(Optional[int], ret[0])
 
-    def _get_string_property(
-        self,
-        atom_name: str,
-        window_id: Optional[int] = None,
-        allow_empty: bool = False,
-    ) -> Optional[str]:
-        ret = self._get_property(atom_name, window_id, allow_empty)
-        if ret is None:
-            return ret
-        return "".join(map(chr, ret))
+    @staticmethod
+    def _property_to_string(atom_name: str, value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        encoding = "utf-8" if atom_name in UTF8_PROPERTIES else "latin-1"
+        return bytes(value).decode(encoding, errors="replace")
 
     def _set_property(
         self,
@@ -187,17 +1126,8 @@ class Xdo:
         mask: Optional[int] = None,
     ) -> None:
         """Send a ClientMessage event to the target window."""
-        if target_window_id:
-            target = self.xdpy.create_resource_object(
-                "window", target_window_id
-            )
-        else:
-            target = self.root
-
-        if window_id:
-            win = self.xdpy.create_resource_object("window", window_id)
-        else:
-            win = self.root
+        target = self._window(target_window_id)
+        win = self._window(window_id)
 
         if isinstance(data, str):
             data_size = 8
@@ -205,9 +1135,10 @@ class Xdo:
             data = (data + [0] * (5 - len(data)))[:5]
             data_size = 32
 
-        atom = self.xdpy.get_atom(atom_name)
         event = Xlib.protocol.event.ClientMessage(
-            window=win, client_type=atom, data=(data_size, data)
+            window=win,
+            client_type=self._get_atom(atom_name),
+            data=(data_size, data),
         )
 
         if not mask:
@@ -231,49 +1162,308 @@ class Xdo:
         return window_ret
 
     def find_window_client(
-        self, window_id: int, direction: XdoSearchDirection
+        self,
+        window_id: int,
+        direction: XdoSearchDirection,
+        max_depth: Optional[int] = None,
     ) -> Optional[int]:
-        window = self.xdpy.create_resource_object("window", window_id)
+        """Find the client window, i.e. the one with WM_STATE, among the
+        window and its parents or descendants, going at most max_depth
+        levels away from it.
 
-        while True:
-            if not window:
-                return None
+        The tree is walked breadth-first: the WM_STATE and QueryTree
+        requests of a whole level are sent before waiting for any of the
+        replies, and the search stops at the first level that has a client.
+        """
+        self._get_window_tree()
+        level = [window_id]
+        depth = 0
+        while level:
+            probes = [
+                self._send_property_request(level_window_id, "WM_STATE")
+                for level_window_id in level
+            ]
+            tree_requests = (
+                list(map(self._send_tree_request, level))
+                if max_depth is None or depth < max_depth
+                else []
+            )
+
+            for level_window_id, probe in zip(level, probes):
+                if self._collect_property(probe) is not None:
+                    return level_window_id
+
+            # None of these windows has WM_STATE, keep searching.
+            level = []
+            for request in tree_requests:
+                reply = self._collect_tree(request)
+                if reply is None:
+                    continue
+                parent, children = reply
+                if direction == XdoSearchDirection.PARENTS:
+                    if parent:
+                        level.append(parent)
+                elif direction == XdoSearchDirection.CHILDREN:
+                    level += children
+                else:
+                    assert False, "invalid search direction"
+            depth += 1
 
-            if self._get_optional_int_property("WM_STATE", window_id):
-                return cast(int, window.id)
+        return None
 
-            # This window doesn't have WM_STATE property, keep searching.
-            result = window.query_tree()
+    def get_window_name(self, window_id: int) -> Optional[str]:
+        return self._run(self._get_window_name_steps(window_id))
+
+    def _get_window_name_steps(
+        self, window_id: int
+    ) -> XdoSteps[Optional[str]]:
+        for atom_name in ("_NET_WM_NAME", "WM_NAME"):
+            value = yield from self._get_property_steps(
+                atom_name, window_id, allow_empty=True
+            )
+            if value is not None:
+                return self._property_to_string(atom_name, value)
+        return None
 
-            if direction == XdoSearchDirection.PARENTS:
-                window = result.parent
+    def search_windows(self, search: XdoSearch) -> list[int]:
+        """Walk the window tree breadth-first, requesting everything needed
+        about a whole level of windows before waiting for any of the replies.
+        """
+        patterns = {
+            key: re.compile(pattern, re.IGNORECASE)
+            for key, pattern in (
+                ("name", search.name),
+                ("class", search.winclass),
+                ("classname", search.winclassname),
+            )
+            if pattern is not None
+        }
+        index = self._get_window_index()
+        if index is not None and search.max_depth is None:
+            return self._search_window_index(index, search, patterns)
 
-            elif direction == XdoSearchDirection.CHILDREN:
-                for child_window in result.children:
-                    window_ret = self.find_window_client(
-                        child_window.id, direction
+        atom_names = []
+        if "name" in patterns:
+            atom_names += ["_NET_WM_NAME", "WM_NAME"]
+        if "class" in patterns or "classname" in patterns:
+            atom_names.append("WM_CLASS")
+        if search.pid is not None:
+            atom_names.append("_NET_WM_PID")
+        if search.desktop is not None:
+            atom_names.append("_NET_WM_DESKTOP")
+        self._intern_atoms(atom_names)
+        tree = self._get_window_tree()
+
+        if search.screen is None:
+            screens = range(self.xdpy.screen_count())
+        else:
+            screens = range(search.screen, search.screen + 1)
+
+        results: list[int] = []
+        level = [self.xdpy.screen(screen).root.id for screen in screens]
+        depth = 0
+        while level:
+            is_leaf_level = (
+                search.max_depth is not None and depth >= search.max_depth
+            )
+            tree_requests = (
+                []
+                if is_leaf_level
+                else list(map(self._send_tree_request, level))
+            )
+
+            if depth > 0:
+                attribute_requests = [
+                    (
+                        self._send_request(
+                            Xlib.protocol.request.GetWindowAttributes,
+                            window=window_id,
+                        )
+                        if search.only_visible and tree is None
+                        else None
                     )
-                    if window_ret is not None:
-                        return window_ret
-                return None
+                    for window_id in level
+                ]
+                property_requests = [
+                    {
+                        atom_name: self._send_property_request(
+                            window_id, atom_name
+                        )
+                        for atom_name in atom_names
+                    }
+                    for window_id in level
+                ]
 
-            else:
-                assert False, "invalid search direction"
+                for window_id, attribute_request, requests in zip(
+                    level, attribute_requests, property_requests
+                ):
+                    properties = {
+                        atom_name: self._collect_property(request)
+                        for atom_name, request in requests.items()
+                    }
+                    if attribute_request is not None:
+                        attributes = self._collect_reply(attribute_request)
+                        if (
+                            attributes is None
+                            or attributes.map_state != Xlib.X.IsViewable
+                        ):
+                            continue
+                    elif (
+                        search.only_visible
+                        and tree is not None
+                        and not tree.is_viewable(window_id)
+                    ):
+                        continue
+                    if self._window_matches(search, patterns, properties):
+                        results.append(window_id)
+                        if search.limit and len(results) >= search.limit:
+                            return results
 
-    def get_window_name(self, window_id: int) -> Optional[str]:
-        ret = self._get_string_property(
-            "_NET_WM_NAME", window_id, allow_empty=True
+            level = []
+            for request in tree_requests:
+                reply = self._collect_tree(request)
+                if reply is not None:
+                    level += reply[1]
+            depth += 1
+
+        return results
+
+    def _window_matches(
+        self,
+        search: XdoSearch,
+        patterns: dict[str, re.Pattern[str]],
+        properties: dict[str, Any],
+    ) -> bool:
+        if search.pid is not None and (
+            properties["_NET_WM_PID"] is None
+            or properties["_NET_WM_PID"][0] != search.pid
+        ):
+            return False
+        if search.desktop is not None and (
+            properties["_NET_WM_DESKTOP"] is None
+            or properties["_NET_WM_DESKTOP"][0] != search.desktop
+        ):
+            return False
+        if not patterns:
+            return True
+
+        values: dict[str, Optional[str]] = {}
+        values["name"], values["classname"], values["class"] = (
+            self._window_strings(properties)
         )
-        if ret is None:
-            ret = self._get_string_property(
-                "WM_NAME", window_id, allow_empty=True
+
+        matches = [
+            pattern.search(values[key] or "") is not None
+            for key, pattern in patterns.items()
+        ]
+        return all(matches) if search.require_all else any(matches)
+
+    def _window_strings(
+        self, properties: dict[str, Any]
+    ) -> tuple[Optional[str], Optional[str], Optional[str]]:
+        """Return the name, classname and class of a window from whichever
+        of its name and class properties were read.
+        """
+        name = None
+        if "_NET_WM_NAME" in properties:
+            name = self._property_to_string(
+                "_NET_WM_NAME", properties["_NET_WM_NAME"]
+            )
+            if name is None:
+                name = self._property_to_string(
+                    "WM_NAME", properties["WM_NAME"]
+                )
+        classname = wm_class = None
+        if "WM_CLASS" in properties:
+            parts = (
+                self._property_to_string("WM_CLASS", properties["WM_CLASS"])
+                or ""
+            ).split("\0")
+            classname = parts[0]
+            wm_class = parts[1] if len(parts) > 1 else ""
+        return name, classname, wm_class
+
+    def _search_window_index(
+        self,
+        index: XdoWindowIndex,
+        search: XdoSearch,
+        patterns: dict[str, re.Pattern[str]],
+    ) -> list[int]:
+        """Answer a search from the window index, with the results in the
+        same order as the tree walk of search_windows.
+        """
+        tree = self._window_tree
+        assert tree is not None
+
+        constraints = []
+        if search.pid is not None:
+            constraints.append(index.pids.get(search.pid, set()))
+        if search.desktop is not None:
+            constraints.append(index.desktops.get(search.desktop, set()))
+        if patterns:
+            by_key = {
+                "name": index.names,
+                "class": index.classes,
+                "classname": index.classnames,
+            }
+            matches = [
+                by_key[key].match(pattern) for key, pattern in patterns.items()
+            ]
+            constraints.append(
+                set.intersection(*matches)
+                if search.require_all
+                else set.union(*matches)
+            )
+        found = (
+            set.intersection(*constraints)
+            if constraints
+            else set(index.entries)
+        )
+
+        if search.screen is None:
+            screens = range(self.xdpy.screen_count())
+        else:
+            screens = range(search.screen, search.screen + 1)
+        roots = [self.xdpy.screen(screen).root.id for screen in screens]
+
+        # Breadth-first order is by depth, then by the position of each
+        # ancestor among its siblings, from the root down.
+        positions: dict[int, dict[int, int]] = {}
+
+        def position(window_id: int) -> int:
+            node = tree.nodes[window_id]
+            if node.parent is None:
+                return roots.index(window_id)
+            if node.parent not in positions:
+                positions[node.parent] = {
+                    child_id: i
+                    for i, child_id in enumerate(
+                        tree.nodes[node.parent].children
+                    )
+                }
+            return positions[node.parent][window_id]
+
+        keyed_results = []
+        for window_id in found:
+            path = tree.path(window_id)
+            if not path or path[0] not in roots:
+                continue
+            if search.only_visible and not tree.is_viewable(window_id):
+                continue
+            keyed_results.append(
+                ((len(path), *map(position, path)), window_id)
             )
-        return ret
+        keyed_results.sort()
+        results = [window_id for _, window_id in keyed_results]
+        return results[: search.limit] if search.limit else results
 
     def get_window_pid(self, window_id: int) -> Optional[int]:
         return self._get_required_int_property("_NET_WM_PID", window_id)
 
     def get_window_size(self, window_id: int) -> tuple[int, int]:
+        node = (tree := self._get_window_tree()) and tree.get(window_id)
+        if node:
+            return node.width, node.height
         win = self.xdpy.create_resource_object("window", window_id)
         geometry = win.get_geometry()
         return geometry.width, geometry.height
@@ -281,49 +1471,218 @@ class Xdo:
     def get_window_location(
         self, window_id: int
     ) -> tuple[int, int, Optional[int]]:
-        win = self.xdpy.create_resource_object("window", window_id)
-        geometry = win.get_geometry()
+        geometry = self.get_geometries([window_id])[0]
+        return geometry.x, geometry.y, geometry.screen
+
+    def get_geometries(
+        self, window_ids: Iterable[int]
+    ) -> list[XdoWindowGeometry]:
+        """Query the size, root position and screen of many windows in a
+        single round trip, or none at all if the window tree is mirrored.
+        """
+        return self._run(self._get_geometries_steps(window_ids))
 
-        parent = win.query_tree().parent
-        root = win.query_tree().root
-        if parent == root:
+    def _get_geometries_steps(
+        self, window_ids: Iterable[int]
+    ) -> XdoSteps[list[XdoWindowGeometry]]:
+        tree = self._get_window_tree()
+        requests = [
+            (
+                window_id,
+                (
+                    None
+                    if tree is not None and window_id in tree
+                    else self._send_geometry_requests(window_id)
+                ),
+            )
+            for window_id in window_ids
+        ]
+        layout = yield from self._get_screen_layout_steps()
+        yield [
+            request
+            for _, window_requests in requests
+            for request in window_requests or []
+        ]
+        return [
+            (
+                self._mirrored_geometry(layout, window_id)
+                if window_requests is None
+                else self._collect_geometry(layout, window_id, window_requests)
+            )
+            for window_id, window_requests in requests
+        ]
+
+    def _mirrored_geometry(
+        self, layout: XdoScreenLayout, window_id: int
+    ) -> XdoWindowGeometry:
+        assert self._window_tree is not None
+        node = self._window_tree.nodes[window_id]
+        win_x, win_y = self._window_tree.root_position(window_id)
+        return self._make_geometry(
+            layout, window_id, win_x, win_y, node.width, node.height
+        )
+
+    def _send_geometry_requests(self, window_id: int) -> list[Any]:
+        return [
+            self._send_request(
+                Xlib.protocol.request.GetGeometry, drawable=window_id
+            ),
+            self._send_request(
+                Xlib.protocol.request.QueryTree, window=window_id
+            ),
+            self._send_request(
+                Xlib.protocol.request.TranslateCoords,
+                src_wid=window_id,
+                dst_wid=self.root.id,
+                src_x=0,
+                src_y=0,
+            ),
+        ]
+
+    def _collect_geometry(
+        self, layout: XdoScreenLayout, window_id: int, requests: list[Any]
+    ) -> XdoWindowGeometry:
+        geometry, tree, coords = map(self._collect_reply, requests)
+        if geometry is None or tree is None or coords is None:
+            raise XdoError(f"XGetGeometry[{window_id}]")
+
+        if tree.parent == tree.root:
             win_x = geometry.x
             win_y = geometry.y
         else:
-            translated_coords = root.translate_coords(win, 0, 0)
-            win_x = translated_coords.x
-            win_y = translated_coords.y
+            win_x = coords.x
+            win_y = coords.y
 
-        win_w = geometry.width
-        win_h = geometry.height
+        return self._make_geometry(
+            layout, window_id, win_x, win_y, geometry.width, geometry.height
+        )
 
-        screen_id: Optional[int] = None
-        for screen in self.query_screens():
-            if (
-                screen.x <= win_x < screen.x + screen.width
-                and screen.y <= win_y < screen.y + screen.height
-            ):
-                screen_id = screen.num
-                break
-        else:
-            for screen in self.query_screens():
-                if (
-                    screen.x <= win_x + win_w < screen.x + screen.width
-                    and screen.y <= win_y + win_h < screen.y + screen.height
-                ):
-                    screen_id = screen.num
-                    break
-        return win_x, win_y, screen_id
+    @staticmethod
+    def _make_geometry(
+        layout: XdoScreenLayout,
+        window_id: int,
+        win_x: int,
+        win_y: int,
+        width: int,
+        height: int,
+    ) -> XdoWindowGeometry:
+        return XdoWindowGeometry(
+            window_id=window_id,
+            x=win_x,
+            y=win_y,
+            width=width,
+            height=height,
+            screen=layout.find_screen(win_x, win_y, width, height),
+        )
+
+    def find_screen(
+        self, win_x: int, win_y: int, win_w: int, win_h: int
+    ) -> Optional[int]:
+        return self._get_screen_layout().find_screen(
+            win_x, win_y, win_w, win_h
+        )
 
     def move_window(
         self, window_id: int, target_x: int, target_y: int
     ) -> None:
-        win = self.xdpy.create_resource_object("window", window_id)
-        win.configure(x=target_x, y=target_y)
+        self.move_windows([(window_id, target_x, target_y)])
+
+    def move_windows(self, moves: Iterable[tuple[int, int, int]]) -> None:
+        """Move many windows, given as (window_id, x, y), with a single
+        flush.
+        """
+        for window_id, target_x, target_y in moves:
+            Xlib.protocol.request.ConfigureWindow(
+                display=self.xdpy.display,
+                onerror=None,
+                window=window_id,
+                attrs={"x": target_x, "y": target_y},
+            )
+        self.flush()
+
+    def set_screen_for_windows(
+        self,
+        window_ids: Iterable[int],
+        screen: int,
+        relative: bool = False,
+        sync: bool = False,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> bool:
+        """Move the windows to the same relative position on another screen,
+        or on the screen that many screens away from theirs if relative is
+        true. If sync is true, wait until all of them have moved; return
+        false if this didn't happen within the timeout.
+        """
+        screens = self.query_screens()
+        geometries = self.get_geometries(window_ids)
+
+        moves = []
+        for geometry in geometries:
+            if geometry.screen is None:
+                raise XdoError(f"Window {geometry.window_id} has no screen")
+
+            source_screen = screens[geometry.screen]
+            if relative:
+                target_screen = screens[
+                    (geometry.screen + screen) % len(screens)
+                ]
+            else:
+                try:
+                    target_screen = screens[screen]
+                except IndexError as ex:
+                    raise IndexError(f"Invalid screen {screen}") from ex
+
+            if source_screen == target_screen:
+                continue
+
+            target_x = int(
+                target_screen.x
+                + target_screen.width
+                * (geometry.x + geometry.width / 2 - source_screen.x)
+                / source_screen.width
+                - geometry.width / 2
+            )
+            target_y = int(
+                target_screen.y
+                + target_screen.height
+                * (geometry.y + geometry.height / 2 - source_screen.y)
+                / source_screen.height
+                - geometry.height / 2
+            )
+            moves.append((geometry.window_id, target_x, target_y))
+
+        if sync:
+            for window_id, _, _ in moves:
+                self._select_input(window_id, Xlib.X.StructureNotifyMask)
+        deadline = self._deadline(timeout)
+        self.move_windows(moves)
+        if not sync:
+            return True
+
+        origins = {
+            geometry.window_id: (geometry.x, geometry.y)
+            for geometry in geometries
+        }
+
+        def is_configure(event: Any) -> bool:
+            return bool(event.type == Xlib.X.ConfigureNotify)
+
+        def is_moved(pending_ids: list[int]) -> list[bool]:
+            return [
+                (geometry.x, geometry.y) != origins[geometry.window_id]
+                for geometry in self.get_geometries(pending_ids)
+            ]
+
+        return self._wait_for_windows(
+            [window_id for window_id, _, _ in moves],
+            is_moved,
+            is_configure,
+            deadline,
+        )
 
     def get_screen_size(self, screen_id: int) -> tuple[int, int]:
         try:
-            screen = list(self.query_screens())[screen_id]
+            screen = self.query_screens()[screen_id]
         except IndexError as ex:
             raise IndexError(f"Invalid screen {screen_id!r}") from ex
         else:
@@ -331,22 +1690,404 @@ class Xdo:
 
     def get_screen_location(self, screen_id: int) -> tuple[int, int]:
         try:
-            screen = list(self.query_screens())[screen_id]
+            screen = self.query_screens()[screen_id]
         except IndexError as ex:
             raise IndexError(f"Invalid screen {screen_id!r}") from ex
         else:
             return screen.x, screen.y
 
-    def query_screens(self) -> Iterable[XdoScreenInfo]:
-        return [
-            XdoScreenInfo(
-                num=i,
-                x=screen.x,
-                y=screen.y,
-                width=screen.width,
-                height=screen.height,
+    def query_screens(self) -> list[XdoScreenInfo]:
+        return self._get_screen_layout().screens
+
+    def _get_screen_layout(self) -> XdoScreenLayout:
+        return self._run(self._get_screen_layout_steps())
+
+    def _get_screen_layout_steps(self) -> XdoSteps[XdoScreenLayout]:
+        self.process_events()
+        if self._screen_layout is not None:
+            return self._screen_layout
+
+        self._select_screen_changes()
+        request = self._send_request(
+            Xlib.ext.xinerama.QueryScreens,
+            opcode=self.xdpy.display.get_extension_major(
+                Xlib.ext.xinerama.extname
+            ),
+        )
+        yield [request]
+        reply = self._collect_reply(request)
+        if reply is None:
+            raise XdoError("XineramaQueryScreens")
+        self._screen_layout = XdoScreenLayout(
+            [
+                XdoScreenInfo(
+                    num=i,
+                    x=screen.x,
+                    y=screen.y,
+                    width=screen.width,
+                    height=screen.height,
+                )
+                for i, screen in enumerate(reply.screens)
+            ]
+        )
+        return self._screen_layout
+
+    def _select_screen_changes(self) -> None:
+        """Listen for monitors being added, removed or rearranged, which
+        RANDR announces with an event.
+        """
+        if self._screen_change_event is None and self.xdpy.has_extension(
+            "RANDR"
+        ):
+            randr_info = self.xdpy.query_extension("RANDR")
+            assert randr_info is not None
+            self._screen_change_event = (
+                randr_info.first_event + Xlib.ext.randr.RRScreenChangeNotify
+            )
+            self.root.xrandr_select_input(
+                Xlib.ext.randr.RRScreenChangeNotifyMask
+            )
+
+    def _assert_xtest_support(self) -> None:
+        if not self.xdpy.has_extension("XTEST"):
+            raise XdoError("The X server doesn't support XTEST")
+
+    def _get_keymap(self) -> XdoKeymap:
+        self.process_events()
+        if self._keymap is None:
+            self._assert_xtest_support()
+            info = self.xdpy.display.info
+            mapping_request = self._send_request(
+                Xlib.protocol.request.GetKeyboardMapping,
+                first_keycode=info.min_keycode,
+                count=info.max_keycode - info.min_keycode + 1,
+            )
+            modifier_request = self._send_request(
+                Xlib.protocol.request.GetModifierMapping
+            )
+            mapping_request.reply()
+            modifier_request.reply()
+            self._keymap = XdoKeymap(
+                info.min_keycode,
+                [list(keysyms) for keysyms in mapping_request.keysyms],
+                [list(keycodes) for keycodes in modifier_request.keycodes],
+            )
+        return self._keymap
+
+    def enter_text(self, text: str, delay: float = DEFAULT_KEY_DELAY) -> None:
+        """Type the text, delay seconds per character."""
+        self._send_keystrokes([[char_to_keysym(char)] for char in text], delay)
+
+    def send_keysequence(
+        self,
+        sequences: Iterable[str],
+        delay: float = DEFAULT_KEY_DELAY,
+        press: bool = True,
+        release: bool = True,
+    ) -> None:
+        """Press and/or release key combinations such as "ctrl+alt+t", one
+        after another.
+        """
+        keystrokes = []
+        for sequence in sequences:
+            keysyms = [name_to_keysym(name) for name in sequence.split("+")]
+            if not all(keysyms):
+                raise XdoError(f"Invalid key sequence {sequence!r}")
+            keystrokes.append(cast(list[int], keysyms))
+        self._send_keystrokes(keystrokes, delay, press, release)
+
+    def _send_keystrokes(
+        self,
+        keystrokes: list[list[int]],
+        delay: float,
+        press: bool = True,
+        release: bool = True,
+    ) -> None:
+        """Press and/or release each group of keysyms in turn with XTEST.
+
+        The fake events are sent in chunks without waiting for anything, the
+        server itself sleeping for the delay before each of them. Returns
+        once the server has processed all of them.
+
+        Like xdotool, the scratch keycodes bound to type keysyms missing from
+        the keyboard are reset to NoSymbol at the end, unless the keys are
+        left pressed: their release must find them bound to the same keysym.
+        """
+        keymap = self._get_keymap()
+        half_delay_ms = int(delay * 1000 / 2)
+        bound: set[int] = set()
+        try:
+            self._send_keystroke_events(
+                keymap, keystrokes, half_delay_ms, press, release, bound
             )
-            for i, screen in enumerate(
-                self.xdpy.xinerama_query_screens().screens
+            self.xdpy.sync()
+        finally:
+            if release and bound:
+                self._unbind_scratch_keycodes(keymap, bound)
+
+    def _send_keystroke_events(
+        self,
+        keymap: XdoKeymap,
+        keystrokes: list[list[int]],
+        half_delay_ms: int,
+        press: bool,
+        release: bool,
+        bound: set[int],
+    ) -> None:
+        rebound: set[int] = set()
+
+        def fake_input(event_type: int, keycode: int, delay_ms: int) -> None:
+            self.xdpy.xtest_fake_input(event_type, keycode, delay_ms)
+
+        for i, keysyms in enumerate(keystrokes):
+            keys = [
+                self._get_keycode(keymap, keysym, rebound, bound)
+                for keysym in keysyms
+            ]
+            shift = (
+                keymap.shift_keycode
+                if any(mods & Xlib.X.ShiftMask for _, mods in keys)
+                else None
             )
+            if press:
+                if shift:
+                    fake_input(Xlib.X.KeyPress, shift, 0)
+                for j, (keycode, _) in enumerate(keys):
+                    fake_input(
+                        Xlib.X.KeyPress,
+                        keycode,
+                        half_delay_ms if j == 0 else 0,
+                    )
+            if release:
+                for j, (keycode, _) in enumerate(reversed(keys)):
+                    fake_input(
+                        Xlib.X.KeyRelease,
+                        keycode,
+                        half_delay_ms if j == 0 else 0,
+                    )
+                if shift:
+                    fake_input(Xlib.X.KeyRelease, shift, 0)
+            if (i + 1) % INPUT_CHUNK_SIZE == 0:
+                self.flush()
+
+    def _get_keycode(
+        self,
+        keymap: XdoKeymap,
+        keysym: int,
+        rebound: set[int],
+        bound: set[int],
+    ) -> tuple[int, int]:
+        """Return the keycode and the modifiers producing the keysym,
+        binding it to a scratch keycode if it isn't on the keyboard.
+        rebound holds the scratch keycodes bound since the last sync and
+        bound all of them.
+        """
+        key = keymap.lookup(keysym)
+        if key is not None:
+            return key
+
+        keycode = keymap.next_scratch_keycode()
+        if keycode is None:
+            raise XdoError(f"No keycode left to bind keysym {keysym:#x}")
+        if keycode in rebound:
+            # All the scratch keycodes are in use by the keystrokes not yet
+            # processed, wait for them before rebinding one.
+            self.xdpy.sync()
+            rebound.clear()
+        self.xdpy.change_keyboard_mapping(keycode, [(keysym, keysym)])
+        self._own_mapping_changes.append(keycode)
+        keymap.bind_scratch_keycode(keycode, keysym)
+        rebound.add(keycode)
+        bound.add(keycode)
+        return keycode, 0
+
+    def _unbind_scratch_keycodes(
+        self, keymap: XdoKeymap, keycodes: set[int]
+    ) -> None:
+        for keycode in sorted(keycodes):
+            self.xdpy.change_keyboard_mapping(
+                keycode, [(Xlib.X.NoSymbol, Xlib.X.NoSymbol)]
+            )
+            self._own_mapping_changes.append(keycode)
+            keymap.unbind_scratch_keycode(keycode)
+        self.flush()
+
+    def get_mouse_location(self) -> tuple[int, int, int, int]:
+        """Return the position of the pointer, its screen and the top-level
+        window under it, or 0 if there's none.
+        """
+        requests = [
+            self._send_request(
+                Xlib.protocol.request.QueryPointer,
+                window=self.xdpy.screen(screen_num).root.id,
+            )
+            for screen_num in range(self.xdpy.screen_count())
         ]
+        for screen_num, request in enumerate(requests):
+            reply = self._collect_reply(request)
+            if reply is not None and reply.same_screen:
+                return (
+                    reply.root_x,
+                    reply.root_y,
+                    screen_num,
+                    # None (0) over the root window
+                    resource_id(reply.child),
+                )
+        raise XdoError("XQueryPointer")
+
+    def move_mouse(
+        self,
+        x: int,
+        y: int,
+        screen: Optional[int] = None,
+        duration: float = 0,
+        path: str = "linear",
+        rate: float = DEFAULT_MOTION_RATE,
+        sync: bool = False,
+    ) -> bool:
+        """Move the pointer to the position on the given screen, or the
+        current one. With a duration in seconds, the pointer goes there
+        along a linear or bezier path, with rate motion events per second.
+
+        The motion events are sent in batches, the server timing them. If
+        sync is true, check where the pointer ended up once the server has
+        processed all of them, and return whether it's the given position.
+        """
+        self._assert_xtest_support()
+        points = [(x, y)]
+        if duration > 0:
+            start_x, start_y, start_screen, _ = self.get_mouse_location()
+            if screen is None or screen == start_screen:
+                points = PATHS[path](
+                    (start_x, start_y), (x, y), max(1, round(duration * rate))
+                )
+        root = Xlib.X.NONE if screen is None else self.xdpy.screen(screen).root
+        delay_ms = int(duration * 1000 / len(points)) if duration > 0 else 0
+
+        for i, (point_x, point_y) in enumerate(points):
+            self.xdpy.xtest_fake_input(
+                Xlib.X.MotionNotify,
+                detail=False,
+                time=delay_ms,
+                root=root,
+                x=point_x,
+                y=point_y,
+            )
+            if (i + 1) % INPUT_CHUNK_SIZE == 0:
+                self.flush()
+        self.flush()
+
+        if not sync:
+            return True
+        final_x, final_y, final_screen, _ = self.get_mouse_location()
+        return (final_x, final_y) == (x, y) and screen in (None, final_screen)
+
+    def move_mouse_relative(
+        self,
+        dx: int,
+        dy: int,
+        duration: float = 0,
+        path: str = "linear",
+        rate: float = DEFAULT_MOTION_RATE,
+        sync: bool = False,
+    ) -> bool:
+        """Move the pointer by the given offset, see move_mouse."""
+        if duration > 0 or sync:
+            x, y, screen, _ = self.get_mouse_location()
+            return self.move_mouse(
+                x + dx, y + dy, screen, duration, path, rate, sync
+            )
+
+        self._assert_xtest_support()
+        self.xdpy.xtest_fake_input(
+            Xlib.X.MotionNotify, detail=True, x=dx, y=dy
+        )
+        self.flush()
+        return True
+
+    def mouse_down(self, button: int) -> None:
+        self._assert_xtest_support()
+        self.xdpy.xtest_fake_input(Xlib.X.ButtonPress, button)
+        self.flush()
+
+    def mouse_up(self, button: int) -> None:
+        self._assert_xtest_support()
+        self.xdpy.xtest_fake_input(Xlib.X.ButtonRelease, button)
+        self.flush()
+
+    def click(
+        self, button: int, repeat: int = 1, delay: float = DEFAULT_CLICK_DELAY
+    ) -> None:
+        """Press and release the button repeat times, delay seconds apart,
+        in a single batch timed by the server.
+        """
+        self._assert_xtest_support()
+        for i in range(repeat):
+            self.xdpy.xtest_fake_input(
+                Xlib.X.ButtonPress, button, int(delay * 1000) if i else 0
+            )
+            self.xdpy.xtest_fake_input(Xlib.X.ButtonRelease, button)
+        self.flush()
+
+    def select_window(self, timeout: Optional[float] = None) -> int:
+        """Let the user click a window and return its client window, or
+        the clicked window itself if it has none.
+        """
+        # Display.open_font waits for the server to confirm the font exists,
+        # which the cursor font always does.
+        font_id = self.xdpy.display.allocate_resource_id()
+        Xlib.protocol.request.OpenFont(
+            display=self.xdpy.display, fid=font_id, name="cursor"
+        )
+        font = Xlib.xobject.fontable.Font(self.xdpy.display, font_id, owner=1)
+        cursor = font.create_glyph_cursor(
+            font,
+            Xlib.Xcursorfont.crosshair,
+            Xlib.Xcursorfont.crosshair + 1,
+            (0xFFFF, 0xFFFF, 0xFFFF),
+            (0, 0, 0),
+        )
+        presses: list[Any] = []
+
+        def is_click(event: Any) -> bool:
+            if event.type == Xlib.X.ButtonPress:
+                presses.append(event)
+            # Waiting for the release too keeps it from reaching the window
+            # under the pointer once the grab is gone.
+            return event.type == Xlib.X.ButtonRelease and bool(presses)
+
+        try:
+            with self._watch(is_click) as watch:
+                # The font and cursor requests go out with this one.
+                status = self.root.grab_pointer(
+                    False,
+                    Xlib.X.ButtonPressMask | Xlib.X.ButtonReleaseMask,
+                    Xlib.X.GrabModeAsync,
+                    Xlib.X.GrabModeAsync,
+                    Xlib.X.NONE,
+                    cursor,
+                    Xlib.X.CurrentTime,
+                )
+                if status != Xlib.X.GrabSuccess:
+                    raise XdoError("Couldn't grab the pointer")
+                try:
+                    if not self._wait_for_event(
+                        watch, self._deadline(timeout)
+                    ):
+                        raise XdoError("Timed out waiting for a click")
+                finally:
+                    self.xdpy.ungrab_pointer(Xlib.X.CurrentTime)
+        finally:
+            cursor.free()
+            font.close()
+            self.flush()
+
+        # The child is the top-level window under the pointer, usually a
+        # window manager frame, or none over the root window.
+        frame_id = resource_id(presses[0].child)
+        if not frame_id:
+            return resource_id(presses[0].root)
+        return (
+            self.find_window_client(frame_id, XdoSearchDirection.CHILDREN)
+            or frame_id
+        )
@@ -0,0 +1,671 @@
+"""A fake X server for testing Xdo without a display.
+
+Xdo talks to it through the real python-xlib request classes: the requests
+are decoded from their binary form and answered whenever Xdo flushes or
+waits for a reply, the waits being counted as round trips. Changes made
+through the server, by the tests or by Xdo, send the events a real server
+would to the connections that selected them.
+"""
+
+import contextlib
+import os
+import threading
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional, Union
+
+import pytest
+import Xlib.display
+import Xlib.error
+import Xlib.ext.randr
+import Xlib.ext.xinerama
+import Xlib.protocol.request
+import Xlib.X
+import Xlib.xobject.drawable
+
+from pyxdotool.xdo import UTF8_PROPERTIES, Xdo
+
+PropertyValue = Union[None, str, bytes, int, list[int]]
+
+MIN_KEYCODE = 8
+
+SCREEN_CHANGE_NOTIFY = 89
+
+
+class FakeWindow:
+    def __init__(
+        self,
+        window_id: int,
+        parent: Optional[int],
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        mapped: bool,
+    ) -> None:
+        self.id = window_id
+        self.parent = parent
+        self.children: list[int] = []  # bottom to top
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.mapped = mapped
+        self.properties: dict[int, tuple[int, Any]] = {}
+
+
+class FakeServer:
+    """Windows, atoms and Xinerama screens, shared by the connections made
+    to the server. Unless wm is false, it also plays the window manager,
+    acting on the EWMH client messages right away.
+    """
+
+    def __init__(
+        self,
+        screens: tuple[tuple[int, int, int, int], ...] = ((0, 0, 1920, 1080),),
+        wm: bool = True,
+    ) -> None:
+        self.atoms: dict[str, int] = {}
+        self.windows: dict[int, FakeWindow] = {}
+        self._next_id = 0x400000
+        self.connections: list["FakeDisplay"] = []
+        self.screens = list(screens)
+        self.wm = wm
+        # Keysyms of each keycode from MIN_KEYCODE on, and the keycodes of
+        # each modifier.
+        self.keysyms: list[list[int]] = [[] for _ in range(8)]
+        self.modifiers: list[list[int]] = [[] for _ in range(8)]
+        self.pointer = (0, 0)
+
+        # What the connections asked for: requests answered by type, round
+        # trips, flushes, and the requests that don't have a reply.
+        self.requests: Counter[str] = Counter()
+        self.round_trips = 0
+        self.flushes = 0
+        self.log: list[tuple[Any, ...]] = []
+
+        width = max(x + w for x, _, w, _ in screens)
+        height = max(y + h for _, y, _, h in screens)
+        self.root = FakeWindow(1, None, 0, 0, width, height, True)
+        self.windows[1] = self.root
+        if wm:
+            self.set_property(
+                self.root.id,
+                "_NET_SUPPORTED",
+                [
+                    self.intern(name)
+                    for name in (
+                        "_NET_ACTIVE_WINDOW",
+                        "_NET_CURRENT_DESKTOP",
+                        "_NET_NUMBER_OF_DESKTOPS",
+                        "_NET_WM_DESKTOP",
+                    )
+                ],
+            )
+            self.set_property(self.root.id, "_NET_ACTIVE_WINDOW", 0)
+            self.set_property(self.root.id, "_NET_CURRENT_DESKTOP", 0)
+            self.set_property(self.root.id, "_NET_NUMBER_OF_DESKTOPS", 4)
+
+    def intern(self, name: str) -> int:
+        return self.atoms.setdefault(name, 100 + len(self.atoms))
+
+    def atom_name(self, atom: int) -> str:
+        return next(
+            name for name, value in self.atoms.items() if value == atom
+        )
+
+    def add_window(
+        self,
+        parent: Optional[int] = None,
+        x: int = 0,
+        y: int = 0,
+        width: int = 100,
+        height: int = 100,
+        mapped: bool = True,
+        **properties: PropertyValue,
+    ) -> int:
+        """Create a window on top of its siblings, the root's by default."""
+        self._next_id += 1
+        parent_window = self.windows[parent or self.root.id]
+        window = FakeWindow(
+            self._next_id, parent_window.id, x, y, width, height, mapped
+        )
+        self.windows[window.id] = window
+        parent_window.children.append(window.id)
+        for name, value in properties.items():
+            self.set_property(window.id, name, value)
+        self._send_event(
+            parent_window.id,
+            Xlib.X.SubstructureNotifyMask,
+            Xlib.X.CreateNotify,
+            window=self._resource(window.id),
+            parent=self._resource(parent_window.id),
+            x=x,
+            y=y,
+            width=width,
+            height=height,
+            border_width=0,
+        )
+        return window.id
+
+    def add_client(
+        self,
+        name: str,
+        parent: Optional[int] = None,
+        x: int = 0,
+        y: int = 0,
+        **properties: PropertyValue,
+    ) -> int:
+        """Create a window manager frame with a client window in it."""
+        frame = self.add_window(parent, x, y)
+        client = self.add_window(frame)
+        properties = {"WM_STATE": [1, 0], "WM_NAME": name, **properties}
+        for property_name, value in properties.items():
+            self.set_property(client, property_name, value)
+        return client
+
+    def destroy_window(self, window_id: int) -> None:
+        window = self.windows[window_id]
+        for child_id in window.children[:]:
+            self.destroy_window(child_id)
+        del self.windows[window_id]
+        assert window.parent is not None
+        self.windows[window.parent].children.remove(window_id)
+        self._send_structure_event(
+            window, Xlib.X.DestroyNotify, window=self._resource(window_id)
+        )
+        for connection in self.connections:
+            connection.masks.pop(window_id, None)
+
+    def move_window(self, window_id: int, x: int, y: int) -> None:
+        window = self.windows[window_id]
+        window.x, window.y = x, y
+        assert window.parent is not None
+        siblings = self.windows[window.parent].children
+        index = siblings.index(window_id)
+        self._send_structure_event(
+            window,
+            Xlib.X.ConfigureNotify,
+            window=self._resource(window_id),
+            x=x,
+            y=y,
+            width=window.width,
+            height=window.height,
+            border_width=0,
+            above_sibling=(
+                self._resource(siblings[index - 1]) if index else 0
+            ),
+        )
+
+    def set_property(
+        self, window_id: int, name: str, value: PropertyValue
+    ) -> None:
+        """Set a property, as a string if it is one (UTF-8 for the
+        properties of type UTF8_STRING), else as 32-bit integers, or
+        delete it if the value is None.
+        """
+        window = self.windows[window_id]
+        atom = self.intern(name)
+        if value is None:
+            window.properties.pop(atom, None)
+        elif isinstance(value, str):
+            encoding = "utf-8" if name in UTF8_PROPERTIES else "latin-1"
+            window.properties[atom] = (8, value.encode(encoding))
+        elif isinstance(value, bytes):
+            window.properties[atom] = (8, value)
+        elif isinstance(value, int):
+            window.properties[atom] = (32, [value])
+        else:
+            window.properties[atom] = (32, list(value))
+        self._send_event(
+            window_id,
+            Xlib.X.PropertyChangeMask,
+            Xlib.X.PropertyNotify,
+            window=self._resource(window_id),
+            atom=atom,
+            state=(
+                Xlib.X.PropertyDelete
+                if value is None
+                else Xlib.X.PropertyNewValue
+            ),
+        )
+
+    def get_property(self, window_id: int, name: str) -> Any:
+        value = self.windows[window_id].properties.get(self.intern(name))
+        return None if value is None else value[1]
+
+    def set_screens(self, screens: list[tuple[int, int, int, int]]) -> None:
+        self.screens = screens
+        for connection in self.connections:
+            if connection.randr_selected:
+                connection.queue_event(
+                    SimpleNamespace(
+                        type=SCREEN_CHANGE_NOTIFY,
+                        send_event=False,
+                        window=self._resource(self.root.id),
+                    )
+                )
+
+    def root_position(self, window_id: int) -> tuple[int, int]:
+        x = y = 0
+        window: Optional[FakeWindow] = self.windows[window_id]
+        while window is not None and window.parent is not None:
+            x, y = x + window.x, y + window.y
+            window = self.windows[window.parent]
+        return x, y
+
+    def handle_client_message(
+        self, window_id: int, atom_name: str, data: list[int]
+    ) -> None:
+        self.log.append(("message", atom_name, window_id, data[:2]))
+        if not self.wm:
+            return
+        if atom_name == "_NET_ACTIVE_WINDOW":
+            self.set_property(self.root.id, atom_name, window_id)
+        elif atom_name == "_NET_CURRENT_DESKTOP":
+            self.set_property(self.root.id, atom_name, data[0])
+        elif atom_name == "_NET_WM_DESKTOP":
+            self.set_property(window_id, atom_name, data[0])
+
+    def answer(self, request: Any, display: "FakeProtocolDisplay") -> None:
+        """Store the reply to a request, or the error, in the request."""
+        name = type(request).__name__
+        self.requests[name] += 1
+        fields, _ = request._request.parse_binary(
+            request._binary, display, rawdict=True
+        )
+        try:
+            request._data = getattr(self, f"_reply_{name}")(**fields)
+        except KeyError:
+            # No such window
+            request._error = Xlib.error.BadWindow.__new__(Xlib.error.BadWindow)
+
+    def _reply_InternAtom(self, name: str, **_: Any) -> dict[str, Any]:
+        return {"atom": self.intern(name)}
+
+    def _reply_GetProperty(
+        self, window: int, property: int, **_: Any
+    ) -> dict[str, Any]:
+        value = self.windows[window].properties.get(property)
+        if value is None:
+            return {"property_type": Xlib.X.NONE, "value": (0, [])}
+        return {
+            "property_type": self.intern("ANY"),
+            "bytes_after": 0,
+            "value": value,
+        }
+
+    def _reply_QueryTree(self, window: int, **_: Any) -> dict[str, Any]:
+        fake_window = self.windows[window]
+        return {
+            "root": self._resource(self.root.id),
+            "parent": (
+                0
+                if fake_window.parent is None
+                else self._resource(fake_window.parent)
+            ),
+            "children": list(map(self._resource, fake_window.children)),
+        }
+
+    def _reply_GetGeometry(self, drawable: int, **_: Any) -> dict[str, Any]:
+        window = self.windows[drawable]
+        return {
+            "x": window.x,
+            "y": window.y,
+            "width": window.width,
+            "height": window.height,
+            "border_width": 0,
+        }
+
+    def _reply_GetWindowAttributes(
+        self, window: int, **_: Any
+    ) -> dict[str, Any]:
+        fake_window: Optional[FakeWindow] = self.windows[window]
+        map_state = Xlib.X.IsViewable
+        while fake_window is not None:
+            if not fake_window.mapped:
+                map_state = Xlib.X.IsUnmapped
+            parent = fake_window.parent
+            fake_window = None if parent is None else self.windows[parent]
+        return {"map_state": map_state}
+
+    def _reply_TranslateCoords(
+        self, src_wid: int, src_x: int, src_y: int, **_: Any
+    ) -> dict[str, Any]:
+        x, y = self.root_position(src_wid)
+        return {"x": x + src_x, "y": y + src_y}
+
+    def _reply_QueryPointer(self, window: int, **_: Any) -> dict[str, Any]:
+        x, y = self.pointer
+        child = next(
+            (
+                child_id
+                for child_id in reversed(self.root.children)
+                if self.windows[child_id].mapped
+                and self._contains(self.windows[child_id], x, y)
+            ),
+            0,
+        )
+        return {
+            "same_screen": window == self.root.id,
+            "root_x": x,
+            "root_y": y,
+            "child": self._resource(child) if child else 0,
+        }
+
+    def _reply_QueryScreens(self, **_: Any) -> dict[str, Any]:
+        return {
+            "screens": [
+                SimpleNamespace(x=x, y=y, width=width, height=height)
+                for x, y, width, height in self.screens
+            ]
+        }
+
+    def _reply_GetKeyboardMapping(self, **_: Any) -> dict[str, Any]:
+        return {"keysyms": [keysyms[:] for keysyms in self.keysyms]}
+
+    def _reply_GetModifierMapping(self, **_: Any) -> dict[str, Any]:
+        return {"keycodes": [keycodes[:] for keycodes in self.modifiers]}
+
+    @staticmethod
+    def _contains(window: FakeWindow, x: int, y: int) -> bool:
+        return (
+            window.x <= x < window.x + window.width
+            and window.y <= y < window.y + window.height
+        )
+
+    def _resource(self, window_id: int) -> "FakeResource":
+        return FakeResource(self, None, window_id)
+
+    def _send_event(
+        self, window_id: int, mask: int, event_type: int, **fields: Any
+    ) -> None:
+        event = SimpleNamespace(type=event_type, send_event=False, **fields)
+        for connection in self.connections:
+            if connection.masks.get(window_id, 0) & mask:
+                connection.queue_event(event)
+
+    def _send_structure_event(
+        self, window: FakeWindow, event_type: int, /, **fields: Any
+    ) -> None:
+        """Send an event to the window's StructureNotify listeners and its
+        parent's SubstructureNotify ones.
+        """
+        self._send_event(
+            window.id, Xlib.X.StructureNotifyMask, event_type, **fields
+        )
+        if window.parent is not None:
+            self._send_event(
+                window.parent,
+                Xlib.X.SubstructureNotifyMask,
+                event_type,
+                **fields,
+            )
+
+
+class FakeResource:
+    """A window as seen by a connection."""
+
+    def __init__(
+        self,
+        server: FakeServer,
+        connection: Optional["FakeDisplay"],
+        window_id: int,
+    ) -> None:
+        self.server = server
+        self.connection = connection
+        self.id = window_id
+
+    def __resource__(self) -> int:
+        return self.id
+
+    __window__ = __drawable__ = __resource__
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FakeResource) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return self.id
+
+    @property
+    def display(self) -> "FakeProtocolDisplay":
+        assert self.connection is not None
+        return self.connection.display
+
+    # These send their requests through self.display.
+    get_geometry = Xlib.xobject.drawable.Window.get_geometry
+    query_tree = Xlib.xobject.drawable.Window.query_tree
+    configure = Xlib.xobject.drawable.Window.configure
+
+    def change_attributes(
+        self, event_mask: int = 0, onerror: Any = None
+    ) -> None:
+        assert self.connection is not None
+        if self.id in self.server.windows:
+            self.connection.masks[self.id] = event_mask
+
+    def send_event(self, event: Any, event_mask: int = 0) -> None:
+        self.server.handle_client_message(
+            event.window.id,
+            self.server.atom_name(event.client_type),
+            list(event.data[1]),
+        )
+
+    def xrandr_select_input(self, mask: int) -> None:
+        assert self.connection is not None
+        self.connection.randr_selected = True
+
+
+class FakeProtocolDisplay:
+    """The protocol level display python-xlib's requests are sent to."""
+
+    def __init__(self, connection: "FakeDisplay") -> None:
+        self.connection = connection
+        self.server = connection.server
+        self.send_recv_lock = threading.Lock()
+        self.socket_error: Optional[Exception] = None
+        self._pending: list[Any] = []
+        self._serial = 0
+
+    def send_request(self, request: Any, wait_for_response: bool) -> None:
+        if self.socket_error:
+            raise self.socket_error
+        self._serial += 1
+        request._serial = self._serial
+        if isinstance(request, Xlib.protocol.request.ConfigureWindow):
+            configure: Any = request
+            fields, _ = configure._request.parse_binary(
+                configure._binary, self, rawdict=True
+            )
+            window_id, x, y = (
+                fields["window"],
+                fields["attrs"]["x"],
+                fields["attrs"]["y"],
+            )
+            self.server.log.append(("configure", window_id, x, y))
+            if window_id in self.server.windows:
+                self.server.move_window(window_id, x, y)
+        elif hasattr(request, "_reply"):
+            self._pending.append(request)
+
+    def send_and_recv(
+        self,
+        flush: bool = False,
+        event: bool = False,
+        request: Optional[int] = None,
+        recv: bool = False,
+    ) -> None:
+        """Let the server answer everything sent so far, counting a round
+        trip if we wait for one of the replies.
+        """
+        self.send_recv_lock.release()
+        if request is not None and self._pending:
+            self.server.round_trips += 1
+        self.answer_pending()
+
+    def answer_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        for request in pending:
+            self.server.answer(request, self)
+
+    def flush(self) -> None:
+        self.server.flushes += 1
+        self.send_recv_lock.acquire()
+        self.send_and_recv(flush=True)
+
+    @property
+    def info(self) -> Any:
+        return SimpleNamespace(
+            min_keycode=MIN_KEYCODE,
+            max_keycode=MIN_KEYCODE + len(self.server.keysyms) - 1,
+        )
+
+    def get_resource_class(self, name: str, default: Any = None) -> Any:
+        return default
+
+    def get_extension_major(self, extname: str) -> int:
+        return 130
+
+
+class FakeDisplay:
+    """A connection to a FakeServer, standing in for Xlib.display.Display."""
+
+    def __init__(self, server: FakeServer) -> None:
+        self.server = server
+        self.masks: dict[int, int] = {}
+        self.randr_selected = False
+        self.events: deque[Any] = deque()
+        self.display = FakeProtocolDisplay(self)
+        # Readable while there are events, like the socket of a real
+        # connection.
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+        self.closed = False
+        server.connections.append(self)
+
+    def screen(self, screen_num: Optional[int] = None) -> Any:
+        assert screen_num in (None, 0)
+        return SimpleNamespace(
+            root=FakeResource(self.server, self, self.server.root.id)
+        )
+
+    def screen_count(self) -> int:
+        return 1
+
+    def create_resource_object(self, kind: str, window_id: int) -> Any:
+        return FakeResource(self.server, self, window_id)
+
+    def has_extension(self, extname: str) -> bool:
+        return extname in ("RANDR", "XTEST", "XINERAMA")
+
+    def query_extension(self, name: str) -> Any:
+        self.server.round_trips += 1
+        return SimpleNamespace(
+            first_event=SCREEN_CHANGE_NOTIFY
+            - Xlib.ext.randr.RRScreenChangeNotify
+        )
+
+    def intern_atom(self, name: str) -> int:
+        self.server.round_trips += 1
+        return self.server.intern(name)
+
+    def xtest_fake_input(
+        self,
+        event_type: int,
+        detail: int = 0,
+        time: int = Xlib.X.CurrentTime,
+        root: Any = Xlib.X.NONE,
+        x: int = 0,
+        y: int = 0,
+    ) -> None:
+        if event_type != Xlib.X.MotionNotify:
+            self.server.log.append(("input", event_type, detail, time))
+            return
+        self.server.log.append(("motion", x, y, time))
+        if detail:  # relative
+            x += self.server.pointer[0]
+            y += self.server.pointer[1]
+        self.server.pointer = x, y
+
+    def change_keyboard_mapping(
+        self, first_keycode: int, keysyms: list[tuple[int, ...]]
+    ) -> None:
+        self.server.log.append(("mapping", first_keycode, keysyms))
+        for i, keycode_keysyms in enumerate(keysyms):
+            self.server.keysyms[first_keycode - MIN_KEYCODE + i] = list(
+                keycode_keysyms
+            )
+        for connection in self.server.connections:
+            connection.queue_event(
+                SimpleNamespace(
+                    type=Xlib.X.MappingNotify,
+                    send_event=False,
+                    request=Xlib.X.MappingKeyboard,
+                    first_keycode=first_keycode,
+                    count=len(keysyms),
+                )
+            )
+
+    def queue_event(self, event: Any) -> None:
+        self.events.append(event)
+        with contextlib.suppress(BlockingIOError):  # readable already
+            os.write(self._write_fd, b"\0")
+
+    def pending_events(self) -> int:
+        # Replies are only read here if they have arrived, which we take to
+        # be never before Xdo waits for them.
+        if not self.events:
+            with contextlib.suppress(BlockingIOError):
+                os.read(self._read_fd, 4096)
+        return len(self.events)
+
+    def next_event(self) -> Any:
+        return self.events.popleft()
+
+    def flush(self) -> None:
+        self.display.flush()
+
+    def sync(self) -> None:
+        self.server.log.append(("sync",))
+        self.server.round_trips += 1
+        self.display.answer_pending()
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def close(self) -> None:
+        self.closed = True
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+        self.server.connections.remove(self)
+
+
+@pytest.fixture
+def servers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> dict[Optional[str], FakeServer]:
+    """The fake servers Xdo connects to, by display name."""
+    servers: dict[Optional[str], FakeServer] = {}
+
+    def connect(display_name: Optional[str] = None) -> FakeDisplay:
+        try:
+            return FakeDisplay(servers[display_name])
+        except KeyError:
+            raise Xlib.error.DisplayNameError(display_name) from None
+
+    monkeypatch.setattr(Xlib.display, "Display", connect)
+    return servers
+
+
+@pytest.fixture
+def server(servers: dict[Optional[str], FakeServer]) -> FakeServer:
+    """The server of the default display."""
+    servers[None] = FakeServer()
+    return servers[None]
+
+
+@pytest.fixture
+def xdo(server: FakeServer) -> Iterator[Xdo]:
+    xdo = Xdo()
+    yield xdo
+    if not xdo.xdpy.closed:
+        xdo.close()
@@ -0,0 +1,63 @@
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.xdo import ACTIVATE_WINDOW_ATOMS, Xdo, XdoError
+
+
+@pytest.fixture
+def warm_xdo(xdo: Xdo) -> Xdo:
+    xdo._intern_atoms(ACTIVATE_WINDOW_ATOMS)
+    return xdo
+
+
+def messages(server: FakeServer) -> list[tuple[str, int]]:
+    return [
+        (entry[1], entry[2]) for entry in server.log if entry[0] == "message"
+    ]
+
+
+def test_one_round_trip_and_one_flush(
+    server: FakeServer, warm_xdo: Xdo
+) -> None:
+    window = server.add_window(_NET_WM_DESKTOP=2)
+    server.round_trips = server.flushes = 0
+    warm_xdo.activate_window(window)
+    assert server.round_trips == 1
+    assert server.flushes == 1
+    assert messages(server) == [
+        ("_NET_CURRENT_DESKTOP", server.root.id),
+        ("_NET_ACTIVE_WINDOW", window),
+    ]
+    assert server.get_property(server.root.id, "_NET_CURRENT_DESKTOP") == [2]
+
+
+def test_supported_list_is_reused(server: FakeServer, warm_xdo: Xdo) -> None:
+    window = server.add_window(_NET_WM_DESKTOP=0)
+    warm_xdo.activate_window(window)
+    server.requests.clear()
+    warm_xdo.activate_window(window)
+    assert server.requests["GetProperty"] == 2
+
+
+def test_sticky_window_stays_on_desktop(
+    server: FakeServer, warm_xdo: Xdo
+) -> None:
+    window = server.add_window(_NET_WM_DESKTOP=0xFFFFFFFF)
+    server.set_property(server.root.id, "_NET_CURRENT_DESKTOP", 1)
+    warm_xdo.activate_window(window)
+    assert messages(server) == [("_NET_ACTIVE_WINDOW", window)]
+
+
+def test_sync(server: FakeServer, warm_xdo: Xdo) -> None:
+    window = server.add_window(_NET_WM_DESKTOP=0)
+    assert warm_xdo.activate_window(window, sync=True)
+    server.wm = False
+    other = server.add_window(_NET_WM_DESKTOP=0)
+    assert not warm_xdo.activate_window(other, sync=True, timeout=0.01)
+
+
+def test_requires_ewmh(server: FakeServer, xdo: Xdo) -> None:
+    server.set_property(server.root.id, "_NET_SUPPORTED", [])
+    with pytest.raises(XdoError, match="_NET_ACTIVE_WINDOW"):
+        xdo.activate_window(server.add_window())
+    assert messages(server) == []
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from conftest import FakeServer
+
+from pyxdotool.async_xdo import AsyncXdo
+
+Test = Callable[[AsyncXdo], Awaitable[None]]
+
+
+def run(test: Test) -> None:
+    async def main() -> None:
+        async with AsyncXdo() as async_xdo:
+            await test(async_xdo)
+
+    asyncio.run(main())
+
+
+def test_blocking_call_wakes_reply_waiters(server: FakeServer) -> None:
+    async def test(async_xdo: AsyncXdo) -> None:
+        waiter: asyncio.Future[None] = async_xdo._loop.create_future()
+        async_xdo._reply_waiters.append(waiter)
+
+        def call(value: Any) -> Any:
+            return value
+
+        assert async_xdo._call(call, 42) == 42
+        assert waiter.done()
+        assert not async_xdo._reply_waiters
+
+    run(test)
+
+
+def test_close_closes_connection(server: FakeServer) -> None:
+    async def main() -> None:
+        async_xdo = AsyncXdo()
+        async_xdo.close()
+        assert not server.connections
+
+    asyncio.run(main())
+
+
+def test_concurrent_queries(server: FakeServer) -> None:
+    first = server.add_window(x=10, y=20, _NET_WM_NAME="wörld")
+    second = server.add_window(x=2000, y=20, WM_NAME="second", _NET_WM_PID=7)
+
+    async def test(async_xdo: AsyncXdo) -> None:
+        results = await asyncio.gather(
+            async_xdo.get_window_name(first),
+            async_xdo.get_window_name(second),
+            async_xdo.get_window_location(first),
+            async_xdo.get_window_pid(second),
+            async_xdo.get_number_of_desktops(),
+        )
+        assert list(results) == ["wörld", "second", (10, 20, 0), 7, 4]
+
+    run(test)
+
+
+def test_activate_window_switches_desktop_if_needed(
+    server: FakeServer,
+) -> None:
+    here = server.add_window(_NET_WM_DESKTOP=0)
+    there = server.add_window(_NET_WM_DESKTOP=2)
+
+    async def test(async_xdo: AsyncXdo) -> None:
+        await async_xdo.activate_window(here)
+        assert await async_xdo.get_active_window() == here
+        await async_xdo.activate_window(there)
+        assert await async_xdo.get_current_desktop() == 2
+
+    run(test)
+    assert [entry[1] for entry in server.log] == [
+        "_NET_ACTIVE_WINDOW",
+        "_NET_CURRENT_DESKTOP",
+        "_NET_ACTIVE_WINDOW",
+    ]
+
+
+def test_wait_for_window_active(server: FakeServer) -> None:
+    window = server.add_window()
+
+    async def test(async_xdo: AsyncXdo) -> None:
+        assert not await async_xdo.wait_for_window_active(
+            window, True, timeout=0.01
+        )
+        asyncio.get_running_loop().call_later(
+            0.01,
+            server.set_property,
+            server.root.id,
+            "_NET_ACTIVE_WINDOW",
+            window,
+        )
+        assert await async_xdo.wait_for_window_active(window, True, timeout=5)
+
+    run(test)
+
+
+def test_wait_for_window_move(server: FakeServer) -> None:
+    window = server.add_window(x=10, y=20)
+
+    async def test(async_xdo: AsyncXdo) -> None:
+        assert not await async_xdo.wait_for_window_move(
+            window, 10, 20, timeout=0.01
+        )
+        asyncio.get_running_loop().call_later(
+            0.01, server.move_window, window, 30, 40
+        )
+        assert await async_xdo.wait_for_window_move(window, 10, 20, timeout=5)
+
+    run(test)
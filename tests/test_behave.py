@@ -0,0 +1,96 @@
+import io
+import json
+from typing import Any, Callable, Hashable, Optional
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.chain import parse_args, run_chain
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.output import OutputSink
+from pyxdotool.window_stack import WindowStack
+from pyxdotool.xdo import Xdo
+
+
+@pytest.fixture
+def behave(
+    monkeypatch: pytest.MonkeyPatch, xdo: Xdo
+) -> Callable[[list[str], Callable[[], None]], list[Any]]:
+    """Run behave until it has handled the events caused by a function
+    called once it listens to them, and return the JSON output.
+    """
+    run_event_loop = Xdo.run_event_loop
+
+    def run(argv: list[str], cause: Callable[[], None]) -> list[Any]:
+        def run_once(
+            self: Xdo,
+            handler: Callable[[Any], None],
+            key: Callable[[Any], Optional[Hashable]],
+            stop: Optional[Callable[[], bool]] = None,
+        ) -> None:
+            handled = []
+
+            def handle(event: Any) -> None:
+                handler(event)
+                handled.append(event)
+
+            cause()
+            run_event_loop(self, handle, key, lambda: bool(handled))
+
+        monkeypatch.setattr(Xdo, "run_event_loop", run_once)
+        buffer = io.StringIO()
+        run_chain(
+            LazyXdo(lambda: xdo),
+            list(parse_args(["behave", *argv])),
+            WindowStack(),
+            output=OutputSink(buffer, "jsonl"),
+        )
+        return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+    return run
+
+
+def test_configure_coalesces_a_drag(
+    server: FakeServer,
+    behave: Callable[[list[str], Callable[[], None]], list[Any]],
+) -> None:
+    window = server.add_window()
+    other = server.add_window()
+
+    def drag() -> None:
+        for x in range(10, 60, 10):
+            server.move_window(window, x, x)
+        server.move_window(other, 0, 0)
+
+    output = behave([str(window), "configure", "getwindowgeometry"], drag)
+    assert [(record["window"], record["x"]) for record in output] == [
+        (window, 50)
+    ]
+
+
+def test_create_runs_for_the_new_window(
+    server: FakeServer,
+    behave: Callable[[list[str], Callable[[], None]], list[Any]],
+) -> None:
+    parent = server.add_window()
+    children = []
+
+    def create() -> None:
+        children.append(server.add_window(parent, WM_NAME="child"))
+
+    output = behave([str(parent), "create", "getwindowname"], create)
+    assert output == [{"window": children[0], "name": "child"}]
+
+
+def test_failing_chain_is_reported(
+    server: FakeServer,
+    behave: Callable[[list[str], Callable[[], None]], list[Any]],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    window = server.add_window()
+    output = behave(
+        [str(window), "destroy", "getwindowgeometry"],
+        lambda: server.destroy_window(window),
+    )
+    assert output == []
+    assert "XdoError" in capsys.readouterr().err
@@ -0,0 +1,75 @@
+import io
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.chain import parse_args, run_script
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.output import OutputSink
+from pyxdotool.window_stack import WindowStack
+from pyxdotool.xdo import Xdo
+
+
+def commands(argv: list[str]) -> list[str]:
+    return [args.command_cls.names[0] for args in parse_args(argv)]
+
+
+def test_chain_of_commands() -> None:
+    args_list = list(
+        parse_args(["search", "--name", "xterm", "windowactivate", "%1"])
+    )
+    assert [args.command_cls.names[0] for args in args_list] == [
+        "search",
+        "windowactivate",
+    ]
+    assert args_list[1].window_id == "%1"
+
+
+def test_key_sequence_ends_at_command_name() -> None:
+    args_list = list(parse_args(["key", "ctrl+c", "Return", "sleep", "1"]))
+    assert args_list[0].keysequence == ["ctrl+c", "Return"]
+    assert args_list[1].seconds == 1.0
+
+
+def test_type_takes_the_rest() -> None:
+    args_list = list(parse_args(["type", "sleep", "1"]))
+    assert len(args_list) == 1
+    assert args_list[0].text == ["sleep", "1"]
+
+
+def test_unknown_command() -> None:
+    with pytest.raises(SystemExit):
+        commands(["nosuchcommand"])
+
+
+def test_invalid_window_selector() -> None:
+    with pytest.raises(SystemExit):
+        commands(["windowactivate", "%x"])
+
+
+def test_script_shares_the_window_stack(server: FakeServer, xdo: Xdo) -> None:
+    server.add_window(WM_NAME="first")
+    buffer = io.StringIO()
+    status = run_script(
+        LazyXdo(lambda: xdo),
+        ["# find it\n", "search --name '^first$'\n", "getwindowname\n"],
+        WindowStack(),
+        output=OutputSink(buffer),
+    )
+    assert status == 0
+    assert buffer.getvalue() == "first\n"
+
+
+def test_script_skips_bad_lines(
+    server: FakeServer, xdo: Xdo, capsys: pytest.CaptureFixture[str]
+) -> None:
+    status = run_script(
+        LazyXdo(lambda: xdo),
+        ["nosuchcommand\n", "getwindowname 'unterminated\n", "get_desktop"],
+        WindowStack(),
+    )
+    assert status == 1
+    out, err = capsys.readouterr()
+    assert out == "0\n"
+    assert "Error: Skipped line 1 of the script\n" in err
+    assert "Error: Skipped line 2 of the script: No closing quotation" in err
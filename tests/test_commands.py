@@ -0,0 +1,61 @@
+import io
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from pyxdotool.chain import parse_args, run_chain
+from pyxdotool.commands.base import LazyXdo
+from pyxdotool.output import OutputSink
+from pyxdotool.window_stack import WindowStack
+from pyxdotool.xdo import XdoError, XdoWindowGeometry
+
+
+def run(argv: list[str], **xdo_methods: Any) -> None:
+    xdo = SimpleNamespace(flush=lambda: None, **xdo_methods)
+    run_chain(
+        LazyXdo(lambda: xdo),  # type: ignore[arg-type,return-value]
+        list(parse_args(argv)),
+        WindowStack(),
+        output=OutputSink(io.StringIO()),
+    )
+
+
+@pytest.mark.parametrize("synced", [True, False])
+def test_window_activate_sync(synced: bool) -> None:
+    argv = ["windowactivate", "--sync", "42"]
+    if synced:
+        run(argv, activate_window=lambda *args, **kwargs: True)
+    else:
+        with pytest.raises(XdoError, match="window 42"):
+            run(argv, activate_window=lambda *args, **kwargs: False)
+
+
+def test_window_move_sync_timeout() -> None:
+    with pytest.raises(XdoError, match="window 42"):
+        run(
+            ["windowmove", "--sync", "42", "10", "20"],
+            get_geometries=lambda window_ids: [
+                XdoWindowGeometry(42, 0, 0, 100, 100, 0)
+            ],
+            get_screen_size=lambda screen: (1000, 1000),
+            get_screen_location=lambda screen: (0, 0),
+            move_window=lambda *args: None,
+            wait_for_window_move=lambda *args, **kwargs: False,
+        )
+
+
+def test_set_desktop_for_window_sync_timeout() -> None:
+    with pytest.raises(XdoError, match="desktop 2"):
+        run(
+            ["set_desktop_for_window", "--sync", "42", "2"],
+            set_desktop_for_windows=lambda *args, **kwargs: False,
+        )
+
+
+def test_set_screen_for_window_sync_timeout() -> None:
+    with pytest.raises(XdoError, match="Timed out"):
+        run(
+            ["set_screen_for_window", "--sync", "42", "1"],
+            set_screen_for_windows=lambda *args, **kwargs: False,
+        )
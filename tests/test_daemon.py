@@ -0,0 +1,118 @@
+import os
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool import daemon
+from pyxdotool.__main__ import parse_global_args
+from pyxdotool.client import (
+    decode_message,
+    default_socket_path,
+    encode_message,
+    fallback_runtime_dir,
+    forward,
+)
+from pyxdotool.xdo import Xdo, XdoError
+
+
+def handle(xdo: Xdo, lines: list[bytes]) -> list[dict[str, object]]:
+    server, client = socket.socketpair()
+    with server, client:
+        client.sendall(b"".join(lines))
+        client.shutdown(socket.SHUT_WR)
+        daemon._handle_connection(xdo, server)
+        server.close()
+        with client.makefile("rb") as stream:
+            return [decode_message(line) for line in stream]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        b"{not json\n",
+        b"[1, 2]\n",
+        b"\xff\n",
+        encode_message({"format": "text"}),
+        encode_message({"argv": "getactivewindow"}),
+        encode_message({"argv": ["getactivewindow"], "format": "xml"}),
+    ],
+)
+def test_invalid_request(xdo: Xdo, line: bytes) -> None:
+    (response,) = handle(xdo, [line])
+    assert response["status"] == 1
+    assert str(response["stderr"]).startswith("Error: Invalid request")
+
+
+def test_invalid_request_keeps_connection(
+    server: FakeServer, xdo: Xdo
+) -> None:
+    window = server.add_window()
+    server.set_property(server.root.id, "_NET_ACTIVE_WINDOW", window)
+    responses = handle(
+        xdo,
+        [
+            b"{\n",
+            encode_message({"argv": ["getactivewindow"], "format": "jsonl"}),
+        ],
+    )
+    assert [response["status"] for response in responses] == [1, 0]
+    assert decode_message(str(responses[1]["stdout"]).encode()) == {
+        "window": window
+    }
+
+
+def test_idle_client_times_out(
+    monkeypatch: pytest.MonkeyPatch, xdo: Xdo
+) -> None:
+    monkeypatch.setattr(daemon, "CONNECTION_TIMEOUT", 0.01)
+    server, client = socket.socketpair()
+    with server, client, pytest.raises(TimeoutError):
+        daemon._handle_connection(xdo, server)
+
+
+def test_forward_reports_closed_connection(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    socket_path = str(tmp_path / "daemon.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        server.listen()
+
+        def accept_and_close() -> None:
+            conn, _ = server.accept()
+            with conn:
+                conn.recv(4096)
+
+        thread = threading.Thread(target=accept_and_close)
+        thread.start()
+        assert forward(socket_path, ["getactivewindow"]) == 1
+        thread.join()
+    assert "closed the connection" in capsys.readouterr().err
+
+
+def test_private_dir(tmp_path: Path) -> None:
+    path = str(tmp_path / "pyxdotool")
+    daemon._make_private_dir(path)
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    daemon._make_private_dir(path)
+    os.chmod(path, 0o755)
+    with pytest.raises(XdoError, match="private"):
+        daemon._make_private_dir(path)
+
+
+def test_default_socket_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DISPLAY", ":1")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert default_socket_path() == "/run/user/1000/pyxdotool:1.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert os.path.dirname(default_socket_path()) == fallback_runtime_dir()
+
+
+def test_daemon_takes_no_arguments() -> None:
+    with pytest.raises(SystemExit):
+        parse_global_args(["daemon", "--socket", "/tmp/x.sock"])
+    args = parse_global_args(["--socket", "/tmp/x.sock", "daemon"])
+    assert args.socket == "/tmp/x.sock"
@@ -0,0 +1,53 @@
+import json
+from typing import Optional
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.chain import parse_args
+from pyxdotool.fanout import print_results, run_on_displays
+
+
+@pytest.fixture
+def displays(servers: dict[Optional[str], FakeServer]) -> list[str]:
+    for desktops, name in enumerate([":1", ":2"], 2):
+        servers[name] = FakeServer()
+        servers[name].set_property(
+            servers[name].root.id, "_NET_NUMBER_OF_DESKTOPS", desktops
+        )
+    return [":1", ":2"]
+
+
+def test_results_in_display_order(displays: list[str]) -> None:
+    results = run_on_displays(displays, list(parse_args(["get_num_desktops"])))
+    assert [(result.display, result.output) for result in results] == [
+        (":1", "2\n"),
+        (":2", "3\n"),
+    ]
+    assert all(result.error is None for result in results)
+
+
+def test_jsonl_records_name_the_display(displays: list[str]) -> None:
+    results = run_on_displays(
+        displays, list(parse_args(["get_num_desktops"])), output_format="jsonl"
+    )
+    assert [json.loads(result.output) for result in results] == [
+        {"display": ":1", "desktops": 2},
+        {"display": ":2", "desktops": 3},
+    ]
+
+
+def test_failing_display(
+    displays: list[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    results = run_on_displays(
+        [":1", ":9"], list(parse_args(["get_num_desktops"]))
+    )
+    assert results[0].error is None
+    assert results[1].error is not None
+    assert "Can't open display: :9" in results[1].error
+
+    assert print_results(results) == 1
+    out, err = capsys.readouterr()
+    assert out == ":1\t2\n"
+    assert err.startswith(":9\t")
@@ -0,0 +1,63 @@
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.xdo import Xdo, XdoSearchDirection
+
+
+@pytest.fixture
+def nested(server: FakeServer) -> list[int]:
+    """A client window three levels below a top-level frame."""
+    frame = server.add_window()
+    middle = server.add_window(frame)
+    inner = server.add_window(middle)
+    client = server.add_window(inner, WM_STATE=[1, 0])
+    return [frame, middle, inner, client]
+
+
+def test_children(xdo: Xdo, nested: list[int]) -> None:
+    frame, *_, client = nested
+    assert xdo.find_window_client(frame, XdoSearchDirection.CHILDREN) == (
+        client
+    )
+
+
+def test_parents(xdo: Xdo, nested: list[int]) -> None:
+    *_, client = nested
+    child = xdo.find_window_client(client, XdoSearchDirection.PARENTS)
+    assert child == client
+
+
+def test_parents_of_a_child_window(server: FakeServer, xdo: Xdo) -> None:
+    client = server.add_client("client")
+    button = server.add_window(client)
+    assert xdo.find_window_client(button, XdoSearchDirection.PARENTS) == (
+        client
+    )
+
+
+def test_max_depth(xdo: Xdo, nested: list[int]) -> None:
+    frame, *_, client = nested
+    assert (
+        xdo.find_window_client(frame, XdoSearchDirection.CHILDREN, max_depth=2)
+        is None
+    )
+    assert (
+        xdo.find_window_client(frame, XdoSearchDirection.CHILDREN, max_depth=3)
+        == client
+    )
+
+
+def test_one_round_trip_per_level(
+    server: FakeServer, xdo: Xdo, nested: list[int]
+) -> None:
+    for _ in range(5):
+        server.add_window(nested[1])
+    xdo._intern_atoms(["WM_STATE"])
+    server.round_trips = 0
+    xdo.find_window_client(nested[0], XdoSearchDirection.CHILDREN)
+    assert server.round_trips == 4
+
+
+def test_no_client(server: FakeServer, xdo: Xdo) -> None:
+    window = server.add_window()
+    assert xdo.find_window_client(window, XdoSearchDirection.CHILDREN) is None
@@ -0,0 +1,121 @@
+import pytest
+import Xlib.X
+import Xlib.XK
+from conftest import FakeDisplay, FakeServer
+
+from pyxdotool.keyboard import XdoKeymap, char_to_keysym, name_to_keysym
+from pyxdotool.xdo import Xdo
+
+XK_a = Xlib.XK.XK_a
+XK_A = Xlib.XK.XK_A
+XK_Shift_L = Xlib.XK.XK_Shift_L
+XK_EURO = char_to_keysym("€")
+XK_SNOWMAN = char_to_keysym("☃")
+
+
+def make_keymap() -> XdoKeymap:
+    # Keycodes 8 and 9 are bound, 10 and 11 are free.
+    modifiers: list[list[int]] = [[] for _ in range(8)]
+    modifiers[Xlib.X.ShiftMapIndex] = [0, 9]
+    return XdoKeymap(8, [[XK_a, XK_A], [XK_Shift_L], [], []], modifiers)
+
+
+def test_char_to_keysym() -> None:
+    assert char_to_keysym("a") == XK_a
+    assert char_to_keysym("\n") == Xlib.XK.XK_Return
+    assert char_to_keysym("é") == 0xE9
+    assert char_to_keysym("☃") == 0x01002603
+
+
+def test_name_to_keysym() -> None:
+    assert name_to_keysym("ctrl") == Xlib.XK.XK_Control_L
+    assert name_to_keysym("Return") == Xlib.XK.XK_Return
+    assert name_to_keysym("☃") == XK_SNOWMAN
+    assert name_to_keysym("NoSuchKey") is None
+
+
+def test_lookup() -> None:
+    keymap = make_keymap()
+    assert keymap.lookup(XK_a) == (8, 0)
+    assert keymap.lookup(XK_A) == (8, Xlib.X.ShiftMask)
+    assert keymap.lookup(XK_EURO) is None
+    assert keymap.shift_keycode == 9
+
+
+def test_scratch_keycodes_least_recently_bound_first() -> None:
+    keymap = make_keymap()
+    assert keymap.next_scratch_keycode() == 10
+    keymap.bind_scratch_keycode(10, XK_EURO)
+    assert keymap.lookup(XK_EURO) == (10, 0)
+    assert keymap.next_scratch_keycode() == 11
+    keymap.bind_scratch_keycode(11, XK_SNOWMAN)
+    # Looking up a binding makes it the most recently used one.
+    keymap.lookup(XK_EURO)
+    assert keymap.next_scratch_keycode() == 11
+
+
+def test_unbind_scratch_keycode() -> None:
+    keymap = make_keymap()
+    keymap.bind_scratch_keycode(10, XK_EURO)
+    keymap.unbind_scratch_keycode(10)
+    assert keymap.lookup(XK_EURO) is None
+
+
+@pytest.fixture
+def keyboard(server: FakeServer) -> FakeServer:
+    # The same keys as make_keymap.
+    server.keysyms = [[XK_a, XK_A], [XK_Shift_L], [], []]
+    server.modifiers[Xlib.X.ShiftMapIndex] = [0, 9]
+    return server
+
+
+def test_enter_text(keyboard: FakeServer, xdo: Xdo) -> None:
+    xdo.enter_text("aA", delay=0.01)
+    assert [entry[1:] for entry in keyboard.log] == [
+        (Xlib.X.KeyPress, 8, 5),
+        (Xlib.X.KeyRelease, 8, 5),
+        (Xlib.X.KeyPress, 9, 0),
+        (Xlib.X.KeyPress, 8, 5),
+        (Xlib.X.KeyRelease, 8, 5),
+        (Xlib.X.KeyRelease, 9, 0),
+        (),  # sync
+    ]
+
+
+def test_scratch_keycodes_reset_after_typing(
+    keyboard: FakeServer, xdo: Xdo
+) -> None:
+    xdo._send_keystrokes([[XK_a], [XK_EURO], [XK_SNOWMAN]], 0)
+
+    mappings = [entry for entry in keyboard.log if entry[0] == "mapping"]
+    assert mappings == [
+        ("mapping", 10, [(XK_EURO, XK_EURO)]),
+        ("mapping", 11, [(XK_SNOWMAN, XK_SNOWMAN)]),
+        ("mapping", 10, [(Xlib.X.NoSymbol, Xlib.X.NoSymbol)]),
+        ("mapping", 11, [(Xlib.X.NoSymbol, Xlib.X.NoSymbol)]),
+    ]
+    # Only once all the keystrokes were processed.
+    assert keyboard.log.index(("sync",)) < keyboard.log.index(mappings[2])
+    assert xdo._get_keymap().lookup(XK_EURO) is None
+    # Our own MappingNotify events don't make us read the keymap again.
+    assert not xdo._own_mapping_changes
+    assert keyboard.requests["GetKeyboardMapping"] == 1
+
+
+def test_scratch_keycodes_kept_while_pressed(
+    keyboard: FakeServer, xdo: Xdo
+) -> None:
+    xdo._send_keystrokes([[XK_EURO]], 0, release=False)
+    assert [entry for entry in keyboard.log if entry[0] == "mapping"] == [
+        ("mapping", 10, [(XK_EURO, XK_EURO)])
+    ]
+    assert xdo._get_keymap().lookup(XK_EURO) == (10, 0)
+
+
+def test_keymap_read_again_after_mapping_change(
+    keyboard: FakeServer, xdo: Xdo
+) -> None:
+    assert xdo._get_keymap().lookup(XK_EURO) is None
+    # Another client binds a key.
+    FakeDisplay(keyboard).change_keyboard_mapping(10, [(XK_EURO, XK_EURO)])
+    assert xdo._get_keymap().lookup(XK_EURO) == (10, 0)
@@ -0,0 +1,44 @@
+from typing import Any
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.mouse import (
+    bezier_path,
+    linear_path,
+    polar_to_cartesian,
+)
+from pyxdotool.xdo import Xdo
+
+
+def test_mouse_location_over_window(server: FakeServer, xdo: Xdo) -> None:
+    server.add_window(x=500, y=500)
+    frame = server.add_window(x=0, y=0, width=100, height=100)
+    server.pointer = (10, 20)
+    assert xdo.get_mouse_location() == (10, 20, 0, frame)
+
+
+def test_mouse_location_over_root(server: FakeServer, xdo: Xdo) -> None:
+    server.pointer = (10, 20)
+    assert xdo.get_mouse_location() == (10, 20, 0, 0)
+
+
+def test_move_mouse_sync(server: FakeServer, xdo: Xdo) -> None:
+    assert xdo.move_mouse(100, 50, duration=0.1, rate=100, sync=True)
+    motions = [entry for entry in server.log if entry[0] == "motion"]
+    assert len(motions) == 10
+    assert motions[-1] == ("motion", 100, 50, 10)
+    assert xdo.move_mouse_relative(-10, 10, sync=True)
+    assert server.pointer == (90, 60)
+
+
+@pytest.mark.parametrize("path", [linear_path, bezier_path])
+def test_paths_end_at_target(path: Any) -> None:
+    points = list(path((0, 0), (100, 50), 10))
+    assert points[-1] == (100, 50)
+    assert len(points) == 10
+
+
+def test_polar_to_cartesian() -> None:
+    assert polar_to_cartesian(0, 10, (100, 100)) == (100, 90)
+    assert polar_to_cartesian(90, 10, (100, 100)) == (110, 100)
@@ -0,0 +1,53 @@
+from typing import Optional
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.xdo import Xdo
+
+
+@pytest.fixture
+def dual_head(servers: dict[Optional[str], FakeServer]) -> FakeServer:
+    servers[None] = FakeServer(
+        screens=((0, 0, 1000, 1000), (1000, 0, 1000, 1000))
+    )
+    return servers[None]
+
+
+def test_set_desktop_for_windows(server: FakeServer, xdo: Xdo) -> None:
+    windows = [server.add_window(_NET_WM_DESKTOP=0) for _ in range(3)]
+    assert xdo.set_desktop_for_windows(windows, 2, sync=True)
+    assert [
+        server.get_property(window, "_NET_WM_DESKTOP") for window in windows
+    ] == [[2]] * 3
+    assert [entry[2] for entry in server.log] == windows
+
+
+def test_set_desktop_for_windows_times_out(
+    server: FakeServer, xdo: Xdo
+) -> None:
+    windows = [server.add_window(_NET_WM_DESKTOP=0) for _ in range(3)]
+    server.wm = False
+    assert not xdo.set_desktop_for_windows(windows, 2, sync=True, timeout=0.01)
+
+
+def test_set_screen_for_windows(dual_head: FakeServer) -> None:
+    xdo = Xdo()
+    left = dual_head.add_window(x=100, y=100)
+    right = dual_head.add_window(x=1100, y=200)
+    assert xdo.set_screen_for_windows([left, right], 1, sync=True)
+    # Only the window that wasn't on the screen yet moves.
+    assert [entry[1:] for entry in dual_head.log] == [(left, 1100, 100)]
+
+    assert xdo.set_screen_for_windows([left, right], 1, relative=True)
+    assert [
+        (dual_head.windows[window].x, dual_head.windows[window].y)
+        for window in (left, right)
+    ] == [(100, 100), (100, 200)]
+
+
+def test_set_screen_for_windows_invalid_screen(dual_head: FakeServer) -> None:
+    xdo = Xdo()
+    window = dual_head.add_window()
+    with pytest.raises(IndexError):
+        xdo.set_screen_for_windows([window], 2)
@@ -0,0 +1,44 @@
+import io
+import json
+
+import pytest
+
+from pyxdotool import output
+from pyxdotool.output import OutputSink
+
+
+def test_text_records() -> None:
+    stream = io.StringIO()
+    sink = OutputSink(stream)
+    sink.write_windows([1, 2])
+    sink.record({"x": 10}, "x:10")
+    assert stream.getvalue() == ""
+    sink.flush()
+    assert stream.getvalue() == "1\n2\nx:10\n"
+
+
+def test_jsonl_records() -> None:
+    stream = io.StringIO()
+    sink = OutputSink(stream, "jsonl", fields={"display": ":1"})
+    sink.write_windows([1])
+    sink.record({"x": 10}, "x:10")
+    sink.flush()
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {"display": ":1", "window": 1},
+        {"display": ":1", "x": 10},
+    ]
+
+
+def test_writes_when_buffer_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(output, "BUFFER_SIZE", 4)
+    stream = io.StringIO()
+    sink = OutputSink(stream)
+    sink.write("ab")
+    assert stream.getvalue() == ""
+    sink.write("cd")
+    assert stream.getvalue() == "abcd"
+
+
+def test_invalid_format() -> None:
+    with pytest.raises(ValueError):
+        OutputSink(io.StringIO(), "xml")
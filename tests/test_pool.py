@@ -0,0 +1,93 @@
+import threading
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from pyxdotool.pool import XdoPool
+from pyxdotool.xdo import XdoError
+
+
+class FakeXdo:
+    def __init__(self) -> None:
+        self.xdpy = SimpleNamespace(display=SimpleNamespace(socket_error=None))
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def make_pool(max_size: int = 1) -> XdoPool:
+    pool = XdoPool(max_size=max_size)
+    pool._connect = FakeXdo  # type: ignore[assignment]
+    return pool
+
+
+def in_thread(target: Any) -> None:
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+
+def test_lease_reuses_connection() -> None:
+    pool = make_pool()
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        assert second is first
+    assert pool.size == 1
+
+
+def test_lease_times_out_when_exhausted() -> None:
+    pool = make_pool()
+    with pool.lease(), pytest.raises(XdoError):
+        with pool.lease(timeout=0.01):
+            pass
+
+
+def test_thread_connection_released_on_thread_exit() -> None:
+    pool = make_pool()
+    connections: list[Any] = []
+    in_thread(lambda: connections.append(pool.thread_connection()))
+    # The slot is free again for another thread.
+    in_thread(lambda: connections.append(pool.thread_connection(timeout=1)))
+    assert connections[0] is connections[1]
+    assert pool.size == 1
+
+
+def test_release_thread_connection() -> None:
+    pool = make_pool()
+    xdo = pool.thread_connection()
+    assert pool.thread_connection() is xdo
+    pool.release_thread_connection()
+    with pool.lease(timeout=0) as leased:
+        assert leased is xdo
+
+
+def test_broken_thread_connection_replaced() -> None:
+    pool = make_pool()
+    xdo = pool.thread_connection()
+    xdo.xdpy.display.socket_error = OSError()
+    replacement = pool.thread_connection(timeout=0)
+    assert replacement is not xdo
+    assert isinstance(xdo, FakeXdo) and xdo.closed
+    assert pool.size == 1
+
+
+def test_lease_keeps_connection_after_caller_error() -> None:
+    pool = make_pool()
+    with pytest.raises(OSError), pool.lease() as first:
+        raise FileNotFoundError()
+    with pool.lease(timeout=0) as second:
+        assert second is first
+
+
+def test_lease_drops_broken_connection() -> None:
+    pool = make_pool()
+    with pytest.raises(OSError), pool.lease() as first:
+        first.xdpy.display.socket_error = OSError()
+        raise OSError()
+    assert isinstance(first, FakeXdo) and first.closed
+    with pool.lease(timeout=0) as second:
+        assert second is not first
+    assert pool.size == 1
@@ -0,0 +1,53 @@
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.xdo import Xdo
+
+
+@pytest.fixture
+def cached_xdo(server: FakeServer) -> Xdo:
+    return Xdo(property_cache_size=2)
+
+
+def test_least_recently_used_is_evicted(
+    server: FakeServer, cached_xdo: Xdo
+) -> None:
+    first, second, third = (
+        server.add_window(_NET_WM_PID=pid) for pid in (1, 2, 3)
+    )
+    assert cached_xdo.get_window_pid(first) == 1
+    assert cached_xdo.get_window_pid(second) == 2
+    assert cached_xdo.get_window_pid(first) == 1
+    assert server.requests["GetProperty"] == 2
+    assert cached_xdo.get_window_pid(third) == 3
+    assert cached_xdo.get_window_pid(first) == 1
+    assert server.requests["GetProperty"] == 3
+    assert cached_xdo.get_window_pid(second) == 2
+    assert server.requests["GetProperty"] == 4
+
+
+def test_property_change_invalidates(
+    server: FakeServer, cached_xdo: Xdo
+) -> None:
+    window = server.add_window(_NET_WM_PID=1)
+    assert cached_xdo.get_window_pid(window) == 1
+    server.set_property(window, "_NET_WM_PID", 2)
+    assert cached_xdo.get_window_pid(window) == 2
+    assert server.requests["GetProperty"] == 2
+
+
+def test_destroyed_window_is_forgotten(
+    server: FakeServer, cached_xdo: Xdo
+) -> None:
+    window = server.add_window(_NET_WM_PID=1)
+    assert cached_xdo.get_window_pid(window) == 1
+    server.destroy_window(window)
+    cached_xdo.process_events()
+    assert not cached_xdo._property_cache
+
+
+def test_disabled_by_default(server: FakeServer, xdo: Xdo) -> None:
+    window = server.add_window(_NET_WM_PID=1)
+    assert xdo.get_window_pid(window) == 1
+    assert xdo.get_window_pid(window) == 1
+    assert server.requests["GetProperty"] == 2
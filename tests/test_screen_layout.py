@@ -0,0 +1,53 @@
+from typing import Optional
+
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.xdo import Xdo, XdoScreenInfo, XdoScreenLayout
+
+
+def make_layout() -> XdoScreenLayout:
+    # A 1920x1080 screen with a taller one on its right, aligned at the
+    # bottom, and a small one overlapping the first.
+    return XdoScreenLayout(
+        [
+            XdoScreenInfo(num=0, x=0, y=200, width=1920, height=1080),
+            XdoScreenInfo(num=1, x=1920, y=0, width=1080, height=1280),
+            XdoScreenInfo(num=2, x=100, y=300, width=800, height=600),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "x, y, expected",
+    [
+        (0, 200, 0),
+        (1919, 1279, 0),
+        (1920, 0, 1),
+        (2999, 1279, 1),
+        (500, 500, 0),  # the first listed screen wins
+        (0, 0, None),  # above the first screen
+        (3000, 0, None),
+        (-1, 500, None),
+        (500, 1280, None),
+    ],
+)
+def test_screen_at(x: int, y: int, expected: Optional[int]) -> None:
+    assert make_layout().screen_at(x, y) == expected
+
+
+def test_no_screens() -> None:
+    assert XdoScreenLayout([]).screen_at(0, 0) is None
+
+
+def test_layout_is_cached_until_screens_change(
+    server: FakeServer, xdo: Xdo
+) -> None:
+    assert xdo.find_screen(2000, 0, 100, 100) is None
+    assert xdo.get_screen_size(0) == (1920, 1080)
+    assert server.requests["QueryScreens"] == 1
+
+    server.set_screens([(0, 0, 1920, 1080), (1920, 0, 1280, 1024)])
+    assert xdo.find_screen(2000, 0, 100, 100) == 1
+    assert xdo.get_screen_location(1) == (1920, 0)
+    assert server.requests["QueryScreens"] == 2
@@ -0,0 +1,90 @@
+import pytest
+from conftest import FakeServer
+
+from pyxdotool.xdo import Xdo, XdoSearch
+
+
+@pytest.fixture
+def windows(server: FakeServer) -> dict[str, int]:
+    return {
+        "term": server.add_client(
+            "Terminal",
+            WM_CLASS=b"xterm\0XTerm\0",
+            _NET_WM_PID=100,
+            _NET_WM_DESKTOP=0,
+        ),
+        "editor": server.add_client(
+            "Emacs",
+            _NET_WM_NAME="wörld.txt - Emacs",
+            WM_CLASS=b"emacs\0Emacs\0",
+            _NET_WM_PID=200,
+            _NET_WM_DESKTOP=1,
+        ),
+        "hidden": server.add_window(mapped=False, WM_NAME="terminal (hidden)"),
+    }
+
+
+def test_name_is_case_insensitive_regex(
+    xdo: Xdo, windows: dict[str, int]
+) -> None:
+    assert xdo.search_windows(XdoSearch(name="^term")) == [
+        windows["hidden"],
+        windows["term"],
+    ]
+
+
+def test_utf8_name(xdo: Xdo, windows: dict[str, int]) -> None:
+    assert xdo.search_windows(XdoSearch(name="wörld")) == [windows["editor"]]
+    assert xdo.get_window_name(windows["editor"]) == "wörld.txt - Emacs"
+
+
+def test_class_and_classname(xdo: Xdo, windows: dict[str, int]) -> None:
+    assert xdo.search_windows(XdoSearch(winclass="^XTerm$")) == [
+        windows["term"]
+    ]
+    assert xdo.search_windows(XdoSearch(winclassname="^emacs$")) == [
+        windows["editor"]
+    ]
+
+
+def test_pid_and_desktop(xdo: Xdo, windows: dict[str, int]) -> None:
+    assert xdo.search_windows(XdoSearch(pid=200)) == [windows["editor"]]
+    assert xdo.search_windows(XdoSearch(desktop=0)) == [windows["term"]]
+    assert xdo.search_windows(XdoSearch(pid=200, desktop=0)) == []
+
+
+def test_any_or_all_patterns(xdo: Xdo, windows: dict[str, int]) -> None:
+    search = XdoSearch(name="emacs", winclass="xterm")
+    assert xdo.search_windows(search) == [windows["term"], windows["editor"]]
+    search.require_all = True
+    assert xdo.search_windows(search) == []
+
+
+def test_only_visible(xdo: Xdo, windows: dict[str, int]) -> None:
+    search = XdoSearch(name="term", only_visible=True)
+    assert xdo.search_windows(search) == [windows["term"]]
+
+
+def test_breadth_first_order_depth_and_limit(
+    server: FakeServer, xdo: Xdo
+) -> None:
+    outer = server.add_window(WM_NAME="match outer")
+    inner = server.add_window(outer, WM_NAME="match inner")
+    last = server.add_window(WM_NAME="match last")
+    assert xdo.search_windows(XdoSearch(name="match")) == [outer, last, inner]
+    assert xdo.search_windows(XdoSearch(name="match", max_depth=1)) == [
+        outer,
+        last,
+    ]
+    assert xdo.search_windows(XdoSearch(name="match", limit=1)) == [outer]
+
+
+def test_one_round_trip_per_level(server: FakeServer, xdo: Xdo) -> None:
+    for i in range(10):
+        server.add_client(f"client {i}")
+    xdo._intern_atoms(["_NET_WM_NAME", "WM_NAME"])
+    server.round_trips = 0
+    assert len(xdo.search_windows(XdoSearch(name="client"))) == 10
+    # The root, the frames and the clients, each level's tree and property
+    # requests sent together.
+    assert server.round_trips == 3
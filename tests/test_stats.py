@@ -0,0 +1,48 @@
+from conftest import FakeServer
+
+from pyxdotool.stats import XdoStats
+from pyxdotool.xdo import Xdo
+
+
+def test_counts_requests_and_round_trips(server: FakeServer, xdo: Xdo) -> None:
+    windows = [server.add_window(x=10 * i) for i in range(5)]
+    xdo.query_screens()
+    stats = XdoStats()
+    stats.attach(xdo)
+
+    xdo.get_geometries(windows)
+    scope = stats.scopes["xdo.get_geometries"]
+    assert scope.calls == 1
+    assert scope.round_trips == 1
+    assert scope.requests == 15
+    assert scope.requests_by_type == {
+        "GetGeometry": 5,
+        "QueryTree": 5,
+        "TranslateCoords": 5,
+    }
+
+    with stats.scope("command.getwindowname"):
+        xdo.get_window_name(windows[0])
+    assert stats.scopes["command.getwindowname"].requests == (
+        stats.scopes["xdo.get_window_name"].requests
+    )
+    assert stats.total.requests == 15 + (
+        stats.scopes["xdo.get_window_name"].requests
+    )
+
+
+def test_scopes_are_inclusive(server: FakeServer, xdo: Xdo) -> None:
+    window = server.add_window(_NET_WM_DESKTOP=1)
+    stats = XdoStats()
+    stats.attach(xdo)
+    with stats.scope("command.windowactivate") as command:
+        xdo.activate_window(window)
+        xdo.get_active_window()
+    methods = [
+        stats.scopes["xdo.activate_window"],
+        stats.scopes["xdo.get_active_window"],
+    ]
+    assert command.calls == 1
+    assert command.requests == sum(scope.requests for scope in methods)
+    assert command.round_trips == sum(scope.round_trips for scope in methods)
+    assert stats.total.requests == command.requests
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+
+from pyxdotool.window_index import XdoIndexEntry, XdoWindowIndex, _StringIndex
+
+TITLES = [
+    "İstanbul - Wikipedia",
+    "ISTANBUL",
+    "Straße — Mozilla Firefox",
+    "Terminal",
+    "terminal: ~/src",
+    "Kelvin",
+    "Emacs",
+]
+
+
+def make_index() -> _StringIndex:
+    index = _StringIndex(trigrams=True)
+    for window_id, title in enumerate(TITLES):
+        index.add(title, window_id)
+    return index
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["istanbul", "İstanbul", "STRASSE", "straße", "term", "kelvin", "em", ""],
+)
+def test_match_agrees_with_search(pattern: str) -> None:
+    regex = re.compile(pattern, re.IGNORECASE)
+    expected = {i for i, title in enumerate(TITLES) if regex.search(title)}
+    assert make_index().match(regex) == expected
+
+
+def test_match_after_discard() -> None:
+    index = make_index()
+    index.discard("Terminal", 3)
+    assert index.match(re.compile("terminal", re.IGNORECASE)) == {4}
+    assert "Terminal" not in index.windows
+
+
+def entry(name: str, pid: int, desktop: int) -> XdoIndexEntry:
+    return XdoIndexEntry(name, "xterm", "XTerm", pid, desktop)
+
+
+def test_window_index_update_and_remove() -> None:
+    index = XdoWindowIndex()
+    index.update(1, entry("one", 100, 0))
+    index.update(2, entry("two", 100, 1))
+    assert index.pids == {100: {1, 2}}
+    assert index.classes.windows == {"XTerm": {1, 2}}
+
+    index.update(2, entry("deux", 200, 1))
+    assert index.pids == {100: {1}, 200: {2}}
+    assert index.names.match(re.compile("two")) == set()
+
+    index.dirty.add(1)
+    index.remove(1)
+    assert 1 not in index.entries
+    assert not index.dirty
+    assert index.desktops == {1: {2}}
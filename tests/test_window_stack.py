@@ -0,0 +1,72 @@
+import argparse
+
+import pytest
+
+from pyxdotool.window_stack import WindowStack, window_selector
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("42", 42),
+        ("010", 10),
+        ("0x1f", 31),
+        ("0X1F", 31),
+        ("%1", "%1"),
+        ("%-2", "%-2"),
+        ("%@", "%@"),
+    ],
+)
+def test_window_selector(value: str, expected: object) -> None:
+    assert window_selector(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["", "abc", "0x", "0o7", "%0", "%", "%x", "-1", "0x100000000"],
+)
+def test_invalid_window_selector(value: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        window_selector(value)
+
+
+def test_select_pops_last_window() -> None:
+    stack = WindowStack([1, 2, 3])
+    assert list(stack.select(None)) == [3]
+    assert list(stack) == [1, 2]
+
+
+def test_select_takes_all() -> None:
+    stack = WindowStack([1, 2, 3])
+    assert list(stack.select(None, take_all=True)) == [1, 2, 3]
+    assert len(stack) == 0
+
+
+def test_select_by_selector_keeps_stack() -> None:
+    stack = WindowStack([1, 2, 3])
+    assert list(stack.select("%1")) == [1]
+    assert list(stack.select("%-1")) == [3]
+    assert list(stack.select("%@")) == [1, 2, 3]
+    assert list(stack.select(42)) == [42]
+    assert list(stack) == [1, 2, 3]
+
+
+def test_select_out_of_range() -> None:
+    with pytest.raises(IndexError, match="No window %4"):
+        WindowStack([1, 2, 3]).select("%4")
+
+
+def test_select_from_empty_stack() -> None:
+    with pytest.raises(IndexError, match="Must specify window"):
+        WindowStack().select(None)
+
+
+def test_push_replace_clear() -> None:
+    stack = WindowStack()
+    stack.push(1)
+    stack.push(2)
+    assert stack[-1] == 2
+    stack.replace([5, 6, 7])
+    assert list(stack) == [5, 6, 7]
+    stack.clear()
+    assert len(stack) == 0
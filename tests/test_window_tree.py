@@ -0,0 +1,177 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import Xlib.X
+from conftest import FakeServer
+
+from pyxdotool.window_tree import XdoWindowTree, resource_id
+from pyxdotool.xdo import Xdo
+
+
+def window(window_id: int) -> SimpleNamespace:
+    return SimpleNamespace(id=window_id)
+
+
+def event(event_type: int, **fields: Any) -> SimpleNamespace:
+    return SimpleNamespace(type=event_type, send_event=False, **fields)
+
+
+def make_tree() -> XdoWindowTree:
+    tree = XdoWindowTree()
+    tree.add(1, None).mapped = True
+    for window_id in (10, 11, 12):
+        tree.add(window_id, 1).mapped = True
+        tree.nodes[1].children.append(window_id)
+    return tree
+
+
+def test_resource_id() -> None:
+    assert resource_id(window(42)) == 42
+    assert resource_id(0) == 0
+    assert resource_id(None) == 0
+
+
+def test_configure_restacks_above_sibling() -> None:
+    tree = make_tree()
+    tree.handle_event(
+        event(
+            Xlib.X.ConfigureNotify,
+            window=window(10),
+            x=5,
+            y=6,
+            width=7,
+            height=8,
+            border_width=0,
+            above_sibling=window(12),
+        )
+    )
+    assert tree.nodes[1].children == [11, 12, 10]
+    assert (tree.nodes[10].x, tree.nodes[10].y) == (5, 6)
+
+
+def test_configure_without_sibling_goes_to_bottom() -> None:
+    tree = make_tree()
+    tree.handle_event(
+        event(
+            Xlib.X.ConfigureNotify,
+            window=window(12),
+            x=0,
+            y=0,
+            width=1,
+            height=1,
+            border_width=0,
+            above_sibling=0,
+        )
+    )
+    assert tree.nodes[1].children == [12, 10, 11]
+
+
+def test_synthetic_configure_is_ignored() -> None:
+    tree = make_tree()
+    configure = event(
+        Xlib.X.ConfigureNotify,
+        window=window(10),
+        x=500,
+        y=600,
+        width=7,
+        height=8,
+        border_width=0,
+        above_sibling=0,
+    )
+    configure.send_event = True
+    tree.handle_event(configure)
+    assert (tree.nodes[10].x, tree.nodes[10].y) == (0, 0)
+    assert tree.nodes[1].children == [10, 11, 12]
+
+
+def test_create_and_destroy() -> None:
+    tree = make_tree()
+    tree.handle_event(
+        event(
+            Xlib.X.CreateNotify,
+            window=window(13),
+            parent=window(1),
+            x=1,
+            y=2,
+            width=3,
+            height=4,
+            border_width=0,
+        )
+    )
+    assert tree.nodes[1].children[-1] == 13
+    tree.handle_event(event(Xlib.X.DestroyNotify, window=window(13)))
+    assert 13 not in tree
+    assert 13 not in tree.nodes[1].children
+
+
+def test_path_and_viewable() -> None:
+    tree = make_tree()
+    tree.add(20, 10)
+    tree.nodes[10].children.append(20)
+    assert tree.path(20) == [1, 10, 20]
+    assert not tree.is_viewable(20)
+    tree.handle_event(event(Xlib.X.MapNotify, window=window(20)))
+    assert tree.is_viewable(20)
+
+
+def test_collect_tree_of_root(server: FakeServer, xdo: Xdo) -> None:
+    # python-xlib parses a None parent as the int 0.
+    child = server.add_window()
+    pending = xdo._send_tree_request(server.root.id)
+    assert xdo._collect_tree(pending) == (0, [child])
+
+
+@pytest.fixture
+def mirror_xdo(server: FakeServer) -> Xdo:
+    return Xdo(mirror_window_tree=True)
+
+
+def test_mirror_crawls_new_windows(
+    server: FakeServer, mirror_xdo: Xdo
+) -> None:
+    frame = server.add_window(x=10, y=20)
+    tree = mirror_xdo._get_window_tree()
+    assert tree is not None and tree.nodes[server.root.id].children == [frame]
+    assert not tree.uncrawled
+
+    client = server.add_window(frame, x=1, y=2, WM_NAME="client")
+    mirror_xdo.process_events()
+    assert tree.uncrawled == {client}
+    assert mirror_xdo._get_window_tree() is tree
+    assert not tree.uncrawled
+    assert tree.nodes[frame].children == [client]
+    assert tree.root_position(client) == (11, 22)
+
+    mirror_xdo.query_screens()
+    server.round_trips = 0
+    assert mirror_xdo.get_window_location(client) == (11, 22, 0)
+    assert server.round_trips == 0
+
+    server.move_window(frame, 30, 40)
+    assert mirror_xdo.get_window_location(client)[:2] == (31, 42)
+    server.destroy_window(frame)
+    mirror_xdo._get_window_tree()
+    assert frame not in tree and client not in tree
+
+
+def test_mirror_keeps_properties_current(
+    server: FakeServer, mirror_xdo: Xdo
+) -> None:
+    window = server.add_window(WM_NAME="old")
+    mirror_xdo._get_window_tree()
+    assert mirror_xdo.get_window_name(window) == "old"
+    server.set_property(window, "WM_NAME", "new")
+    assert mirror_xdo.get_window_name(window) == "new"
+
+
+def test_uncrawled_window_properties_not_mirrored(
+    server: FakeServer, mirror_xdo: Xdo
+) -> None:
+    mirror_xdo._get_window_tree()
+    window = server.add_window(WM_NAME="old")
+    # Known from its CreateNotify, but its PropertyNotify isn't selected
+    # until it is crawled.
+    assert mirror_xdo.get_window_name(window) == "old"
+    server.set_property(window, "WM_NAME", "new")
+    assert mirror_xdo.get_window_name(window) == "new"